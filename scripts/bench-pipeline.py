@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Benchmark the data pipeline on synthetic question banks.
+
+Generates (or reuses) banks at multiples of the real row count -- 1x, 10x
+and 100x by default, see synthetic_bank.py -- and runs the parse, media,
+filter and translate benchmarks (see benchmarks.py) on each, every run in a
+fresh interpreter. Reports wall time, throughput and peak RSS per benchmark
+and compares them with the stored baselines:
+
+  scripts/bench-baseline.json
+    {"version": 1, "python": "3.12", "platform": "linux", "repeat": 3,
+     "results": {"parse@1x": {"seconds", "items", "unit", "perSecond", "peakRssMb"}, ...}}
+
+A benchmark regresses when its time or peak RSS exceeds the baseline by more
+than --threshold (default 25%) and by more than a small absolute noise floor
+(50 ms, 5 MB); the script then exits with status 1.
+Baselines are machine-specific: refresh them with --update-baseline on the
+machine that runs the comparison. With --repeat N each benchmark runs N
+times and the fastest run counts.
+
+Usage:
+  python3 scripts/bench-pipeline.py [--scales 1,10,100] [--only parse,filter]
+                                    [--repeat N] [--seed N] [--work-dir PATH]
+                                    [--baseline PATH] [--threshold 0.25]
+                                    [--update-baseline]
+"""
+
+import argparse
+import json
+import platform
+import sys
+from pathlib import Path
+
+from benchmarks import BENCHMARKS, run_benchmark
+from build_cache import write_atomic
+from pipeline import project_path
+from synthetic_bank import generate_bank
+
+BASELINE_VERSION = 1
+DEFAULT_SCALES = "1,10,100"
+DEFAULT_THRESHOLD = 0.25
+NOISE_FLOOR = {"seconds": 0.05, "peakRssMb": 5.0}  # Smaller absolute changes never count
+
+
+def load_baseline(path: Path) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            baseline = json.load(f)
+    except (OSError, ValueError):
+        return {}
+    return baseline.get("results", {}) if baseline.get("version") == BASELINE_VERSION else {}
+
+
+def compare(result: dict, base: dict | None, threshold: float) -> tuple[str, bool]:
+    """(note, regressed) for one result against its baseline entry."""
+    if base is None:
+        return "no baseline", False
+    notes = []
+    regressed = False
+    for key, label in (("seconds", "time"), ("peakRssMb", "rss")):
+        change = result[key] / base[key] - 1 if base[key] else 0.0
+        if abs(result[key] - base[key]) < NOISE_FLOOR[key]:
+            continue
+        if change > threshold:
+            regressed = True
+            notes.append(f"{label} +{change * 100:.0f}% REGRESSION")
+        elif abs(change) > threshold:
+            notes.append(f"{label} {change * 100:.0f}%")
+    return ", ".join(notes) or "ok", regressed
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scales", default=DEFAULT_SCALES,
+                        help="Comma-separated bank sizes, as multiples of the real row count")
+    parser.add_argument("--only", help=f"Comma-separated benchmarks to run ({', '.join(BENCHMARKS)})")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per benchmark; the fastest counts")
+    parser.add_argument("--seed", type=int, default=0, help="Seed for the synthetic banks")
+    parser.add_argument("--work-dir", default=".build-cache/bench",
+                        help="Directory for generated banks (reused between runs)")
+    parser.add_argument("--baseline", default="scripts/bench-baseline.json", help="Baseline results file")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD,
+                        help="Allowed slowdown / memory growth over the baseline (0.25 = 25%%)")
+    parser.add_argument("--update-baseline", action="store_true",
+                        help="Store these results as the new baseline instead of comparing")
+    args = parser.parse_args()
+
+    scales = [float(s) for s in args.scales.split(",") if s.strip()]
+    names = [n.strip() for n in args.only.split(",")] if args.only else list(BENCHMARKS)
+    unknown = [n for n in names if n not in BENCHMARKS]
+    if unknown:
+        sys.exit(f"Unknown benchmark(s): {', '.join(unknown)}")
+    work_dir = project_path(args.work_dir)
+    baseline_path = project_path(args.baseline)
+    baseline = load_baseline(baseline_path)
+
+    results = {}
+    regressions = []
+    for scale in scales:
+        bank_dir = work_dir / f"bank-{scale:g}x-seed{args.seed}"
+        bank = generate_bank(bank_dir, scale, seed=args.seed)
+        print(f"\n{scale:g}x: {bank['rows']} rows, {bank['mediaFiles']} media files")
+        for name in names:
+            runs = [run_benchmark(name, bank_dir) for _ in range(max(1, args.repeat))]
+            result = min(runs, key=lambda r: r["seconds"])
+            key = f"{name}@{scale:g}x"
+            results[key] = result
+            note, regressed = compare(result, baseline.get(key), args.threshold)
+            if regressed:
+                regressions.append(key)
+            print(f"  {name:<10} {result['seconds']:>9.3f} s {result['perSecond']:>12,.0f} {result['unit']}/s "
+                  f"{result['peakRssMb']:>8.1f} MB peak  {note if not args.update_baseline else ''}".rstrip())
+
+    if args.update_baseline:
+        # Keep entries for benchmarks/scales not run this time
+        data = {
+            "version": BASELINE_VERSION,
+            "python": platform.python_version(),
+            "platform": sys.platform,
+            "repeat": args.repeat,
+            "results": dict(sorted({**baseline, **results}.items())),
+        }
+        write_atomic(baseline_path, (json.dumps(data, indent=2) + "\n").encode("utf-8"))
+        print(f"\nBaseline written: {baseline_path}")
+        return
+
+    if regressions:
+        print(f"\n{len(regressions)} regression(s) over {args.threshold * 100:.0f}%: {', '.join(regressions)}")
+        sys.exit(1)
+    print("\nNo regressions.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,154 @@
+"""
+Pipeline benchmarks for bench-pipeline.py.
+
+Each benchmark takes a synthetic bank (synthetic_bank.py), does its untimed
+setup, then times one pipeline stage:
+
+  parse      stream the sheet into question objects (no media checks)
+  media      index the media directory (cold, no cache) and resolve every
+             media reference in the sheet against it
+  filter     missing-media filter over every category list, fresh classifier
+  translate  source-string extraction, dedup and a full TranslationEngine run
+             against StubBackend, a local backend with fixed per-call latency
+
+run_benchmark() runs one of them in a freshly spawned interpreter, so peak
+RSS (ru_maxrss) belongs to that benchmark alone. It includes the setup, so
+compare it against the same benchmark's baseline, not across benchmarks.
+"""
+
+import contextlib
+import io
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from pathlib import Path
+
+from build_metrics import peak_rss_mb
+from media_filter import MediaClassifier, filter_missing_media
+from media_index import build_media_index
+from pipeline import CATEGORIES, COL_MEDIA, parse_stage, resolve_media
+from synthetic_bank import bank_paths
+from translation_engine import EchoBackend, TranslationEngine
+from translation_memory import TranslationMemory, text_key
+from xlsx_stream import iter_workbook_rows
+
+BATCH_SIZE = 40       # Same batching as translate-questions.py
+WORKERS = 4
+STUB_LATENCY = 0.002  # Seconds per backend call
+STUB_RATE = 1000.0    # Calls per second: measure the engine, not the rate limit
+
+
+class StubBackend(EchoBackend):
+    """EchoBackend with a fixed per-call delay standing in for the network."""
+
+    name = "stub"
+
+    def translate_batch(self, texts, source, target):
+        time.sleep(STUB_LATENCY)
+        return super().translate_batch(texts, source, target)
+
+
+def quiet_parse(excel_path: Path):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return parse_stage(excel_path, "stream", None)
+
+
+# ---------------------------------------------------------------------------
+# Benchmarks: setup, then return (seconds, items, unit)
+# ---------------------------------------------------------------------------
+def bench_parse(bank_dir: Path):
+    excel_path, _media_dir = bank_paths(bank_dir)
+    start = time.perf_counter()
+    all_questions, _cat_questions = quiet_parse(excel_path)
+    return time.perf_counter() - start, len(all_questions), "rows"
+
+
+def bench_media(bank_dir: Path):
+    excel_path, media_dir = bank_paths(bank_dir)
+    rows = iter_workbook_rows(excel_path, reader="stream")
+    next(rows)
+    refs = [str(row[COL_MEDIA]).strip() for row in rows if row[COL_MEDIA]]
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        media_index = build_media_index(media_dir)
+    for ref in refs:
+        resolve_media(ref, media_index)
+    return time.perf_counter() - start, len(refs), "refs"
+
+
+def bench_filter(bank_dir: Path):
+    excel_path, _media_dir = bank_paths(bank_dir)
+    _all_questions, cat_questions = quiet_parse(excel_path)
+
+    start = time.perf_counter()
+    classifier = MediaClassifier()
+    checked = 0
+    for cat in CATEGORIES:
+        filter_missing_media(cat_questions[cat], classifier)
+        checked += len(cat_questions[cat])
+    return time.perf_counter() - start, checked, "questions"
+
+
+def bench_translate(bank_dir: Path):
+    excel_path, _media_dir = bank_paths(bank_dir)
+    all_questions, _cat_questions = quiet_parse(excel_path)
+    questions = {}
+    for q in all_questions:
+        questions.setdefault(str(q["id"]), q)
+
+    start = time.perf_counter()
+    strings = []
+    for qid, q in questions.items():
+        for field in ["q"] + (["a", "b", "c"] if q["type"] == "specialist" else []):
+            if q.get(field):
+                strings.append((qid, field, q[field]))
+    memory = TranslationMemory()
+    pending = {}
+    for qid, field, text in strings:
+        pending.setdefault(text_key(text), (text, []))[1].append((qid, field))
+    unique = list(pending.values())
+
+    engine = TranslationEngine(StubBackend(), rate=STUB_RATE, max_in_flight=WORKERS)
+    jobs = (
+        (batch, [text for text, _targets in batch], "en")
+        for batch in (unique[i:i + BATCH_SIZE] for i in range(0, len(unique), BATCH_SIZE))
+    )
+    translations = {}
+    for batch, results in engine.run(jobs):
+        for (text, targets), translated in zip(batch, results):
+            memory.put("en", text, translated)
+            for qid, field in targets:
+                translations.setdefault(qid, {})[field] = translated
+    return time.perf_counter() - start, len(strings), "strings"
+
+
+BENCHMARKS = {
+    "parse": bench_parse,
+    "media": bench_media,
+    "filter": bench_filter,
+    "translate": bench_translate,
+}
+
+
+# ---------------------------------------------------------------------------
+# Runner
+# ---------------------------------------------------------------------------
+def _measure(name: str, bank_dir: str) -> dict:
+    """Child-process entry point."""
+    bench = BENCHMARKS[name]
+    seconds, items, unit = bench(Path(bank_dir))
+    return {
+        "seconds": round(seconds, 4),
+        "items": items,
+        "unit": unit,
+        "perSecond": round(items / seconds, 1) if seconds else None,
+        "peakRssMb": round(peak_rss_mb(), 1),
+    }
+
+
+def run_benchmark(name: str, bank_dir: str | Path) -> dict:
+    """Run one benchmark in a fresh interpreter and return its measurements."""
+    context = multiprocessing.get_context("spawn")
+    with ProcessPoolExecutor(max_workers=1, mp_context=context) as pool:
+        return pool.submit(_measure, name, str(bank_dir)).result()
@@ -0,0 +1,137 @@
+#!/usr/bin/env python3
+"""
+Build src/data in a single pass: parse → missing-media filter → meta → write.
+
+Equivalent to running parse-excel.py followed by filter-no-media.py, but the
+filter runs in memory on the parsed question objects (each unique question is
+checked once), meta.json counts are computed from the final lists, and every
+JSON file is serialized once. Outputs go through the build cache, so an
+unchanged rebuild writes nothing. Stage timings, counters and peak memory are
+reported as in parse-excel.py (--metrics-json, --profile).
+
+Usage:
+  python3 scripts/build-data.py [--excel PATH] [--media-dir PATH] [--out-dir PATH]
+                                [--reader {stream,openpyxl}] [--cache-dir PATH]
+                                [--layout {full,normalized}] [--force] [--verbose]
+                                [--metrics-json PATH] [--profile]
+"""
+
+import argparse
+import sys
+from pathlib import Path
+
+from build_cache import BuildCache
+from build_metrics import PROFILE_DIRNAME, Metrics, add_metrics_args
+from data_assets import package_data
+from media_dedup import load_media_names
+from media_filter import MEDIA_REFERENCE_PATTERNS, VERDICTS_FILENAME, MediaClassifier, filter_missing_media
+from pipeline import (
+    CATEGORIES,
+    add_build_args,
+    build_fingerprint,
+    meta_stage,
+    parse_stage,
+    prepare_media_index,
+    project_path,
+    write_stage,
+)
+from search_index import build_search
+
+SOURCES = ["build-data.py", "media_filter.py"]
+
+
+def filter_stage(
+    all_questions: list[dict],
+    cat_questions: dict[str, list],
+    cache_dir: Path,
+    verbose: bool = False,
+    metrics: Metrics | None = None,
+):
+    """Drop questions that need media they don't have, from the store and every category."""
+    print("\nFiltering questions with missing media ...")
+    classifier = MediaClassifier(cache_path=cache_dir / VERDICTS_FILENAME)
+    kept, removed = filter_missing_media(all_questions, classifier)
+    classifier.save()
+    if metrics is not None:
+        metrics.count("questions_removed", len(removed))
+        metrics.count("texts_classified", classifier.texts)
+        metrics.count("verdicts_cached", classifier.cached)
+    removed_ids = {id(q) for q in removed}
+
+    filtered = {}
+    for cat in CATEGORIES:
+        questions = cat_questions[cat]
+        filtered[cat] = [q for q in questions if id(q) not in removed_ids]
+        dropped = len(questions) - len(filtered[cat])
+        if dropped:
+            print(f"  {cat:>3}: removed {dropped:>3} questions | {len(questions)} -> {len(filtered[cat])}")
+
+    print(f"  Removed {len(removed)} of {len(all_questions)} unique questions")
+    if verbose:
+        for q in removed:
+            print(f"       - [{q['id']}] {q['q'][:80]}...")
+    classifier.report(verbose=verbose)
+    return kept, filtered
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    add_build_args(parser)
+    parser.add_argument("--verbose", "-v", action="store_true", help="List removed questions")
+    add_metrics_args(parser)
+    args = parser.parse_args()
+
+    excel_path = project_path(args.excel)
+    out_dir = project_path(args.out_dir)
+    cache_dir = project_path(args.cache_dir)
+    metrics = Metrics("build-data", cache_dir / PROFILE_DIRNAME if args.profile else None)
+
+    if not excel_path.exists():
+        sys.exit(f"Excel file not found: {excel_path}")
+    with metrics.stage("media-index"):
+        media_index = prepare_media_index(project_path(args.media_dir), cache_dir)
+    media_names = load_media_names(out_dir)
+
+    cache = BuildCache(cache_dir, "build-data", force=args.force)
+    with metrics.stage("fingerprint"):
+        inputs = build_fingerprint(
+            excel_path,
+            media_index,
+            {
+                "layout": args.layout,
+                "out": str(out_dir),
+                "patterns": MEDIA_REFERENCE_PATTERNS,
+                "mediaNames": media_names,
+            },
+            SOURCES,
+        )
+    if cache.is_fresh(inputs):
+        print(f"Inputs unchanged since last build — reusing outputs in {out_dir}")
+        cache.report()
+        metrics.count_build_cache(cache)
+        metrics.finish(args.metrics_json)
+        return
+
+    with metrics.stage("parse", profile=True):
+        all_questions, cat_questions = parse_stage(excel_path, args.reader, media_index, metrics, media_names)
+    with metrics.stage("filter", profile=True):
+        all_questions, cat_questions = filter_stage(
+            all_questions, cat_questions, cache_dir, verbose=args.verbose, metrics=metrics
+        )
+    with metrics.stage("meta"):
+        meta = meta_stage(cat_questions)
+    with metrics.stage("write", profile=True):
+        write_stage(out_dir, args.layout, all_questions, cat_questions, meta, cache, cache_dir)
+
+    cache.commit(inputs)
+    cache.report()
+    metrics.count_build_cache(cache)
+    with metrics.stage("search-index"):
+        build_search(out_dir, cache_dir, force=args.force)
+    with metrics.stage("package"):
+        package_data(out_dir, cache_dir, force=args.force)
+    print("  Done!")
+    metrics.finish(args.metrics_json)
+
+if __name__ == "__main__":
+    main()
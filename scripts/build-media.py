@@ -0,0 +1,98 @@
+#!/usr/bin/env python3
+"""
+Transcode source media for the app: WMV → MP4 (src/media/vid) and
+JPG → WebP (src/media/img) plus downscaled width variants (and AVIF copies
+with --avif), and a poster frame and low-bitrate preview per video, on every
+core, re-encoding only what changed.
+
+Uses the same cached media index as the data build (see media_index.py) and
+records what each output was built from in .build-cache/media-state.json
+(see media_build.py). Writes src/data/media-manifest.json with output sizes,
+dimensions, image variants, video durations and renditions, stores every
+output once more under its content hash (src/data/media-names.json maps output
+names to these objects, see media_dedup.py) and points the question "media"
+fields of the built data at them. Then packs each category's media into a few
+range-fetchable packs for offline downloads (src/media/packs/ +
+src/data/media-packs.json, see media_packs.py).
+
+Requires ffmpeg (+ ffprobe for dimensions/durations) and cwebp on PATH. The
+default video encoder is libx264; pass --video-encoder h264_videotoolbox for
+hardware encoding on macOS.
+
+Usage:
+  python3 scripts/build-media.py [--media-dir PATH] [--out-dir PATH] [--data-dir PATH]
+                                 [--cache-dir PATH] [--only {video,image}] [--jobs N]
+                                 [--video-encoder {libx264,h264_videotoolbox}]
+                                 [--avif] [--adopt] [--no-packs] [--force]
+"""
+
+import argparse
+import os
+import sys
+
+from data_assets import package_data
+from media_build import MEDIA_MANIFEST, OUTPUT_SUBDIRS, VIDEO_ENCODERS, build_media, missing_tools
+from media_dedup import load_media_names, rename_media_refs
+from media_packs import build_packs
+from pipeline import CATEGORIES, prepare_media_index, project_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument(
+        "--media-dir",
+        default="Pytania egzaminacyjne na prawo jazdy 2025",
+        help="Directory with source media files",
+    )
+    parser.add_argument("--out-dir", default="src/media", help="Output directory (vid/ and img/ inside)")
+    parser.add_argument("--data-dir", default="src/data", help="Where media-manifest.json is written")
+    parser.add_argument("--cache-dir", default=".build-cache", help="Directory for build caches")
+    parser.add_argument("--only", choices=sorted(OUTPUT_SUBDIRS), help="Only build one media type")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count(), help="Parallel encodes (default: all cores)")
+    parser.add_argument("--video-encoder", choices=VIDEO_ENCODERS, default="libx264", help="ffmpeg H.264 encoder")
+    parser.add_argument("--avif", action="store_true", help="Also encode AVIF image variants (ffmpeg with libaom)")
+    parser.add_argument("--adopt", action="store_true", help="Keep existing outputs without state (only derived files are built) instead of re-encoding")
+    parser.add_argument("--no-packs", action="store_true", help="Skip building per-category media packs")
+    parser.add_argument("--force", action="store_true", help="Re-encode everything")
+    args = parser.parse_args()
+
+    kinds = {args.only} if args.only else set(OUTPUT_SUBDIRS)
+    missing = missing_tools(kinds, avif=args.avif and "image" in kinds)
+    if missing:
+        sys.exit(f"Missing required tools: {', '.join(missing)}")
+
+    media_dir = project_path(args.media_dir)
+    cache_dir = project_path(args.cache_dir)
+    data_dir = project_path(args.data_dir)
+    if not media_dir.is_dir():
+        sys.exit(f"Media directory not found: {media_dir}")
+
+    media_index = prepare_media_index(media_dir, cache_dir)
+    out_dir = project_path(args.out_dir)
+    previous_names = load_media_names(data_dir)
+    print("Building media ...")
+    counts = build_media(
+        media_index,
+        out_dir,
+        cache_dir,
+        data_dir / MEDIA_MANIFEST,
+        kinds=kinds,
+        jobs=args.jobs,
+        video_encoder=args.video_encoder,
+        avif=args.avif,
+        force=args.force,
+        adopt=args.adopt,
+    )
+    print(f"\n  Encoded: {counts['encoded']}, failed: {counts['failed']}, "
+          f"up to date: {counts['planned'] - counts['encoded'] - counts['failed']}, pruned: {counts['pruned']}")
+    rename_media_refs(data_dir, CATEGORIES, previous_names, load_media_names(data_dir))
+
+    if not args.no_packs:
+        build_packs(data_dir, out_dir, data_dir / MEDIA_MANIFEST, cache_dir, force=args.force)
+    package_data(data_dir, cache_dir)
+    if counts["failed"]:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
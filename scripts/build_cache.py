@@ -0,0 +1,143 @@
+"""
+Content-hashed build cache for the data scripts.
+
+Each step (parse-excel, filter-no-media, ...) fingerprints its inputs and
+records the fingerprint plus the hash of every file it produced in
+.build-cache/build-state.json. On the next run a step whose inputs are
+unchanged and whose outputs are still byte-identical to what was recorded
+is skipped entirely. When a step does run, outputs are only rewritten if
+their content changed, atomically (temp file + rename), so unchanged files
+keep their mtime and clients keep their cached copies.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+STATE_FILENAME = "build-state.json"
+HASH_CHUNK = 1 << 20
+
+
+def sha256_bytes(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def sha256_file(path: str | Path) -> str | None:
+    h = hashlib.sha256()
+    try:
+        with open(path, "rb") as f:
+            for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+                h.update(chunk)
+    except FileNotFoundError:
+        return None
+    return h.hexdigest()
+
+
+def fingerprint(*parts) -> str:
+    """Combine input descriptions (strings, hashes, JSON-able values) into one hash."""
+    h = hashlib.sha256()
+    for part in parts:
+        if not isinstance(part, str):
+            part = json.dumps(part, sort_keys=True, ensure_ascii=False)
+        h.update(part.encode("utf-8"))
+        h.update(b"\0")
+    return h.hexdigest()
+
+
+def sources_fingerprint(*paths: str | Path) -> str:
+    """Fingerprint script sources, so editing a script invalidates its outputs."""
+    return fingerprint(*(sha256_file(p) or "" for p in paths))
+
+
+def write_atomic(path: str | Path, data: bytes) -> None:
+    path = Path(path)
+    tmp_path = path.with_name(f".{path.name}.tmp")
+    with open(tmp_path, "wb") as f:
+        f.write(data)
+    os.replace(tmp_path, path)
+
+
+class BuildCache:
+    """Per-step view of the shared build state."""
+
+    def __init__(self, cache_dir: str | Path, step: str, force: bool = False):
+        self.state_path = Path(cache_dir) / STATE_FILENAME
+        self.step = step
+        self.force = force
+        self.state = self._load()
+        self.outputs: set[str] = set()
+        self.rebuilt: list[str] = []
+        self.reused: list[str] = []
+
+    def _load(self) -> dict:
+        try:
+            with open(self.state_path, encoding="utf-8") as f:
+                state = json.load(f)
+        except (OSError, ValueError):
+            return {"steps": {}, "files": {}}
+        state.setdefault("steps", {})
+        state.setdefault("files", {})
+        return state
+
+    def _key(self, path: str | Path) -> str:
+        return str(Path(path).resolve())
+
+    def is_fresh(self, inputs: str) -> bool:
+        """True if inputs match the last run and every recorded output is untouched."""
+        if self.force:
+            return False
+        entry = self.state["steps"].get(self.step)
+        if not entry or entry.get("inputs") != inputs:
+            return False
+        files = self.state["files"]
+        for key in entry.get("outputs", []):
+            if sha256_file(key) != files.get(key):
+                return False
+        self.reused = [Path(key).name for key in entry.get("outputs", [])]
+        return True
+
+    def write(self, path: str | Path, text: str) -> bool:
+        """Write text to path only if its content changed. Returns True if written."""
+        return self.write_bytes(path, text.encode("utf-8"))
+
+    def write_bytes(self, path: str | Path, data: bytes) -> bool:
+        digest = sha256_bytes(data)
+        key = self._key(path)
+        self.outputs.add(key)
+        self.state["files"][key] = digest
+        if sha256_file(path) == digest:
+            self.reused.append(Path(path).name)
+            return False
+        write_atomic(path, data)
+        self.rebuilt.append(Path(path).name)
+        return True
+
+    def track(self, path: str | Path) -> None:
+        """Record an output that was left as-is this run (e.g. nothing to change)."""
+        key = self._key(path)
+        self.outputs.add(key)
+        digest = sha256_file(path)
+        if digest is not None:
+            self.state["files"][key] = digest
+        self.reused.append(Path(path).name)
+
+    def forget(self, path: str | Path) -> None:
+        key = self._key(path)
+        self.outputs.discard(key)
+        self.state["files"].pop(key, None)
+
+    def commit(self, inputs: str) -> None:
+        self.state["steps"][self.step] = {
+            "inputs": inputs,
+            "outputs": sorted(self.outputs),
+        }
+        self.state_path.parent.mkdir(parents=True, exist_ok=True)
+        write_atomic(self.state_path, json.dumps(self.state, indent=2).encode("utf-8"))
+
+    def report(self) -> None:
+        print(f"\n  Build cache [{self.step}]: {len(self.rebuilt)} rebuilt, {len(self.reused)} reused")
+        if self.rebuilt:
+            print(f"    rebuilt: {', '.join(self.rebuilt)}")
+        if self.reused:
+            print(f"    reused:  {', '.join(self.reused)}")
@@ -0,0 +1,131 @@
+"""
+Stage timers, counters and peak memory for the data scripts.
+
+parse-excel.py, build-data.py, filter-no-media.py and translate-questions.py
+keep one Metrics per run:
+
+  with metrics.stage("parse", profile=True):
+      ...
+  metrics.count("rows_read", len(rows))
+
+finish() prints the stage timings and counters after the script's own
+progress output and, with --metrics-json PATH, writes them for build logs:
+
+  {"version": 1, "script": "parse-excel", "started": "2026-01-01T12:00:00+00:00",
+   "seconds": 12.3, "peakRssMb": 85.1,
+   "stages": {"parse": {"seconds": 9.8, "calls": 1}, ...},
+   "counters": {"rows_read": 3719, "media_lookups": 2890, ...}}
+
+With --profile, stages opened with profile=True (the slow ones: parsing,
+filtering, translation, writing) run under cProfile. Their stats are dumped
+to .build-cache/profiles/{script}-{stage}.prof (python3 -m pstats FILE) and
+the top functions by cumulative time are printed.
+"""
+
+import argparse
+import cProfile
+import datetime
+import json
+import pstats
+import resource
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+from build_cache import write_atomic
+
+METRICS_VERSION = 1
+PROFILE_DIRNAME = "profiles"
+PROFILE_TOP = 15
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far, in MB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1 << 20) if sys.platform == "darwin" else peak / 1024
+
+
+def add_metrics_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument("--metrics-json", metavar="PATH", help="Write stage timings, counters and peak memory as JSON")
+    parser.add_argument("--profile", action="store_true",
+                        help="Run the slow stages under cProfile (stats in .build-cache/profiles/)")
+
+
+class Metrics:
+    def __init__(self, script: str, profile_dir: str | Path | None = None):
+        """profile_dir enables profiling of stages opened with profile=True."""
+        self.script = script
+        self.profile_dir = Path(profile_dir) if profile_dir else None
+        self.started = datetime.datetime.now(datetime.timezone.utc)
+        self.start = time.perf_counter()
+        self.stages: dict[str, dict] = {}
+        self.counters: dict[str, int] = {}
+        self._profiling = False
+
+    @contextmanager
+    def stage(self, name: str, profile: bool = False):
+        """Time a stage; repeated stages accumulate."""
+        profiler = None
+        if profile and self.profile_dir and not self._profiling:
+            profiler = cProfile.Profile()
+            self._profiling = True
+            profiler.enable()
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            elapsed = time.perf_counter() - start
+            entry = self.stages.setdefault(name, {"seconds": 0.0, "calls": 0})
+            entry["seconds"] += elapsed
+            entry["calls"] += 1
+            if profiler is not None:
+                profiler.disable()
+                self._profiling = False
+                self._dump_profile(name, profiler)
+
+    def _dump_profile(self, name: str, profiler: cProfile.Profile) -> None:
+        self.profile_dir.mkdir(parents=True, exist_ok=True)
+        path = self.profile_dir / f"{self.script}-{name}.prof"
+        profiler.dump_stats(path)
+        print(f"\n  Profile [{name}] → {path}")
+        pstats.Stats(profiler, stream=sys.stdout).sort_stats("cumulative").print_stats(PROFILE_TOP)
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    def count_build_cache(self, cache) -> None:
+        """Output files a BuildCache rewrote vs found unchanged."""
+        self.count("outputs_rebuilt", len(cache.rebuilt))
+        self.count("outputs_reused", len(cache.reused))
+
+    def report(self) -> dict:
+        return {
+            "version": METRICS_VERSION,
+            "script": self.script,
+            "started": self.started.isoformat(timespec="seconds"),
+            "seconds": round(time.perf_counter() - self.start, 4),
+            "peakRssMb": round(peak_rss_mb(), 1),
+            "stages": {
+                name: {"seconds": round(entry["seconds"], 4), "calls": entry["calls"]}
+                for name, entry in self.stages.items()
+            },
+            "counters": dict(self.counters),
+        }
+
+    def finish(self, json_path: str | Path | None = None) -> dict:
+        """Print the summary and write the JSON report if requested."""
+        report = self.report()
+        stages = ", ".join(f"{name} {entry['seconds']:.2f} s" for name, entry in report["stages"].items())
+        print(f"\n  Metrics [{self.script}]: {report['seconds']:.2f} s, peak RSS {report['peakRssMb']:.1f} MB")
+        if stages:
+            print(f"    stages:   {stages}")
+        if report["counters"]:
+            print(f"    counters: {', '.join(f'{name} {value}' for name, value in report['counters'].items())}")
+        if json_path:
+            json_path = Path(json_path)
+            json_path.parent.mkdir(parents=True, exist_ok=True)
+            write_atomic(json_path, (json.dumps(report, indent=2) + "\n").encode("utf-8"))
+            print(f"    written:  {json_path}")
+        return report
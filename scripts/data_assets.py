@@ -0,0 +1,135 @@
+"""
+Deployable src/data assets: minified JSON, precompressed siblings and an
+asset manifest.
+
+Every data script writes minified JSON (dump_min). package_data() then, for
+each src/data/*.json:
+
+  - re-minifies it if some other tool left whitespace in it,
+  - writes {name}.json.gz (gzip -9) and {name}.json.br (brotli q11, when the
+    optional ``brotli`` package is installed) for hosts that serve
+    precompressed files,
+  - records its SHA-256 and sizes in asset-manifest.json:
+
+      {"version": 1, "files": {"B.json": {"sha256": "...", "size": 123,
+                                           "gz": 45, "br": 40}, ...}}
+
+The client fetches the manifest first and requests data files as
+``data/B.json?v=<hash prefix>``, so the service worker can serve cached
+copies without revalidating them and never has to diff response bodies.
+
+When release-diff.py has written patches/index.json, the manifest also
+advertises it with its hash prefix, ``"patches": {"index": "<hash prefix>"}``.
+Clients only look for release patches then, and fetch the index once per
+version.
+"""
+
+import gzip
+import json
+import os
+from pathlib import Path
+
+from build_cache import BuildCache, fingerprint, sha256_bytes, sha256_file, sources_fingerprint
+
+try:
+    import brotli
+except ImportError:  # Optional: only .gz siblings are produced without it
+    brotli = None
+
+ASSET_MANIFEST = "asset-manifest.json"
+MANIFEST_VERSION = 1
+COMPRESSED_SUFFIXES = (".gz", ".br")
+PATCH_INDEX = Path("patches") / "index.json"  # Written by release-diff.py
+HASH_PREFIX = 16
+SOURCES = ["data_assets.py", "build_cache.py"]
+
+
+def dump_min(data) -> str:
+    """Serialize data files compactly (no indentation, no spaces after separators)."""
+    return json.dumps(data, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def data_files(data_dir: Path) -> list[Path]:
+    return sorted(p for p in data_dir.glob("*.json") if p.name != ASSET_MANIFEST)
+
+
+def compress_gzip(data: bytes) -> bytes:
+    # mtime=0 keeps the output byte-identical across rebuilds
+    return gzip.compress(data, compresslevel=9, mtime=0)
+
+
+def compress_brotli(data: bytes) -> bytes:
+    return brotli.compress(data, quality=11)
+
+
+def patch_index_hash(data_dir: Path) -> str | None:
+    path = data_dir / PATCH_INDEX
+    return sha256_file(path)[:HASH_PREFIX] if path.exists() else None
+
+
+def assets_fingerprint(data_dir: Path) -> str:
+    return fingerprint(
+        [(p.name, sha256_file(p)) for p in data_files(data_dir)],
+        patch_index_hash(data_dir),
+        brotli is not None,
+        sources_fingerprint(*(Path(__file__).resolve().parent / name for name in SOURCES)),
+    )
+
+
+def package_assets(data_dir: Path, cache: BuildCache) -> dict:
+    """Minify, compress and hash every data file; returns the asset manifest."""
+    files = {}
+    for path in data_files(data_dir):
+        raw = path.read_bytes()
+        minified = dump_min(json.loads(raw)).encode("utf-8")
+        if minified != raw:
+            print(f"  minified {path.name}: {len(raw)} -> {len(minified)} bytes")
+        cache.write_bytes(path, minified)
+
+        entry = {"sha256": sha256_bytes(minified), "size": len(minified)}
+        gz = compress_gzip(minified)
+        cache.write_bytes(path.with_name(path.name + ".gz"), gz)
+        entry["gz"] = len(gz)
+        br_path = path.with_name(path.name + ".br")
+        if brotli is not None:
+            br = compress_brotli(minified)
+            cache.write_bytes(br_path, br)
+            entry["br"] = len(br)
+        elif br_path.exists():
+            br_path.unlink()  # Stale: can't regenerate it for the new content
+        files[path.name] = entry
+
+    # Drop siblings of data files that no longer exist (e.g. after a layout switch)
+    for suffix in COMPRESSED_SUFFIXES:
+        for sibling in data_dir.glob(f"*.json{suffix}"):
+            if sibling.name[: -len(suffix)] not in files:
+                cache.forget(sibling)
+                sibling.unlink()
+
+    manifest = {"version": MANIFEST_VERSION, "files": files}
+    patch_index = patch_index_hash(data_dir)
+    if patch_index:
+        manifest["patches"] = {"index": patch_index}
+    cache.write(data_dir / ASSET_MANIFEST, json.dumps(manifest, indent=2) + "\n")
+    return manifest
+
+
+def package_data(data_dir: str | Path, cache_dir: str | Path, force: bool = False) -> dict | None:
+    """Run the packaging step over data_dir (skipped when nothing changed)."""
+    data_dir = Path(data_dir)
+    cache = BuildCache(cache_dir, "package-data", force=force)
+    if cache.is_fresh(assets_fingerprint(data_dir)):
+        return None
+
+    print(f"\nPackaging {data_dir.name} assets ...")
+    if brotli is None:
+        print("  WARNING: brotli not installed — writing .gz siblings only (pip install brotli)")
+    manifest = package_assets(data_dir, cache)
+    total = sum(entry["size"] for entry in manifest["files"].values())
+    total_gz = sum(entry["gz"] for entry in manifest["files"].values())
+    print(f"  {len(manifest['files'])} files, {total} bytes ({total_gz} gzipped) → {ASSET_MANIFEST}")
+
+    # Fingerprint the packaged result, so an immediate re-run is a no-op
+    cache.commit(assets_fingerprint(data_dir))
+    cache.report()
+    return manifest
@@ -0,0 +1,63 @@
+"""
+Exam sampling index for src/data.
+
+An exam draws 20 basic and 12 specialist questions from one category. The
+build already knows those partitions, so it writes them once:
+
+  src/data/exam-index.json
+    {"version": 1, "categories": {"B": {"basic": {"image": [ids], "video": [ids], "none": [ids]},
+                                         "specialist": {...}}, ...}}
+
+Id lists keep sheet order within each media type. meta.json carries the
+pool sizes per category ("pools", same shape with counts), so exam.js can
+draw ids by partial Fisher–Yates over the pools and hydrate only the
+questions it picked.
+"""
+
+import json
+from pathlib import Path
+
+EXAM_INDEX_FILENAME = "exam-index.json"
+EXAM_INDEX_VERSION = 1
+POOLS = ("basic", "specialist")
+MEDIA_SPLITS = ("image", "video", "none")
+
+
+def category_pools(questions: list[dict]) -> dict:
+    """{pool: {media type: [ids]}} for one category's questions."""
+    pools = {pool: {split: [] for split in MEDIA_SPLITS} for pool in POOLS}
+    for q in questions:
+        pools[q["type"]].setdefault(q["mediaType"] or "none", []).append(q["id"])
+    return pools
+
+
+def pool_sizes(pools: dict) -> dict:
+    return {pool: {split: len(ids) for split, ids in splits.items()} for pool, splits in pools.items()}
+
+
+def build_exam_index(cat_questions: dict[str, list]) -> dict:
+    return {
+        "version": EXAM_INDEX_VERSION,
+        "categories": {cat: category_pools(questions) for cat, questions in cat_questions.items()},
+    }
+
+
+def prune_exam_index(index: dict, removed_ids: set[str]) -> int:
+    """Drop removed question ids from every pool; returns ids dropped."""
+    dropped = 0
+    for pools in index["categories"].values():
+        for splits in pools.values():
+            for split, ids in splits.items():
+                kept = [qid for qid in ids if str(qid) not in removed_ids]
+                dropped += len(ids) - len(kept)
+                splits[split] = kept
+    return dropped
+
+
+def load_exam_index(data_dir: str | Path) -> dict | None:
+    try:
+        with open(Path(data_dir) / EXAM_INDEX_FILENAME, encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return index if index.get("version") == EXAM_INDEX_VERSION else None
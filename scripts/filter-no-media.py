@@ -12,78 +12,67 @@ Patterns detected (Polish driving exam questions):
 - "tak oznakow/oznacz" (marked like this)
 - "na zdjęciu", "na fotografii", "na ilustracji", "na rysunku", "na filmie"
 - Demonstrative references: "tego znaku", "tym sygnale", "takim/takiej"
+
+The patterns live in media_filter.py. build-data.py applies the same filter
+in memory during the build; this script is the post-pass for JSON that was
+produced by parse-excel.py alone. Each unique question text is classified
+once (verdicts are cached by text hash in .build-cache/), and a per-pattern
+hit/timing report is printed (every pattern with --verbose).
+
+When the columnar question table (question_table.py) written by parse-excel.py
+still matches src/data, each unique question is checked once from the table
+and the category files are regenerated from it instead of being re-parsed.
+Removed questions are also dropped from the exam sampling index
+(exam_index.py) and its pool sizes in meta.json.
+
+Stage timings, counters and peak memory are printed at the end (see
+build_metrics.py); --metrics-json PATH writes them as JSON and --profile runs
+the filter stage under cProfile.
 """
 
+import argparse
 import json
 import os
-import re
-import sys
 
-# Path configuration
-DATA_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src", "data")
-CATEGORIES = ["A", "A1", "A2", "AM", "B", "B1", "C", "C1", "D", "D1", "PT", "T"]
+from build_cache import BuildCache, fingerprint, sha256_file, sources_fingerprint
+from build_metrics import PROFILE_DIRNAME, Metrics, add_metrics_args
+from data_assets import dump_min, package_data
+from exam_index import EXAM_INDEX_FILENAME, load_exam_index, pool_sizes, prune_exam_index
+from media_filter import MEDIA_REFERENCE_PATTERNS, VERDICTS_FILENAME, MediaClassifier, filter_missing_media
+from question_store import STORE_FILENAME, build_store, category_ids, expand_category, is_normalized, load_store
+from question_table import TABLE_FILENAME, build_table, dump_table, load_table, table_categories, table_questions
+from search_index import build_search
 
-# Patterns that indicate a question references visual media content.
-# These are Polish phrases commonly used in driving exam questions that refer
-# to an image, video, or visual scenario the test-taker should be looking at.
-MEDIA_REFERENCE_PATTERNS = [
-    # Direct situational references (the question describes "this situation"
-    # which is shown in an accompanying image/video)
-    r"[Ww] tej sytuacji",
-    r"[Ww] przedstawionej sytuacji",
-    r"[Ww] takiej sytuacji",
-    r"[Ww] takim terenie",
-
-    # References to media types
-    r"na zdjęciu",          # in the photo
-    r"na fotografii",       # in the photograph
-    r"na ilustracji",       # in the illustration
-    r"na rysunku",          # in the drawing
-    r"na filmie",           # in the film/video
-    r"na widocznym",        # on the visible [element]
-
-    # "marked/signed like this" -- refers to a sign/marking shown in media
-    r"tak oznakow",         # tak oznakowanej/oznakowanym/oznakowanego
-    r"tak oznacz",          # tak oznaczonym/oznaczonej/oznaczonego
-
-    # Demonstrative references implying a visual element
-    r"takim odcinku",       # such a section [of road]
-    r"takiej drod",         # such a road
-    r"takim skrzyżowaniu",  # such an intersection
-    r"na takiej autostradzie",  # on such a motorway
-    r"na takiej drodze",    # on such a road
-    r"tego znaku",          # this sign
-    r"tym sygnale",         # this signal
-
-    # "widoczny/widoczna/widoczne + noun" -- refers to a visible element
-    # shown in the accompanying media. We use compound patterns to avoid
-    # matching generic uses like "widoczność drogi" (road visibility) or
-    # "niewidoczna" (invisible).
-    r"widoczn\w+ znak",     # visible sign(s)
-    r"widoczn\w+ słupk",    # visible post
-    r"widoczn\w+ lini",     # visible line
-    r"widoczn\w+ pojazd",   # visible vehicle
-    r"widoczn\w+ przejazd", # visible [railway] crossing
-    r"widoczn\w+ przejści", # visible [pedestrian] crossing
-    r"widoczn\w+ przystan", # visible [bus/tram] stop
-    r"widoczn\w+ po lewej", # visible on the left
-    r"widoczn\w+ po prawej",# visible on the right
-    r"widoczn\w+ zakręt",   # visible curve
+# Path configuration
+SCRIPTS_DIR = os.path.dirname(os.path.abspath(__file__))
+PROJECT_ROOT = os.path.dirname(SCRIPTS_DIR)
+DATA_DIR = os.path.join(PROJECT_ROOT, "src", "data")
+CACHE_DIR = os.path.join(PROJECT_ROOT, ".build-cache")
+SOURCES = [
+    "filter-no-media.py",
+    "media_filter.py",
+    "question_store.py",
+    "question_table.py",
+    "build_cache.py",
+    "data_assets.py",
+    "exam_index.py",
 ]
-
-# Compile into a single regex for efficiency
-MEDIA_REFERENCE_REGEX = re.compile("|".join(MEDIA_REFERENCE_PATTERNS), re.IGNORECASE)
-
-
-def question_needs_media(question_text: str) -> bool:
-    """Check if a question's text implies it should have accompanying media."""
-    return bool(MEDIA_REFERENCE_REGEX.search(question_text))
+CATEGORIES = ["A", "A1", "A2", "AM", "B", "B1", "C", "C1", "D", "D1", "PT", "T"]
 
 
-def process_category(category_id: str, dry_run: bool = False) -> dict:
+def process_category(
+    category_id: str,
+    cache: BuildCache,
+    dry_run: bool = False,
+    store: dict | None = None,
+    classifier: MediaClassifier | None = None,
+) -> dict:
     """
     Process a single category JSON file.
 
+    Normalized category files (id lists) are joined with ``store`` first and
+    written back as id lists.
+
     Returns a dict with:
         - category: category ID
         - original_count: number of questions before filtering
@@ -98,26 +87,26 @@ def process_category(category_id: str, dry_run: bool = False) -> dict:
     with open(filepath, "r", encoding="utf-8") as f:
         data = json.load(f)
 
+    normalized = is_normalized(data)
+    if normalized:
+        data = expand_category(data, store)
+
     questions = data["questions"]
     original_count = len(questions)
 
-    kept = []
-    removed = []
-
-    for q in questions:
-        if q["media"] is None and question_needs_media(q["q"]):
-            removed.append(q)
-        else:
-            kept.append(q)
+    kept, removed = filter_missing_media(questions, classifier)
 
     removed_basic = sum(1 for q in removed if q["type"] == "basic")
     removed_specialist = sum(1 for q in removed if q["type"] == "specialist")
 
-    if not dry_run and removed:
-        data["questions"] = kept
-        with open(filepath, "w", encoding="utf-8") as f:
-            json.dump(data, f, ensure_ascii=False, indent=2)
-            f.write("\n")
+    if not dry_run:
+        if not removed:
+            cache.track(filepath)
+        elif normalized:
+            cache.write(filepath, dump_min(category_ids(category_id, kept)))
+        else:
+            data["questions"] = kept
+            cache.write(filepath, dump_min(data))
 
     return {
         "category": category_id,
@@ -130,8 +119,104 @@ def process_category(category_id: str, dry_run: bool = False) -> dict:
     }
 
 
-def update_meta(results: list[dict], dry_run: bool = False) -> None:
-    """Update meta.json with the new question counts after filtering."""
+def filter_table(
+    table: dict,
+    cache: BuildCache,
+    dry_run: bool = False,
+    classifier: MediaClassifier | None = None,
+) -> tuple[list[dict], dict]:
+    """
+    Filter every category from the question table, checking each row once.
+
+    Writes the category files and the store (normalized layout); returns
+    per-category results shaped like process_category() and the pruned table,
+    which the caller writes once meta.json is up to date.
+    """
+    questions = table_questions(table)
+    kept, removed = filter_missing_media(questions, classifier)
+    removed_ids = {id(q) for q in removed}
+    store_path = os.path.join(DATA_DIR, STORE_FILENAME)
+    normalized = os.path.exists(store_path)
+
+    results = []
+    kept_by_cat = {}
+    for cat_id, cat_questions in table_categories(table, questions).items():
+        filepath = os.path.join(DATA_DIR, f"{cat_id}.json")
+        cat_kept = [q for q in cat_questions if id(q) not in removed_ids]
+        cat_removed = [q for q in cat_questions if id(q) in removed_ids]
+        kept_by_cat[cat_id] = cat_kept
+
+        if not dry_run:
+            if not cat_removed:
+                cache.track(filepath)
+            elif normalized:
+                cache.write(filepath, dump_min(category_ids(cat_id, cat_kept)))
+            else:
+                data = {"category": cat_id, "questions": cat_kept}
+                cache.write(filepath, dump_min(data))
+
+        results.append({
+            "category": cat_id,
+            "original_count": len(cat_questions),
+            "removed_count": len(cat_removed),
+            "remaining_count": len(cat_kept),
+            "removed_basic": sum(1 for q in cat_removed if q["type"] == "basic"),
+            "removed_specialist": sum(1 for q in cat_removed if q["type"] == "specialist"),
+            "removed_questions": [(q["id"], q["q"][:80]) for q in cat_removed],
+        })
+
+    print(f"  {TABLE_FILENAME}: {len(removed)} of {len(questions)} unique questions need missing media")
+    if normalized and not dry_run:
+        if removed:
+            store = build_store(kept)
+            print(f"  {STORE_FILENAME}: removed {len(questions) - len(store['questions'])} questions "
+                  f"-> {len(store['questions'])} remaining")
+            cache.write(store_path, dump_min(store))
+        else:
+            cache.track(store_path)
+    return results, build_table(kept, kept_by_cat, table["categories"])
+
+
+def prune_store(store: dict, results: list[dict], cache: BuildCache, dry_run: bool = False) -> None:
+    """Drop filtered-out questions from the shared store (normalized layout)."""
+    store_path = os.path.join(DATA_DIR, STORE_FILENAME)
+    removed_ids = {str(qid) for r in results for qid, _text in r["removed_questions"]}
+    if not removed_ids:
+        if not dry_run:
+            cache.track(store_path)
+        return
+    for qid in removed_ids:
+        store["questions"].pop(qid, None)
+    print(f"  {STORE_FILENAME}: removed {len(removed_ids)} questions -> {len(store['questions'])} remaining")
+    if not dry_run:
+        cache.write(store_path, dump_min(store))
+
+
+def update_exam_index(results: list[dict], cache: BuildCache, dry_run: bool = False) -> dict | None:
+    """Drop filtered-out questions from the exam sampling index, if there is one."""
+    index_path = os.path.join(DATA_DIR, EXAM_INDEX_FILENAME)
+    index = load_exam_index(DATA_DIR)
+    if index is None:
+        return None
+    removed_ids = {str(qid) for r in results for qid, _text in r["removed_questions"]}
+    dropped = prune_exam_index(index, removed_ids)
+    if dropped:
+        print(f"  {EXAM_INDEX_FILENAME}: removed {dropped} pool entries")
+    if not dry_run:
+        if dropped:
+            cache.write(index_path, dump_min(index))
+        else:
+            cache.track(index_path)
+    return index
+
+
+def update_meta(
+    results: list[dict],
+    cache: BuildCache,
+    dry_run: bool = False,
+    exam_index: dict | None = None,
+) -> None:
+    """Update meta.json with the new question counts (and exam pool sizes) after filtering."""
     meta_path = os.path.join(DATA_DIR, "meta.json")
 
     with open(meta_path, "r", encoding="utf-8") as f:
@@ -161,29 +246,71 @@ def update_meta(results: list[dict], dry_run: bool = False) -> None:
             cat_meta["questionCount"] = new_total
             cat_meta["basicCount"] = new_basic
             cat_meta["specialistCount"] = new_specialist
+            if exam_index is not None and cat_id in exam_index["categories"]:
+                cat_meta["pools"] = pool_sizes(exam_index["categories"][cat_id])
 
     if not dry_run:
-        with open(meta_path, "w", encoding="utf-8") as f:
-            json.dump(meta, f, ensure_ascii=False, indent=2)
-            f.write("\n")
+        cache.write(meta_path, dump_min(meta))
+
+
+def data_fingerprint() -> str:
+    """Fingerprint the filter's inputs: data files, pattern set and script sources."""
+    data_files = [f"{cat}.json" for cat in CATEGORIES] + ["meta.json", STORE_FILENAME, EXAM_INDEX_FILENAME]
+    return fingerprint(
+        [(name, sha256_file(os.path.join(DATA_DIR, name))) for name in data_files],
+        MEDIA_REFERENCE_PATTERNS,
+        sources_fingerprint(*(os.path.join(SCRIPTS_DIR, name) for name in SOURCES)),
+    )
 
 
 def main():
-    dry_run = "--dry-run" in sys.argv
-    verbose = "--verbose" in sys.argv or "-v" in sys.argv
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--dry-run", action="store_true", help="Report what would be removed without writing files")
+    parser.add_argument("--verbose", "-v", action="store_true", help="List removed questions and every pattern")
+    parser.add_argument("--force", action="store_true", help="Filter even if the data is unchanged since the last run")
+    add_metrics_args(parser)
+    args = parser.parse_args()
+    dry_run, verbose, force = args.dry_run, args.verbose, args.force
+    metrics_json = args.metrics_json
+    metrics = Metrics("filter-no-media", os.path.join(CACHE_DIR, PROFILE_DIRNAME) if args.profile else None)
 
     if dry_run:
         print("=== DRY RUN MODE (no files will be modified) ===\n")
 
-    print("Filtering questions with missing media from category JSON files...\n")
+    # The filter is idempotent: if the data is exactly what the last run left
+    # behind and the patterns are unchanged, there is nothing to do.
+    cache = BuildCache(CACHE_DIR, "filter-no-media", force=force)
+    with metrics.stage("fingerprint"):
+        fresh = not dry_run and cache.is_fresh(data_fingerprint())
+    if fresh:
+        print("Data files and patterns unchanged since last filter run — nothing to do.")
+        cache.report()
+        metrics.count_build_cache(cache)
+        metrics.finish(metrics_json)
+        return
+
+    with metrics.stage("load"):
+        classifier = MediaClassifier(cache_path=os.path.join(CACHE_DIR, VERDICTS_FILENAME))
+        table_path = os.path.join(CACHE_DIR, TABLE_FILENAME)
+        table = load_table(table_path, DATA_DIR)
+        store = None if table is not None else load_store(DATA_DIR)
+    with metrics.stage("filter", profile=True):
+        if table is not None:
+            print(f"Filtering questions with missing media using {TABLE_FILENAME}...\n")
+            results, pruned_table = filter_table(table, cache, dry_run=dry_run, classifier=classifier)
+        else:
+            print("Filtering questions with missing media from category JSON files...\n")
+            results = [
+                process_category(cat_id, cache, dry_run=dry_run, store=store, classifier=classifier)
+                for cat_id in CATEGORIES
+            ]
+        classifier.save()
 
-    results = []
     total_removed = 0
     total_original = 0
 
-    for cat_id in CATEGORIES:
-        result = process_category(cat_id, dry_run=dry_run)
-        results.append(result)
+    for result in results:
+        cat_id = result["category"]
         total_removed += result["removed_count"]
         total_original += result["original_count"]
 
@@ -199,16 +326,39 @@ def main():
     print(f"\n{'='*60}")
     print(f"  TOTAL: removed {total_removed} questions out of {total_original}")
     print(f"  Remaining: {total_original - total_removed}")
-    print(f"{'='*60}")
-
-    # Update meta.json
-    print("\nUpdating meta.json...")
-    update_meta(results, dry_run=dry_run)
+    print(f"{'='*60}\n")
+    classifier.report(verbose=verbose)
+    metrics.count("questions_checked", total_original)
+    metrics.count("questions_removed", total_removed)
+    metrics.count("texts_classified", classifier.texts)
+    metrics.count("verdicts_cached", classifier.cached)
+
+    with metrics.stage("meta"):
+        if store is not None:
+            print(f"\nUpdating {STORE_FILENAME}...")
+            prune_store(store, results, cache, dry_run=dry_run)
+
+        # Update the exam sampling index and meta.json
+        print("\nUpdating meta.json...")
+        exam_index = update_exam_index(results, cache, dry_run=dry_run)
+        update_meta(results, cache, dry_run=dry_run, exam_index=exam_index)
+
+        if table is not None and not dry_run:
+            cache.write(table_path, dump_table(pruned_table, DATA_DIR))
 
     if dry_run:
         print("\n(Dry run complete -- no files were modified)")
     else:
+        # Fingerprint the filtered result, so an immediate re-run is a no-op
+        cache.commit(data_fingerprint())
+        cache.report()
+        metrics.count_build_cache(cache)
+        with metrics.stage("search-index"):
+            build_search(DATA_DIR, CACHE_DIR, force=force)
+        with metrics.stage("package"):
+            package_data(DATA_DIR, CACHE_DIR, force=force)
         print("\nDone. All files updated successfully.")
+    metrics.finish(metrics_json)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,417 @@
+"""
+Incremental media transcoding driven by the media index.
+
+Every source file in the media index (media_index.py) whose extension is in
+MEDIA_EXT_MAP becomes one encode job: WMV → MP4 (ffmpeg, libx264 by default)
+and JPG → WebP (cwebp). Jobs run on a ProcessPoolExecutor sized to the
+machine's cores; each worker shells out to the encoder and writes through a
+temp file, so an interrupted run never leaves truncated outputs.
+
+.build-cache/media-state.json remembers, per output, the SHA-256 of the
+source it was built from and the encoder settings used. A job is skipped when
+both still match and the output exists, so an updated source (or changed
+settings) is re-encoded and nothing else is. Outputs whose source disappeared
+from the index are deleted. ``adopt`` keeps existing outputs that have no
+state yet instead of re-encoding them (only their derived files are built).
+
+Images additionally get downscaled width variants (IMAGE_WIDTHS, only those
+narrower than the source) as foo.w480.webp, and with ``avif`` also AVIF
+copies of every size (foo.avif, foo.w480.avif, encoded by ffmpeg/libaom).
+
+The result is summarized in src/data/media-manifest.json (shown here keyed
+by output name; see the end of this docstring):
+
+  {"version": 1, "files": {
+    "foo.webp": {"type": "image", "size": 12345, "width": 1280, "height": 720,
+                 "variants": [{"file": "foo.w480.webp", "format": "webp",
+                               "width": 480, "height": 270, "size": 2345}, ...]},
+    "bar.mp4": {"type": "video", "size": 456789, "width": 1024, "height": 576,
+                "duration": 12.48}}}
+
+Variants are sorted by width and include the full-size file, so the client
+can pick the smallest one that fits the viewport (see src/js/media.js).
+
+Videos additionally get a poster (first frame, bar.poster.webp) and a
+low-bitrate preview rendition (bar.preview.mp4), both made from the encoded
+MP4 and recorded on its entry:
+
+  "bar.mp4": {..., "poster": {"file": "bar.poster.webp", "size": 8123,
+                              "width": 1024, "height": 576},
+                   "preview": {"file": "bar.preview.mp4", "size": 61234,
+                               "width": 512, "height": 288}}
+
+The renderer shows the poster at once and plays the preview while the full
+file buffers.
+
+Every output is then stored once more under its content hash (see
+media_dedup.py), and the manifest written is keyed by those object names,
+with variant, poster and preview file names renamed the same way.
+"""
+
+import json
+import os
+import shutil
+import subprocess
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from pathlib import Path
+
+from build_cache import fingerprint, write_atomic
+from data_assets import dump_min
+from media_dedup import dedup_media, write_media_names
+from pipeline import MEDIA_EXT_MAP
+
+STATE_FILENAME = "media-state.json"
+MEDIA_MANIFEST = "media-manifest.json"
+STATE_VERSION = 1
+MANIFEST_VERSION = 1
+
+OUTPUT_SUBDIRS = {"video": "vid", "image": "img"}
+VIDEO_ENCODERS = ("libx264", "h264_videotoolbox")
+
+# Keep within 1024x576 (even dimensions, required by yuv420p)
+VIDEO_SCALE = "scale='trunc(min(1024,iw)/2)*2':'trunc(min(576,ih)/2)*2'"
+VIDEO_QUALITY = {
+    "libx264": ["-preset", "slow", "-crf", "28"],
+    "h264_videotoolbox": ["-q:v", "65"],
+}
+# Preview rendition: half size, low bitrate, same encoder as the full video
+PREVIEW_SCALE = "scale='trunc(min(512,iw)/2)*2':-2"
+PREVIEW_QUALITY = {
+    "libx264": ["-preset", "slow", "-crf", "36"],
+    "h264_videotoolbox": ["-q:v", "35"],
+}
+POSTER_QUALITY = 75
+IMAGE_QUALITY = 80
+IMAGE_WIDTHS = (360, 540, 720, 960)
+AVIF_QUALITY = ["-crf", "32", "-cpu-used", "6"]
+
+
+# ---------------------------------------------------------------------------
+# Jobs
+# ---------------------------------------------------------------------------
+def encoder_settings(options: dict) -> dict:
+    """Settings recorded per output; changing any of them forces a re-encode."""
+    video_encoder = options["videoEncoder"]
+    return {
+        "video": [
+            "ffmpeg", video_encoder, VIDEO_SCALE, *VIDEO_QUALITY[video_encoder],
+            POSTER_QUALITY, PREVIEW_SCALE, *PREVIEW_QUALITY[video_encoder],
+        ],
+        "image": ["cwebp", IMAGE_QUALITY, IMAGE_WIDTHS, options["avif"] and AVIF_QUALITY],
+    }
+
+
+def plan_jobs(media_index: dict, out_dir: Path, kinds: set[str]) -> list[dict]:
+    """One job per convertible source file in the index."""
+    jobs = []
+    for entry in media_index["files"].values():
+        source = entry["name"]
+        stem, ext = os.path.splitext(source)
+        mapping = MEDIA_EXT_MAP.get(ext.lower())
+        if mapping is None or mapping[1] not in kinds:
+            continue
+        target_ext, kind = mapping
+        output = stem + target_ext
+        jobs.append({
+            "kind": kind,
+            "source": os.path.join(media_index["dir"], source),
+            "sourceHash": entry["sha256"],
+            "output": output,
+            "path": str(out_dir / OUTPUT_SUBDIRS[kind] / output),
+        })
+    return sorted(jobs, key=lambda job: job["output"])
+
+
+def encode_command(job: dict, tmp_path: str, options: dict) -> list[str]:
+    if job["kind"] == "video":
+        video_encoder = options["videoEncoder"]
+        return [
+            "ffmpeg", "-y", "-v", "error", "-i", job["source"],
+            "-c:v", video_encoder, *VIDEO_QUALITY[video_encoder],
+            "-vf", VIDEO_SCALE, "-pix_fmt", "yuv420p",
+            "-threads", str(options["threads"]),
+            "-movflags", "+faststart", "-an",
+            "-f", "mp4", tmp_path,
+        ]
+    return ["cwebp", "-quiet", "-q", str(IMAGE_QUALITY), job["source"], "-o", tmp_path]
+
+
+def variant_command(job: dict, tmp_path: str, fmt: str, width: int | None, options: dict) -> list[str]:
+    if fmt == "webp":
+        return ["cwebp", "-quiet", "-q", str(IMAGE_QUALITY), "-resize", str(width), "0", job["source"], "-o", tmp_path]
+    scale = ["-vf", f"scale={width}:-2"] if width else []
+    return [
+        "ffmpeg", "-y", "-v", "error", "-i", job["source"], *scale,
+        "-c:v", "libaom-av1", *AVIF_QUALITY, "-still-picture", "1",
+        "-threads", str(options["threads"]),
+        "-f", "avif", tmp_path,
+    ]
+
+
+def rendition_command(path: Path, tmp_path: str, rendition: str, options: dict) -> list[str]:
+    """Poster frame or preview clip, made from the encoded MP4."""
+    if rendition == "poster":
+        return [
+            "ffmpeg", "-y", "-v", "error", "-i", str(path),
+            "-frames:v", "1", "-c:v", "libwebp", "-quality", str(POSTER_QUALITY),
+            "-f", "webp", tmp_path,
+        ]
+    video_encoder = options["videoEncoder"]
+    return [
+        "ffmpeg", "-y", "-v", "error", "-i", str(path),
+        "-c:v", video_encoder, *PREVIEW_QUALITY[video_encoder],
+        "-vf", PREVIEW_SCALE, "-pix_fmt", "yuv420p",
+        "-threads", str(options["threads"]),
+        "-movflags", "+faststart", "-an",
+        "-f", "mp4", tmp_path,
+    ]
+
+
+def encode_to(path: Path, command_for) -> str | None:
+    """Run command_for(tmp_path) and move the result into place; returns an error or None."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = str(path.with_name(f".{path.name}.tmp"))
+    command = command_for(tmp_path)
+    result = subprocess.run(command, stdin=subprocess.DEVNULL, capture_output=True, text=True)
+    if result.returncode != 0 or not os.path.exists(tmp_path):
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        error = (result.stderr or result.stdout).strip().splitlines()
+        return error[-1] if error else f"{command[0]} exited with {result.returncode}"
+    os.replace(tmp_path, path)
+    return None
+
+
+def probe(path: str) -> dict:
+    """Width, height and (for videos) duration via ffprobe; {} if unavailable."""
+    try:
+        result = subprocess.run(
+            ["ffprobe", "-v", "error", "-select_streams", "v:0",
+             "-show_entries", "stream=width,height:format=duration", "-of", "json", path],
+            capture_output=True, text=True, check=True,
+        )
+        data = json.loads(result.stdout)
+    except (OSError, subprocess.CalledProcessError, ValueError):
+        return {}
+    info = {}
+    stream = (data.get("streams") or [{}])[0]
+    for key in ("width", "height"):
+        if key in stream:
+            info[key] = stream[key]
+    duration = data.get("format", {}).get("duration")
+    if duration not in (None, "N/A"):
+        info["duration"] = round(float(duration), 2)
+    return info
+
+
+def variant_path(path: Path, fmt: str, width: int | None) -> Path:
+    stem = path.stem + (f".w{width}" if width else "")
+    return path.with_name(f"{stem}.{fmt}")
+
+
+def build_variants(job: dict, path: Path, info: dict, options: dict) -> tuple[list[dict], list[str], str | None]:
+    """Downscaled (and AVIF) copies of an encoded image; returns (variants, files, error)."""
+    full_width, full_height = info.get("width"), info.get("height")
+    widths = [w for w in IMAGE_WIDTHS if full_width and w < full_width]
+    formats = ["webp"] + (["avif"] if options["avif"] else [])
+
+    variants, files = [], []
+    for fmt in formats:
+        for width in widths + [None]:
+            if fmt == "webp" and width is None:
+                target = path  # The full-size WebP is the main output
+            else:
+                target = variant_path(path, fmt, width)
+                error = encode_to(target, lambda tmp, f=fmt, w=width: variant_command(job, tmp, f, w, options))
+                if error:
+                    return variants, files, f"{target.name}: {error}"
+                files.append(str(target))
+            entry = {"file": target.name, "format": fmt, "width": width or full_width}
+            if full_width and full_height:
+                entry["height"] = round(full_height * entry["width"] / full_width)
+            entry["size"] = target.stat().st_size
+            variants.append(entry)
+    variants.sort(key=lambda v: (v["width"] or 0, v["format"]))
+    return variants, files, None
+
+
+def build_renditions(path: Path, options: dict) -> tuple[dict, list[str], str | None]:
+    """Poster and preview of an encoded video; returns (info, files, error)."""
+    info, files = {}, []
+    for rendition, suffix in (("poster", ".poster.webp"), ("preview", ".preview.mp4")):
+        target = path.with_name(path.stem + suffix)
+        error = encode_to(target, lambda tmp, r=rendition: rendition_command(path, tmp, r, options))
+        if error:
+            return info, files, f"{target.name}: {error}"
+        files.append(str(target))
+        probed = probe(str(target))
+        info[rendition] = {"file": target.name, "size": target.stat().st_size}
+        info[rendition].update({key: probed[key] for key in ("width", "height") if key in probed})
+    return info, files, None
+
+
+def run_job(job: dict, options: dict) -> dict:
+    """Encode one file and its derived files (runs in a worker process)."""
+    path = Path(job["path"])
+    if not job.get("adopt"):
+        error = encode_to(path, lambda tmp: encode_command(job, tmp, options))
+        if error:
+            return {**job, "error": error}
+    info = media_info(job["kind"], path)
+    files = [str(path)]
+    if job["kind"] == "image":
+        variants, extra_files, error = build_variants(job, path, info, options)
+        info["variants"] = variants
+    else:
+        renditions, extra_files, error = build_renditions(path, options)
+        info.update(renditions)
+    files += extra_files
+    if error:
+        return {**job, "error": error, "files": files}
+    return {**job, "info": info, "files": files}
+
+
+def media_info(kind: str, path: Path) -> dict:
+    info = {"type": kind, "size": path.stat().st_size}
+    probed = probe(str(path))
+    if kind != "video":
+        probed.pop("duration", None)
+    info.update(probed)
+    return info
+
+
+# ---------------------------------------------------------------------------
+# State
+# ---------------------------------------------------------------------------
+def load_state(path: Path) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        state = None
+    if not state or state.get("version") != STATE_VERSION:
+        return {"version": STATE_VERSION, "outputs": {}}
+    return state
+
+
+def save_state(state: dict, path: Path) -> None:
+    path.parent.mkdir(parents=True, exist_ok=True)
+    write_atomic(path, json.dumps(state, ensure_ascii=False, indent=2).encode("utf-8"))
+
+
+def job_record(job: dict, settings: dict, info: dict, files: list[str]) -> dict:
+    return {
+        "kind": job["kind"],
+        "output": job["output"],
+        "sourceHash": job["sourceHash"],
+        "settings": settings[job["kind"]],
+        "info": info,
+        "files": files,
+    }
+
+
+def is_current(job: dict, record: dict | None, settings: str) -> bool:
+    return (
+        record is not None
+        and record.get("sourceHash") == job["sourceHash"]
+        and record.get("settings") == settings
+        and all(os.path.exists(path) for path in record.get("files", [job["path"]]))
+    )
+
+
+def remove_files(paths, keep=()) -> None:
+    for path in paths:
+        if path not in keep and os.path.exists(path):
+            os.remove(path)
+
+
+# ---------------------------------------------------------------------------
+# Scheduler
+# ---------------------------------------------------------------------------
+def build_media(
+    media_index: dict,
+    out_dir: Path,
+    cache_dir: Path,
+    manifest_path: Path,
+    kinds: set[str] = frozenset(OUTPUT_SUBDIRS),
+    jobs: int | None = None,
+    video_encoder: str = "libx264",
+    avif: bool = False,
+    force: bool = False,
+    adopt: bool = False,
+) -> dict:
+    """Encode what changed, prune orphans and write the media manifest; returns counts."""
+    state_path = cache_dir / STATE_FILENAME
+    state = load_state(state_path)
+    outputs = state["outputs"]
+    workers = max(1, jobs or os.cpu_count() or 1)
+    options = {
+        "videoEncoder": video_encoder,
+        "avif": avif,
+        "threads": max(1, (os.cpu_count() or 1) // workers),
+    }
+    settings = {kind: fingerprint(value) for kind, value in encoder_settings(options).items()}
+
+    planned = plan_jobs(media_index, out_dir, kinds)
+    todo = [job for job in planned if force or not is_current(job, outputs.get(job["path"]), settings[job["kind"]])]
+    if adopt and not force:
+        # Trust outputs made before there was a state file (e.g. by the old
+        # shell scripts): only their variants, poster and preview are built
+        todo = [
+            {**job, "adopt": True} if job["path"] not in outputs and os.path.exists(job["path"]) else job
+            for job in todo
+        ]
+
+    # Drop outputs whose source is gone (only files this module produced)
+    planned_paths = {job["path"] for job in planned}
+    pruned = 0
+    for path, record in list(outputs.items()):
+        if record["kind"] in kinds and path not in planned_paths:
+            remove_files(record.get("files", [path]))
+            del outputs[path]
+            pruned += 1
+
+    print(f"  {len(planned)} media files, {len(planned) - len(todo)} up to date, "
+          f"{len(todo)} to encode on {workers} workers")
+
+    failed = 0
+    if todo:
+        with ProcessPoolExecutor(max_workers=workers) as pool:
+            futures = [pool.submit(run_job, job, options) for job in todo]
+            for done, future in enumerate(as_completed(futures), 1):
+                result = future.result()
+                previous = outputs.pop(result["path"], None) or {}
+                if "error" in result:
+                    failed += 1
+                    remove_files(result.get("files", []) + previous.get("files", []))
+                    print(f"  [{done}/{len(todo)}] FAILED {result['output']}: {result['error']}")
+                    continue
+                # Variants the new encode no longer produces (e.g. fewer widths)
+                remove_files(previous.get("files", []), keep=set(result["files"]))
+                outputs[result["path"]] = job_record(result, settings, result["info"], result["files"])
+                extra = len(result["files"]) - 1
+                print(f"  [{done}/{len(todo)}] {result['output']} ({result['info']['size']} bytes"
+                      + (f", +{extra} derived files)" if extra else ")"))
+                # Checkpoint often: a killed run keeps everything encoded so far
+                if done % 20 == 0:
+                    save_state(state, state_path)
+
+    save_state(state, state_path)
+
+    files = {
+        record["output"]: record["info"]
+        for path, record in sorted(outputs.items(), key=lambda item: item[1]["output"])
+        if os.path.exists(path)
+    }
+    names, files = dedup_media(files, out_dir, cache_dir)
+    manifest_path.parent.mkdir(parents=True, exist_ok=True)
+    write_media_names(manifest_path.parent, names)
+    write_atomic(manifest_path, dump_min({"version": MANIFEST_VERSION, "files": files}).encode("utf-8"))
+    print(f"  {len(files)} entries → {manifest_path.name}")
+
+    return {"planned": len(planned), "encoded": len(todo) - failed, "failed": failed, "pruned": pruned}
+
+
+def missing_tools(kinds: set[str], avif: bool = False) -> list[str]:
+    needed = (["ffmpeg"] if "video" in kinds or avif else []) + (["cwebp"] if "image" in kinds else [])
+    return [tool for tool in needed if shutil.which(tool) is None]
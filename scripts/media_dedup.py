@@ -0,0 +1,208 @@
+"""
+Content-addressed media objects.
+
+build_media() names its outputs after the ministry files (foo.webp,
+foo.w480.webp, bar.mp4, bar.poster.webp, ...). Byte-identical outputs under
+different names would be uploaded and cached separately, and a replaced source
+keeps its name, so cache-first clients (sw.js, the offline cache) never see
+the new file.
+
+dedup_media() hashes every output (SHA-256, carried over while size and mtime
+match, see .build-cache/media-hashes.json) and stores each distinct content
+once, next to the outputs, as {sha256[:16]}{ext}, e.g. img/9f86d081884c7d65.webp.
+Objects are hard links to the outputs where the file system allows, copies
+otherwise; objects nothing refers to any more are deleted. The output name →
+object name map goes to src/data/media-names.json:
+
+  {"version": 1, "files": {"foo.webp": "9f86d081884c7d65.webp", ...}}
+
+The media manifest and packs are keyed by object names, the data build writes
+question "media" fields with them (pipeline.resolve_media), and
+rename_media_refs() rewrites data built before the map changed. Object URLs
+never change content, so clients can cache them forever. Only the objects are
+uploaded (upload-media.sh); the named outputs stay local as build state.
+"""
+
+import json
+import os
+import re
+import shutil
+from pathlib import Path
+
+from build_cache import write_atomic
+from data_assets import dump_min
+from media_index import file_sha256
+from question_store import STORE_FILENAME, is_normalized
+
+NAMES_FILENAME = "media-names.json"
+NAMES_VERSION = 1
+HASHES_FILENAME = "media-hashes.json"
+HASH_PREFIX = 16
+OBJECT_NAME = re.compile(rf"^[0-9a-f]{{{HASH_PREFIX}}}\.[a-z0-9]+$")
+
+
+def object_name(digest: str, name: str) -> str:
+    return digest[:HASH_PREFIX] + os.path.splitext(name)[1].lower()
+
+
+def entry_files(name: str, info: dict) -> list[tuple[str, str]]:
+    """(dir, file) of a manifest entry's output and every derived file."""
+    dir_name = "vid" if info["type"] == "video" else "img"
+    files = [(dir_name, name)]
+    files += [(dir_name, variant["file"]) for variant in info.get("variants", []) if variant["file"] != name]
+    files += [(dir_name, info[rendition]["file"]) for rendition in ("poster", "preview") if rendition in info]
+    return files
+
+
+def rename_entry(info: dict, names: dict[str, str]) -> dict:
+    """Manifest entry with every file name replaced by its object name."""
+    info = dict(info)
+    if "variants" in info:
+        info["variants"] = [{**variant, "file": names[variant["file"]]} for variant in info["variants"]]
+    for rendition in ("poster", "preview"):
+        if rendition in info:
+            info[rendition] = {**info[rendition], "file": names[info[rendition]["file"]]}
+    return info
+
+
+def link_object(source: Path, target: Path) -> None:
+    if target.exists():
+        return
+    tmp_path = target.with_name(f".{target.name}.tmp")
+    try:
+        os.link(source, tmp_path)
+    except OSError:
+        shutil.copyfile(source, tmp_path)
+    os.replace(tmp_path, target)
+
+
+# ---------------------------------------------------------------------------
+# Dedup
+# ---------------------------------------------------------------------------
+def dedup_media(files: dict[str, dict], out_dir: Path, cache_dir: Path) -> tuple[dict[str, str], dict[str, dict]]:
+    """Store every output once by content; returns (names, manifest files keyed by object name)."""
+    hashes_path = cache_dir / HASHES_FILENAME
+    try:
+        with open(hashes_path, encoding="utf-8") as f:
+            known = json.load(f)
+    except (OSError, ValueError):
+        known = {}
+
+    hashes, names, objects = {}, {}, {}
+    total_bytes = unique_bytes = 0
+    for name, info in files.items():
+        for dir_name, file in entry_files(name, info):
+            path = out_dir / dir_name / file
+            if not path.exists():
+                continue
+            st = path.stat()
+            old = known.get(str(path))
+            digest = old[2] if old and old[:2] == [st.st_size, st.st_mtime] else file_sha256(path)
+            hashes[str(path)] = [st.st_size, st.st_mtime, digest]
+            names[file] = object_name(digest, file)
+            total_bytes += st.st_size
+            if (dir_name, names[file]) not in objects:
+                objects[(dir_name, names[file])] = path
+                unique_bytes += st.st_size
+
+    for (dir_name, obj), path in objects.items():
+        link_object(path, out_dir / dir_name / obj)
+    removed = 0
+    for dir_name in {dir_name for dir_name, _obj in objects} | {"img", "vid"}:
+        directory = out_dir / dir_name
+        if not directory.is_dir():
+            continue
+        for path in directory.iterdir():
+            if OBJECT_NAME.match(path.name) and (dir_name, path.name) not in objects:
+                path.unlink()
+                removed += 1
+
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    write_atomic(hashes_path, json.dumps(hashes).encode("utf-8"))
+    print(f"  {len(names)} output files → {len(objects)} content-addressed objects "
+          f"({total_bytes - unique_bytes} duplicate bytes saved, {removed} unused objects removed)")
+
+    renamed: dict[str, dict] = {}
+    for name, info in files.items():
+        if name in names:
+            # Outputs sharing an object share its entry; keep every field any of them has
+            obj = names[name]
+            renamed[obj] = {**rename_entry(info, names), **renamed.get(obj, {})}
+    return dict(sorted(names.items())), dict(sorted(renamed.items()))
+
+
+# ---------------------------------------------------------------------------
+# Names
+# ---------------------------------------------------------------------------
+def load_media_names(data_dir: str | Path) -> dict[str, str] | None:
+    try:
+        with open(Path(data_dir) / NAMES_FILENAME, encoding="utf-8") as f:
+            data = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return data.get("files") if data.get("version") == NAMES_VERSION else None
+
+
+def write_media_names(data_dir: Path, names: dict[str, str]) -> None:
+    write_atomic(data_dir / NAMES_FILENAME, dump_min({"version": NAMES_VERSION, "files": names}).encode("utf-8"))
+
+
+def rename_media_refs(
+    data_dir: Path,
+    categories: list[str],
+    previous: dict[str, str] | None,
+    names: dict[str, str],
+) -> int:
+    """
+    Point question "media" fields of already-built data at the current objects.
+
+    A field holds either an output name (data built before any dedup) or an
+    object name from the previous map. An old object shared by several
+    outputs that now differ cannot be told apart; those are left as they are
+    and reported, and the next data build (build-data.py) resolves them.
+    """
+    sources: dict[str, set[str]] = {}
+    for output, obj in (previous or {}).items():
+        sources.setdefault(obj, set()).add(output)
+
+    changed_refs, ambiguous = 0, set()
+
+    def rename(question: dict) -> bool:
+        nonlocal changed_refs
+        ref = question.get("media")
+        if not ref:
+            return False
+        if ref in names:
+            new = names[ref]
+        else:
+            candidates = {names[output] for output in sources.get(ref, ()) if output in names}
+            if len(candidates) != 1:
+                if len(candidates) > 1:
+                    ambiguous.add(ref)
+                return False
+            new = candidates.pop()
+        if new == ref:
+            return False
+        question["media"] = new
+        changed_refs += 1
+        return True
+
+    store_path = data_dir / STORE_FILENAME
+    paths = [store_path] if store_path.exists() else []
+    paths += [data_dir / f"{cat}.json" for cat in categories if (data_dir / f"{cat}.json").exists()]
+    for path in paths:
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if path != store_path and is_normalized(data):
+            continue  # Id lists; the store holds the questions
+        questions = data["questions"].values() if path == store_path else data["questions"]
+        renamed = [q for q in questions if rename(q)]
+        if renamed:
+            write_atomic(path, dump_min(data).encode("utf-8"))
+
+    if changed_refs:
+        print(f"  {changed_refs} question media references renamed to content-addressed objects")
+    if ambiguous:
+        print(f"  WARNING: {len(ambiguous)} media references are ambiguous after a content change; "
+              f"run build-data.py to resolve them")
+    return changed_refs
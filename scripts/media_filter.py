@@ -0,0 +1,333 @@
+"""
+Detection of questions whose text refers to media they do not have.
+
+These are questions where media is null but the question text implies there's
+a visual element (image or video) the user should be looking at. Shared by
+filter-no-media.py (post-pass over written JSON) and build-data.py (in-memory
+pipeline stage).
+
+Each pattern is a rule. Rather than running every rule over every text, the
+MediaClassifier scans a text once with a multi-pattern literal matcher
+(Aho–Corasick) for the literal each rule requires, and runs only the regexes
+of the rules whose literal occurred. Verdicts (which rules matched) are kept
+per text, so a question shared by many categories is classified once, and
+can be persisted by text hash in .build-cache/ between runs. Rules without a
+usable literal (top-level alternations) are always confirmed by regex.
+"""
+
+import json
+import re
+import time
+from collections import deque
+from pathlib import Path
+
+from build_cache import fingerprint, sha256_bytes, write_atomic
+
+VERDICTS_FILENAME = "media-filter-verdicts.json"
+VERDICTS_VERSION = 1
+MIN_LITERAL = 3
+
+# Patterns that indicate a question references visual media content.
+# These are Polish phrases commonly used in driving exam questions that refer
+# to an image, video, or visual scenario the test-taker should be looking at.
+MEDIA_REFERENCE_PATTERNS = [
+    # Direct situational references (the question describes "this situation"
+    # which is shown in an accompanying image/video)
+    r"[Ww] tej sytuacji",
+    r"[Ww] przedstawionej sytuacji",
+    r"[Ww] takiej sytuacji",
+    r"[Ww] takim terenie",
+
+    # References to media types
+    r"na zdjęciu",          # in the photo
+    r"na fotografii",       # in the photograph
+    r"na ilustracji",       # in the illustration
+    r"na rysunku",          # in the drawing
+    r"na filmie",           # in the film/video
+    r"na widocznym",        # on the visible [element]
+
+    # "marked/signed like this" -- refers to a sign/marking shown in media
+    r"tak oznakow",         # tak oznakowanej/oznakowanym/oznakowanego
+    r"tak oznacz",          # tak oznaczonym/oznaczonej/oznaczonego
+
+    # Demonstrative references implying a visual element
+    r"takim odcinku",       # such a section [of road]
+    r"takiej drod",         # such a road
+    r"takim skrzyżowaniu",  # such an intersection
+    r"na takiej autostradzie",  # on such a motorway
+    r"na takiej drodze",    # on such a road
+    r"tego znaku",          # this sign
+    r"tym sygnale",         # this signal
+
+    # "widoczny/widoczna/widoczne + noun" -- refers to a visible element
+    # shown in the accompanying media. We use compound patterns to avoid
+    # matching generic uses like "widoczność drogi" (road visibility) or
+    # "niewidoczna" (invisible).
+    r"widoczn\w+ znak",     # visible sign(s)
+    r"widoczn\w+ słupk",    # visible post
+    r"widoczn\w+ lini",     # visible line
+    r"widoczn\w+ pojazd",   # visible vehicle
+    r"widoczn\w+ przejazd", # visible [railway] crossing
+    r"widoczn\w+ przejści", # visible [pedestrian] crossing
+    r"widoczn\w+ przystan", # visible [bus/tram] stop
+    r"widoczn\w+ po lewej", # visible on the left
+    r"widoczn\w+ po prawej",# visible on the right
+    r"widoczn\w+ zakręt",   # visible curve
+]
+
+
+# ---------------------------------------------------------------------------
+# Literal prefilter
+# ---------------------------------------------------------------------------
+def required_literal(pattern: str) -> str | None:
+    """
+    Longest lowercase literal every match of pattern contains, or None.
+
+    Understands plain characters, escaped punctuation, case-pair classes
+    like [Ww] and quantifiers; groups count as "anything", and a top-level
+    alternation has no single required literal (None).
+    """
+    runs, current = [], []
+    i = 0
+    while i < len(pattern):
+        ch = pattern[i]
+        atom = None  # literal character, or None for "anything"
+        if ch == "\\" and i + 1 < len(pattern):
+            escaped = pattern[i + 1]
+            atom = None if escaped.isalnum() else escaped
+            i += 2
+        elif ch == "|":
+            return None
+        elif ch == "(":
+            i = group_end(pattern, i)
+        elif ch == "[":
+            end = pattern.index("]", i + 1)
+            members = pattern[i + 1:end]
+            atom = members[0].lower() if members and len(set(members.lower())) == 1 and "\\" not in members else None
+            i = end + 1
+        elif ch in ".^$":
+            i += 1
+        else:
+            atom = ch.lower()
+            i += 1
+
+        quantifier = pattern[i] if i < len(pattern) else ""
+        if quantifier in ("?", "*", "{"):
+            atom = None  # Optional: cannot be required
+            i = pattern.index("}", i) + 1 if quantifier == "{" else i + 1
+        elif quantifier == "+":
+            i += 1
+        if atom is not None:
+            current.append(atom)
+        if atom is None or quantifier == "+":
+            # Repeated atoms end a run: what follows is not adjacent to it
+            runs.append("".join(current))
+            current = []
+    runs.append("".join(current))
+    longest = max(runs, key=len)
+    return longest if len(longest.strip()) >= MIN_LITERAL else None
+
+
+def group_end(pattern: str, start: int) -> int:
+    """Index just past the group opening at pattern[start]."""
+    depth = 0
+    i = start
+    while i < len(pattern):
+        ch = pattern[i]
+        if ch == "\\":
+            i += 1
+        elif ch == "[":
+            i = pattern.index("]", i + 1)
+        elif ch == "(":
+            depth += 1
+        elif ch == ")":
+            depth -= 1
+            if depth == 0:
+                return i + 1
+        i += 1
+    raise ValueError(f"Unbalanced group in {pattern!r}")
+
+
+class LiteralMatcher:
+    """Aho–Corasick automaton: every key occurring in a text, in one pass."""
+
+    def __init__(self, keys: list[str]):
+        goto: list[dict[str, int]] = [{}]
+        outputs: list[set[int]] = [set()]
+        for key_index, key in enumerate(keys):
+            state = 0
+            for ch in key:
+                if ch not in goto[state]:
+                    goto.append({})
+                    outputs.append(set())
+                    goto[state][ch] = len(goto) - 1
+                state = goto[state][ch]
+            outputs[state].add(key_index)
+
+        # Breadth-first: fold each state's failure transitions into a full
+        # transition table, so scanning never follows failure links
+        fail = [0] * len(goto)
+        self.delta: list[dict[str, int]] = [dict(goto[0])] + [{} for _ in goto[1:]]
+        queue = deque(goto[0].values())
+        while queue:
+            state = queue.popleft()
+            self.delta[state] = {**self.delta[fail[state]], **goto[state]}
+            outputs[state] |= outputs[fail[state]]
+            for ch, child in goto[state].items():
+                fail[child] = self.delta[fail[state]].get(ch, 0)
+                queue.append(child)
+        self.outputs = [frozenset(out) for out in outputs]
+
+    def scan(self, text: str) -> set[int]:
+        found = set()
+        state = 0
+        delta, outputs = self.delta, self.outputs
+        for ch in text:
+            state = delta[state].get(ch, 0)
+            if outputs[state]:
+                found |= outputs[state]
+        return found
+
+
+# ---------------------------------------------------------------------------
+# Classifier
+# ---------------------------------------------------------------------------
+class MediaClassifier:
+    """
+    Classify texts by MEDIA_REFERENCE_PATTERNS; classify() returns the indices
+    of the matching rules (empty: the text needs no media).
+    """
+
+    def __init__(self, patterns: list[str] = MEDIA_REFERENCE_PATTERNS, cache_path: str | Path | None = None):
+        self.patterns = list(patterns)
+        self.rules = []
+        literal_keys: dict[str, int] = {}
+        self.by_literal: list[list[int]] = []
+        self.always: list[int] = []
+        for index, pattern in enumerate(self.patterns):
+            literal = required_literal(pattern)
+            self.rules.append({
+                "pattern": pattern,
+                "regex": re.compile(pattern, re.IGNORECASE),
+                "literal": literal,
+                "candidates": 0,
+                "hits": 0,
+                "seconds": 0.0,
+            })
+            if literal is None:
+                self.always.append(index)
+                continue
+            if literal not in literal_keys:
+                literal_keys[literal] = len(self.by_literal)
+                self.by_literal.append([])
+            self.by_literal[literal_keys[literal]].append(index)
+        self.matcher = LiteralMatcher(list(literal_keys))
+
+        self.rules_key = fingerprint(self.patterns)
+        self.cache_path = Path(cache_path) if cache_path else None
+        self.verdicts: dict[str, list[int]] = {}
+        self.texts = 0
+        self.cached = 0
+        self.scan_seconds = 0.0
+        self._dirty = False
+        if self.cache_path and self.cache_path.exists():
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.cache_path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == VERDICTS_VERSION and data.get("rules") == self.rules_key:
+            self.verdicts = data.get("verdicts", {})
+
+    def save(self) -> None:
+        if not self.cache_path or not self._dirty:
+            return
+        self.cache_path.parent.mkdir(parents=True, exist_ok=True)
+        data = {"version": VERDICTS_VERSION, "rules": self.rules_key, "verdicts": self.verdicts}
+        write_atomic(self.cache_path, json.dumps(data, separators=(",", ":")).encode("utf-8"))
+        self._dirty = False
+
+    def classify(self, text: str) -> list[int]:
+        key = sha256_bytes(text.encode("utf-8"))[:32]
+        verdict = self.verdicts.get(key)
+        if verdict is not None:
+            self.cached += 1
+            for index in verdict:
+                self.rules[index]["hits"] += 1
+            return verdict
+
+        self.texts += 1
+        start = time.perf_counter()
+        found = self.matcher.scan(text.lower())
+        self.scan_seconds += time.perf_counter() - start
+
+        candidates = sorted(self.always + [index for key_index in found for index in self.by_literal[key_index]])
+        verdict = []
+        for index in candidates:
+            rule = self.rules[index]
+            start = time.perf_counter()
+            matched = rule["regex"].search(text) is not None
+            rule["seconds"] += time.perf_counter() - start
+            rule["candidates"] += 1
+            if matched:
+                rule["hits"] += 1
+                verdict.append(index)
+        self.verdicts[key] = verdict
+        self._dirty = True
+        return verdict
+
+    def needs_media(self, text: str) -> bool:
+        return bool(self.classify(text))
+
+    def report(self, verbose: bool = False) -> None:
+        """
+        Print per-rule hits (cached verdicts included) and regex runs/time
+        (fresh classifications only) for the texts seen so far.
+        """
+        regex_seconds = sum(rule["seconds"] for rule in self.rules)
+        print(f"  Classifier: {self.texts} texts classified, {self.cached} verdicts cached, "
+              f"{len(self.rules)} rules ({len(self.always)} regex-only); "
+              f"scan {self.scan_seconds * 1000:.1f} ms, regex {regex_seconds * 1000:.1f} ms")
+        if not self.texts + self.cached:
+            return
+        shown = [rule for rule in self.rules if verbose or rule["hits"]]
+        for rule in sorted(shown, key=lambda r: (-r["hits"], r["pattern"])):
+            print(f"    {rule['hits']:>5} hits {rule['candidates']:>6} regex runs "
+                  f"{rule['seconds'] * 1000:>7.2f} ms  {rule['pattern']}")
+        silent = len(self.rules) - sum(1 for rule in self.rules if rule["hits"])
+        if silent and not verbose:
+            print(f"    ({silent} rules matched nothing)")
+
+
+def question_needs_media(question_text: str) -> bool:
+    """Check if a question's text implies it should have accompanying media."""
+    return _default_classifier().needs_media(question_text)
+
+
+_classifier = None
+
+
+def _default_classifier() -> MediaClassifier:
+    global _classifier
+    if _classifier is None:
+        _classifier = MediaClassifier()
+    return _classifier
+
+
+def filter_missing_media(
+    questions: list[dict],
+    classifier: MediaClassifier | None = None,
+) -> tuple[list[dict], list[dict]]:
+    """Split questions into (kept, removed) by the missing-media rule."""
+    classifier = classifier or _default_classifier()
+    kept = []
+    removed = []
+    for q in questions:
+        if q["media"] is None and classifier.needs_media(q["q"]):
+            removed.append(q)
+        else:
+            kept.append(q)
+    return kept, removed
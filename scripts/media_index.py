@@ -0,0 +1,99 @@
+"""
+Precomputed index of the source media directory.
+
+Maps lowercased file names to the real name plus size, mtime and a SHA-256
+content hash, so media lookups during parsing are dict hits instead of
+directory scans. The index is persisted between runs; every run re-stats the
+directory and carries per-file hashes over only for files whose size and
+mtime match, since a file overwritten in place leaves the directory mtime
+untouched.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+INDEX_VERSION = 1
+HASH_CHUNK = 1 << 20
+
+
+def file_sha256(path: Path) -> str:
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def load_media_index(index_path: Path) -> dict | None:
+    try:
+        with open(index_path, encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if index.get("version") != INDEX_VERSION:
+        return None
+    return index
+
+
+def save_media_index(index: dict, index_path: Path) -> None:
+    index_path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = index_path.with_name(index_path.name + ".tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(index, f, ensure_ascii=False)
+    os.replace(tmp_path, index_path)
+
+
+def build_media_index(media_dir: Path, index_path: Path | None = None) -> dict:
+    """Return the media index for media_dir, reusing hashes from index_path.
+
+    Result shape:
+        {"version": 1, "dir": str, "dirMtime": float,
+         "files": {lowercased_name: {"name", "size", "mtime", "sha256"}}}
+    """
+    dir_mtime = media_dir.stat().st_mtime
+    previous = load_media_index(index_path) if index_path else None
+
+    old_files = {}
+    if previous is not None and previous.get("dir") == str(media_dir):
+        old_files = {entry["name"]: entry for entry in previous["files"].values()}
+
+    files: dict[str, dict] = {}
+    hashed = 0
+    with os.scandir(media_dir) as it:
+        entries = sorted((e for e in it if e.is_file()), key=lambda e: e.name)
+    for entry in entries:
+        st = entry.stat()
+        old = old_files.get(entry.name)
+        if old and old["size"] == st.st_size and old["mtime"] == st.st_mtime:
+            digest = old["sha256"]
+        else:
+            digest = file_sha256(Path(entry.path))
+            hashed += 1
+        # First name wins if two files differ only by case
+        files.setdefault(entry.name.lower(), {
+            "name": entry.name,
+            "size": st.st_size,
+            "mtime": st.st_mtime,
+            "sha256": digest,
+        })
+
+    index = {
+        "version": INDEX_VERSION,
+        "dir": str(media_dir),
+        "dirMtime": dir_mtime,
+        "files": files,
+    }
+    if index == previous:
+        print(f"  Media index reused ({len(files)} files, none changed)")
+        return previous
+    print(f"  Media index built ({len(files)} files, {hashed} hashed)")
+    if index_path:
+        save_media_index(index, index_path)
+    return index
+
+
+def lookup_media(index: dict, filename: str) -> dict | None:
+    """Case-insensitive lookup of a source media file in the index."""
+    return index["files"].get(filename.lower())
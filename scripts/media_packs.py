@@ -0,0 +1,177 @@
+"""
+Media packs for bulk offline downloads.
+
+Instead of one request per media file, offline.js downloads a category from a
+few packs: plain concatenations of encoded media files with an offset index,
+fetched with range requests and split back into cache entries on the client.
+
+Every output referenced by a question (videos with their posters, and each
+image with all its width/format variants) is stored exactly once, however
+many categories share it. Preview renditions are left out: offline playback
+uses the full file. Files are ordered so that each category's files form long
+contiguous runs: grouped by kind/variant (a client needs only one image
+variant per viewport), then by category membership, with categories holding
+the most media taking the most significant position (so all of B's files for
+a variant are a single run). The client looks up the files it renders,
+coalesces them into byte ranges (skipping short gaps of unneeded files) and
+fetches those.
+
+Packs are cut at PACK_MAX_BYTES and named by content hash, so unchanged packs
+keep their URL (and any client cache) across rebuilds. The index is written
+to src/data/media-packs.json:
+
+  {"version": 1,
+   "packs": {"<hash>.pack": {"size": 1234,
+                             "files": [["img", "foo.w360.webp", 0, 567], ...]}}}
+
+Pack files ([dir, name, offset, length]) are ordered by offset. Packs are
+written to src/media/packs/ and uploaded next to the individual files.
+"""
+
+import hashlib
+import json
+import os
+from pathlib import Path
+
+from build_cache import BuildCache, fingerprint, sha256_file, sources_fingerprint
+from data_assets import dump_min
+from pipeline import CATEGORIES
+from question_store import STORE_FILENAME, expand_category, is_normalized, load_store
+
+PACKS_INDEX = "media-packs.json"
+PACKS_SUBDIR = "packs"
+PACKS_VERSION = 1
+PACK_MAX_BYTES = 32 << 20
+COPY_CHUNK = 1 << 20
+SOURCES = ["media_packs.py", "question_store.py", "build_cache.py"]
+
+
+# ---------------------------------------------------------------------------
+# Layout
+# ---------------------------------------------------------------------------
+def category_media(data_dir: Path) -> dict[str, dict[str, str]]:
+    """media -> mediaType for every category file in data_dir."""
+    store = load_store(data_dir)
+    result = {}
+    for cat in CATEGORIES:
+        path = data_dir / f"{cat}.json"
+        if not path.exists():
+            continue
+        with open(path, encoding="utf-8") as f:
+            data = json.load(f)
+        if is_normalized(data):
+            data = expand_category(data, store)
+        result[cat] = {q["media"]: q.get("mediaType") for q in data["questions"] if q.get("media")}
+    return result
+
+
+def pack_order(cat_media: dict[str, dict[str, str]], manifest: dict) -> list[tuple[str, str]]:
+    """(dir, file name) of every referenced output, in pack order."""
+    ranked = sorted(cat_media, key=lambda cat: -len(cat_media[cat]))
+    media_types = {name: media_type for media in cat_media.values() for name, media_type in media.items()}
+
+    keyed = []
+    for name, media_type in media_types.items():
+        # Members of the top-ranked categories sort first (False < True)
+        members = tuple(name not in cat_media[cat] for cat in ranked)
+        entry = manifest.get(name, {})
+        if media_type == "video":
+            keyed.append((("vid",), members, "vid", name))
+            if "poster" in entry:
+                keyed.append((("vid", "poster"), members, "vid", entry["poster"]["file"]))
+            continue
+        for variant in entry.get("variants") or [{"file": name, "format": "webp", "width": 0}]:
+            role = ("img", variant["format"], variant["width"] if variant["file"] != name else 0)
+            keyed.append((role, members, "img", variant["file"]))
+    return [(dir_name, file) for _role, _members, dir_name, file in sorted(keyed)]
+
+
+def chunk_files(files: list[tuple[str, str]], media_dir: Path) -> list[list[tuple[str, str, int]]]:
+    """Cut the ordered files into packs of at most PACK_MAX_BYTES (a larger file gets its own)."""
+    chunks, current, size = [], [], 0
+    for dir_name, name in files:
+        path = media_dir / dir_name / name
+        if not path.exists():
+            continue  # Missing outputs are left to per-file downloads
+        length = path.stat().st_size
+        if current and size + length > PACK_MAX_BYTES:
+            chunks.append(current)
+            current, size = [], 0
+        current.append((dir_name, name, length))
+        size += length
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+# ---------------------------------------------------------------------------
+# Packing
+# ---------------------------------------------------------------------------
+def write_pack(members: list[tuple[str, str, int]], media_dir: Path, pack_dir: Path) -> tuple[str, dict]:
+    """Concatenate members into a content-addressed pack; returns (name, entry)."""
+    tmp_path = pack_dir / ".pack.tmp"
+    digest = hashlib.sha256()
+    files, offset = [], 0
+    with open(tmp_path, "wb") as out:
+        for dir_name, name, _length in members:
+            start = offset
+            with open(media_dir / dir_name / name, "rb") as f:
+                while chunk := f.read(COPY_CHUNK):
+                    digest.update(chunk)
+                    out.write(chunk)
+                    offset += len(chunk)
+            files.append([dir_name, name, start, offset - start])
+    pack_name = f"{digest.hexdigest()[:16]}.pack"
+    if (pack_dir / pack_name).exists():
+        tmp_path.unlink()  # Unchanged pack: keep the file (and its upload)
+    else:
+        os.replace(tmp_path, pack_dir / pack_name)
+    return pack_name, {"size": offset, "files": files}
+
+
+def write_packs(data_dir: Path, media_dir: Path, manifest: dict) -> dict:
+    """Write the packs and return the pack index; deletes packs no longer used."""
+    pack_dir = media_dir / PACKS_SUBDIR
+    pack_dir.mkdir(parents=True, exist_ok=True)
+
+    packs = {}
+    for members in chunk_files(pack_order(category_media(data_dir), manifest), media_dir):
+        pack_name, entry = write_pack(members, media_dir, pack_dir)
+        packs[pack_name] = entry
+
+    for path in pack_dir.glob("*.pack"):
+        if path.name not in packs:
+            path.unlink()
+    return {"version": PACKS_VERSION, "packs": packs}
+
+
+def packs_fingerprint(data_dir: Path, media_dir: Path, manifest_path: Path) -> str:
+    data_files = [data_dir / f"{cat}.json" for cat in CATEGORIES] + [data_dir / STORE_FILENAME]
+    return fingerprint(
+        sha256_file(manifest_path),
+        [(p.name, sha256_file(p)) for p in data_files],
+        sorted(p.name for p in (media_dir / PACKS_SUBDIR).glob("*.pack")),
+        sources_fingerprint(*(Path(__file__).resolve().parent / name for name in SOURCES)),
+    )
+
+
+def build_packs(data_dir: Path, media_dir: Path, manifest_path: Path, cache_dir: Path, force: bool = False) -> dict | None:
+    """Rebuild the packs and src/data/media-packs.json (skipped when nothing changed)."""
+    cache = BuildCache(cache_dir, "media-packs", force=force)
+    if cache.is_fresh(packs_fingerprint(data_dir, media_dir, manifest_path)):
+        return None
+    try:
+        with open(manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)["files"]
+    except (OSError, ValueError, KeyError):
+        manifest = {}
+
+    print("\nPacking media for offline downloads ...")
+    index = write_packs(data_dir, media_dir, manifest)
+    cache.write(data_dir / PACKS_INDEX, dump_min(index))
+    files = sum(len(entry["files"]) for entry in index["packs"].values())
+    total = sum(entry["size"] for entry in index["packs"].values())
+    print(f"  {files} files in {len(index['packs'])} packs ({total} bytes) → {PACKS_INDEX}")
+
+    cache.commit(packs_fingerprint(data_dir, media_dir, manifest_path))
+    return index
@@ -0,0 +1,42 @@
+#!/usr/bin/env python3
+"""
+Package src/data for deployment: rebuild the search index (see
+search_index.py), then minified JSON, .gz/.br siblings and
+asset-manifest.json (content hashes + sizes) used by data.js and sw.js to
+detect updates.
+
+build-data.py, parse-excel.py, filter-no-media.py and translate-questions.py
+run this step automatically after writing data; run it by hand after editing
+src/data in any other way.
+
+Usage:
+  python3 scripts/package-data.py [--data-dir PATH] [--cache-dir PATH] [--force]
+"""
+
+import argparse
+import sys
+
+from data_assets import package_data
+from pipeline import project_path
+from search_index import build_search
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default="src/data", help="Directory with the data JSON files")
+    parser.add_argument("--cache-dir", default=".build-cache", help="Directory for build caches")
+    parser.add_argument("--force", action="store_true", help="Repackage even if nothing changed")
+    args = parser.parse_args()
+
+    data_dir = project_path(args.data_dir)
+    if not data_dir.is_dir():
+        sys.exit(f"Data directory not found: {data_dir}")
+
+    cache_dir = project_path(args.cache_dir)
+    build_search(data_dir, cache_dir, force=args.force)
+    if package_data(data_dir, cache_dir, force=args.force) is None:
+        print(f"{data_dir.name} unchanged since last packaging — nothing to do.")
+
+
+if __name__ == "__main__":
+    main()
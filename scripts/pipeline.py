@@ -0,0 +1,353 @@
+"""
+Shared stages of the data build: Excel rows → question objects → meta →
+JSON files.
+
+parse-excel.py runs parse → meta → write; build-data.py inserts the
+missing-media filter (media_filter.py) between parse and meta so the whole
+pipeline works on the same in-memory question objects and serializes once.
+"""
+
+import argparse
+import os
+import sys
+from pathlib import Path
+
+from build_cache import BuildCache, fingerprint, sha256_file, sources_fingerprint
+from build_metrics import Metrics
+from data_assets import dump_min
+from exam_index import EXAM_INDEX_FILENAME, build_exam_index, category_pools, pool_sizes
+from media_index import build_media_index, lookup_media
+from question_store import LAYOUTS, STORE_FILENAME, build_store, category_ids
+from question_table import TABLE_FILENAME, build_table, dump_table
+from xlsx_stream import READERS, iter_workbook_rows
+
+PROJECT_ROOT = Path(__file__).resolve().parent.parent
+SCRIPTS_DIR = Path(__file__).resolve().parent
+
+# ---------------------------------------------------------------------------
+# Constants
+# ---------------------------------------------------------------------------
+CATEGORIES = ["A", "A1", "A2", "AM", "B", "B1", "C", "C1", "D", "D1", "PT", "T"]
+
+EXAM_RULES = {
+    "totalQuestions": 32,
+    "basicQuestions": 20,
+    "specialistQuestions": 12,
+    "maxPoints": 74,
+    "passThreshold": 68,
+    "totalTimeSeconds": 1500,
+    "basicTimeSeconds": 20,
+    "specialistTimeSeconds": 50,
+    "basicPoints": [3, 3, 3, 3, 3, 3, 3, 3, 3, 3, 2, 2, 2, 2, 2, 2, 1, 1, 1, 1],
+    "specialistPoints": [3, 3, 3, 3, 3, 3, 2, 2, 2, 2, 1, 1],
+}
+
+# Column indices (0-based) in the Excel sheet
+COL_LP = 0          # L.p.
+COL_NUM = 1         # Numer pytania
+COL_Q = 2           # Pytanie
+COL_A = 3           # Odpowiedź A
+COL_B = 4           # Odpowiedź B
+COL_C = 5           # Odpowiedź C
+COL_CORRECT = 6     # Poprawna odp
+COL_MEDIA = 7       # Media
+COL_STRUCTURE = 8   # Zakres struktury (PODSTAWOWY / SPECJALISTYCZNY)
+COL_CATEGORIES = 9  # Kategorie (comma-separated)
+
+# Helper modules that shape the output; editing any of them forces a rebuild
+PIPELINE_SOURCES = [
+    "pipeline.py",
+    "xlsx_stream.py",
+    "media_index.py",
+    "question_store.py",
+    "question_table.py",
+    "build_cache.py",
+    "data_assets.py",
+    "exam_index.py",
+    "media_dedup.py",
+]
+
+# ---------------------------------------------------------------------------
+# Media helpers
+# ---------------------------------------------------------------------------
+MEDIA_EXT_MAP = {
+    ".wmv": (".mp4", "video"),
+    ".jpg": (".webp", "image"),
+    ".jpeg": (".webp", "image"),
+}
+
+
+def resolve_media(raw_filename: str | None, media_index: dict | None, media_names: dict[str, str] | None = None):
+    """Return (target_filename, mediaType) or (None, None).
+
+    The target is named after the source file as indexed (the sheet's case
+    may differ) and, given media_names (media_dedup.py), is the content-addressed
+    object the output is stored as.
+    """
+    if not raw_filename or not str(raw_filename).strip():
+        return None, None
+
+    raw_filename = str(raw_filename).strip()
+    src_ext = os.path.splitext(raw_filename)[1].lower()
+    mapping = MEDIA_EXT_MAP.get(src_ext)
+
+    if mapping is None:
+        # Unknown extension — keep as-is but warn
+        print(f"  WARNING: unknown media extension '{src_ext}' for '{raw_filename}'")
+        return raw_filename, "unknown"
+
+    # Check if the source file exists (case-insensitive)
+    source_name = raw_filename
+    if media_index is not None:
+        entry = lookup_media(media_index, raw_filename)
+        if entry is None:
+            return None, None
+        source_name = entry["name"]
+
+    target_ext, media_type = mapping
+    target_name = os.path.splitext(source_name)[0] + target_ext
+    if media_names is not None:
+        target_name = media_names.get(target_name, target_name)
+
+    return target_name, media_type
+
+
+def media_index_digest(media_index: dict | None) -> str:
+    """Fingerprint the parts of the media index that affect parsing."""
+    if media_index is None:
+        return "no-media"
+    return fingerprint(sorted(
+        (entry["name"], entry["size"], entry["sha256"]) for entry in media_index["files"].values()
+    ))
+
+
+# ---------------------------------------------------------------------------
+# Row → question
+# ---------------------------------------------------------------------------
+def build_question(row: tuple, media_index: dict | None, media_names: dict[str, str] | None = None):
+    """Turn one sheet row into (question object, raw category list, media_missing)."""
+    qnum = str(row[COL_NUM]).strip() if row[COL_NUM] is not None else ""
+    question_text = str(row[COL_Q]).strip() if row[COL_Q] else ""
+    correct = str(row[COL_CORRECT]).strip() if row[COL_CORRECT] else ""
+    structure = str(row[COL_STRUCTURE]).strip() if row[COL_STRUCTURE] else ""
+    raw_cats = str(row[COL_CATEGORIES]).strip() if row[COL_CATEGORIES] else ""
+    raw_media = str(row[COL_MEDIA]).strip() if row[COL_MEDIA] else ""
+
+    q_type = "basic" if structure == "PODSTAWOWY" else "specialist"
+    media_name, media_type = resolve_media(raw_media if raw_media else None, media_index, media_names)
+
+    # Build question object
+    q_obj: dict = {
+        "id": int(qnum) if qnum.isdigit() else qnum,
+        "q": question_text,
+        "type": q_type,
+        "correct": correct,
+        "media": media_name,
+        "mediaType": media_type,
+    }
+
+    # Add ABC answers for specialist questions
+    if q_type == "specialist":
+        q_obj["a"] = str(row[COL_A]).strip() if row[COL_A] else ""
+        q_obj["b"] = str(row[COL_B]).strip() if row[COL_B] else ""
+        q_obj["c"] = str(row[COL_C]).strip() if row[COL_C] else ""
+
+    return q_obj, raw_cats, bool(raw_media) and media_name is None
+
+
+# ---------------------------------------------------------------------------
+# CLI / setup
+# ---------------------------------------------------------------------------
+def add_build_args(parser: argparse.ArgumentParser) -> None:
+    parser.add_argument(
+        "--excel",
+        default="Pytania_egzaminacyjne_na_kierowcę_122025.xlsx",
+        help="Path to the Excel question bank",
+    )
+    parser.add_argument(
+        "--media-dir",
+        default="Pytania egzaminacyjne na prawo jazdy 2025",
+        help="Directory with source media files",
+    )
+    parser.add_argument(
+        "--out-dir",
+        default="src/data",
+        help="Output directory for JSON files",
+    )
+    parser.add_argument(
+        "--reader",
+        choices=READERS,
+        default="stream",
+        help="Workbook reader: streaming XML parser (default) or openpyxl",
+    )
+    parser.add_argument(
+        "--cache-dir",
+        default=".build-cache",
+        help="Directory for build caches (media index, build state)",
+    )
+    parser.add_argument(
+        "--layout",
+        choices=LAYOUTS,
+        default="full",
+        help="full: questions embedded per category; normalized: shared questions.json + id lists",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Ignore the build cache and regenerate all outputs",
+    )
+
+
+def project_path(value: str) -> Path:
+    """Resolve a CLI path relative to the project root (parent of scripts/)."""
+    return Path(value) if os.path.isabs(value) else PROJECT_ROOT / value
+
+
+def prepare_media_index(media_dir: Path, cache_dir: Path) -> dict | None:
+    if not media_dir.exists():
+        print(f"WARNING: media directory not found: {media_dir} — skipping media checks")
+        return None
+    print(f"Indexing media in {media_dir.name} ...")
+    return build_media_index(media_dir, cache_dir / "media-index.json")
+
+
+def build_fingerprint(excel_path: Path, media_index: dict | None, options: dict, sources: list[str]) -> str:
+    """Fingerprint everything that feeds a build step's outputs."""
+    return fingerprint(
+        sha256_file(excel_path),
+        media_index_digest(media_index),
+        options,
+        sources_fingerprint(*(SCRIPTS_DIR / name for name in sources + PIPELINE_SOURCES)),
+    )
+
+
+# ---------------------------------------------------------------------------
+# Stages
+# ---------------------------------------------------------------------------
+def parse_stage(
+    excel_path: Path,
+    reader: str,
+    media_index: dict | None,
+    metrics: Metrics | None = None,
+    media_names: dict[str, str] | None = None,
+):
+    """Stream the sheet into (all_questions, {cat: [questions]}), in sheet order.
+
+    Media fields name content-addressed objects where media_names has them.
+
+    Counts rows_read, media_lookups and media_missing into metrics if given.
+    """
+    print(f"Loading {excel_path.name} ...")
+    rows = iter_workbook_rows(excel_path, reader=reader)
+    header = next(rows, None)
+    if header is None:
+        sys.exit(f"Excel file is empty: {excel_path}")
+
+    cat_questions: dict[str, list] = {cat: [] for cat in CATEGORIES}
+    all_questions: list[dict] = []
+    missing_media_count = 0
+    media_count = 0
+
+    for row in rows:
+        if all(cell is None for cell in row):
+            continue
+        q_obj, raw_cats, media_missing = build_question(row, media_index, media_names)
+        if media_missing:
+            missing_media_count += 1
+        if q_obj["media"] or media_missing:
+            media_count += 1
+        all_questions.append(q_obj)
+
+        # Assign to each listed category
+        for cat in raw_cats.split(","):
+            cat = cat.strip()
+            if cat in cat_questions:
+                cat_questions[cat].append(q_obj)
+
+    print(f"  {len(all_questions)} questions found (header: {len(header)} cols)")
+
+    if missing_media_count:
+        print(f"  WARNING: {missing_media_count} questions reference media files not found in source directory")
+
+    if metrics is not None:
+        metrics.count("rows_read", len(all_questions))
+        metrics.count("media_lookups", media_count if media_index is not None else 0)
+        metrics.count("media_missing", missing_media_count)
+
+    return all_questions, cat_questions
+
+
+def meta_stage(cat_questions: dict[str, list]) -> dict:
+    """Compute meta.json from the final per-category lists."""
+    meta_categories = []
+    for cat in CATEGORIES:
+        questions = cat_questions[cat]
+        basic_count = sum(1 for q in questions if q["type"] == "basic")
+        meta_categories.append({
+            "id": cat,
+            "name": f"Kategoria {cat}",
+            "questionCount": len(questions),
+            "basicCount": basic_count,
+            "specialistCount": len(questions) - basic_count,
+            "pools": pool_sizes(category_pools(questions)),
+        })
+    return {
+        "categories": meta_categories,
+        "exam": EXAM_RULES,
+    }
+
+
+def write_stage(
+    out_dir: Path,
+    layout: str,
+    all_questions: list[dict],
+    cat_questions: dict[str, list],
+    meta: dict,
+    cache: BuildCache,
+    cache_dir: Path,
+) -> None:
+    """Serialize every output once, through the build cache.
+
+    The columnar question table for the build tools (question_table.py) goes
+    to cache_dir, stamped with the hashes of the data files just written.
+    """
+    out_dir.mkdir(parents=True, exist_ok=True)
+    print()
+
+    # Write the shared store (normalized layout) or drop a stale one
+    store_file = out_dir / STORE_FILENAME
+    if layout == "normalized":
+        store = build_store(all_questions)
+        cache.write(store_file, dump_min(store))
+        print(f"  {len(store['questions'])} unique questions → {store_file.name}")
+    else:
+        cache.forget(store_file)
+        if store_file.exists():
+            store_file.unlink()
+
+    # Write per-category JSON files
+    for cat_meta in meta["categories"]:
+        cat = cat_meta["id"]
+        questions = cat_questions[cat]
+        cat_file = out_dir / f"{cat}.json"
+        if layout == "normalized":
+            cache.write(cat_file, dump_min(category_ids(cat, questions)))
+        else:
+            cache.write(cat_file, dump_min({"category": cat, "questions": questions}))
+
+        print(f"  {cat:>3}: {cat_meta['questionCount']:>4} questions "
+              f"({cat_meta['basicCount']} basic + {cat_meta['specialistCount']} specialist) → {cat_file.name}")
+
+    meta_file = out_dir / "meta.json"
+    cache.write(meta_file, dump_min(meta))
+    print(f"\n  meta.json written to {meta_file}")
+    cache.write(out_dir / EXAM_INDEX_FILENAME, dump_min(build_exam_index(cat_questions)))
+    print(f"  Exam pools for {len(cat_questions)} categories → {EXAM_INDEX_FILENAME}")
+
+    table_file = cache_dir / TABLE_FILENAME
+    table = build_table(all_questions, cat_questions, CATEGORIES)
+    cache_dir.mkdir(parents=True, exist_ok=True)
+    cache.write(table_file, dump_table(table, out_dir))
+    print(f"  {table['count']} question rows → {table_file.name}")
+    total = sum(c["questionCount"] for c in meta["categories"])
+    print(f"\n  TOTAL: {total} question-category assignments across {len(CATEGORIES)} categories")
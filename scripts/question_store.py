@@ -0,0 +1,59 @@
+"""
+Normalized question store layout for src/data.
+
+In the "full" layout every {cat}.json embeds complete question objects, so a
+question listed in several categories is stored (and downloaded) once per
+category. The "normalized" layout writes each question once:
+
+  - questions.json   — {"questions": {"<id>": {...question...}, ...}}
+  - {cat}.json       — {"category": "B", "basic": [ids], "specialist": [ids]}
+
+Id lists keep sheet order; expand_category() restores the interleaved order
+of the full layout by ranking ids by their position in the store.
+"""
+
+import json
+import os
+from pathlib import Path
+
+STORE_FILENAME = "questions.json"
+LAYOUTS = ("full", "normalized")
+
+
+def is_normalized(cat_data: dict) -> bool:
+    return "questions" not in cat_data
+
+
+def build_store(questions) -> dict:
+    """Build the shared store from question objects (first occurrence wins)."""
+    store: dict[str, dict] = {}
+    for q in questions:
+        store.setdefault(str(q["id"]), q)
+    return {"questions": store}
+
+
+def category_ids(category: str, questions: list[dict]) -> dict:
+    return {
+        "category": category,
+        "basic": [q["id"] for q in questions if q["type"] == "basic"],
+        "specialist": [q["id"] for q in questions if q["type"] == "specialist"],
+    }
+
+
+def expand_category(cat_data: dict, store: dict) -> dict:
+    """Join a normalized category file with the store into the full layout."""
+    if not is_normalized(cat_data):
+        return cat_data
+    by_id = store["questions"]
+    rank = {qid: i for i, qid in enumerate(by_id)}
+    ids = [str(qid) for qid in cat_data["basic"] + cat_data["specialist"]]
+    ids = sorted((qid for qid in ids if qid in by_id), key=rank.__getitem__)
+    return {"category": cat_data["category"], "questions": [by_id[qid] for qid in ids]}
+
+
+def load_store(data_dir: str | Path) -> dict | None:
+    path = os.path.join(data_dir, STORE_FILENAME)
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
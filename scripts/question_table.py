@@ -0,0 +1,112 @@
+"""
+Canonical columnar question table for the build tools.
+
+parse-excel.py / build-data.py write .build-cache/question-table.json next to
+the src/data JSON: every question row once, stored column by column, plus a
+category-membership bitmask per row (bit i = CATEGORIES[i]):
+
+  {"version": 1, "categories": ["A", ...], "count": N,
+   "sources": {"meta.json": "<sha256>", "A.json": "<sha256>", ...},
+   "columns": {"id": [...], "q": [...], "type": [...], ..., "cats": [mask, ...]}}
+
+Rows keep sheet order, so the rows with bit i set are exactly the questions of
+CATEGORIES[i] in the order of the full-layout {cat}.json. Downstream tools
+(translation, filtering, indexing) load this one file instead of re-parsing
+every category file. ``sources`` records the hashes of the data files the
+table mirrors; load_table() ignores a table whose data files have changed
+since, so callers fall back to reading src/data directly.
+"""
+
+import json
+import os
+from pathlib import Path
+
+from build_cache import sha256_file
+from question_store import STORE_FILENAME
+
+TABLE_FILENAME = "question-table.json"
+TABLE_VERSION = 1
+
+# Column order doubles as the key order of rebuilt question objects
+COLUMNS = ["id", "q", "type", "correct", "media", "mediaType", "a", "b", "c"]
+ANSWER_COLUMNS = ("a", "b", "c")
+
+
+def category_mask(categories: list[str], members) -> int:
+    mask = 0
+    for cat in members:
+        mask |= 1 << categories.index(cat)
+    return mask
+
+
+def mask_categories(categories: list[str], mask: int) -> list[str]:
+    return [cat for bit, cat in enumerate(categories) if mask >> bit & 1]
+
+
+def build_table(all_questions: list[dict], cat_questions: dict[str, list], categories: list[str]) -> dict:
+    """Column-orient the parsed questions and record their category membership."""
+    masks = {id(q): 0 for q in all_questions}
+    for bit, cat in enumerate(categories):
+        for q in cat_questions.get(cat, []):
+            masks[id(q)] |= 1 << bit
+
+    columns = {name: [q.get(name) for q in all_questions] for name in COLUMNS}
+    columns["cats"] = [masks[id(q)] for q in all_questions]
+    return {
+        "version": TABLE_VERSION,
+        "categories": list(categories),
+        "count": len(all_questions),
+        "sources": {},
+        "columns": columns,
+    }
+
+
+def table_questions(table: dict) -> list[dict]:
+    """Rebuild question objects (same keys and key order as the JSON files)."""
+    columns = table["columns"]
+    questions = []
+    for row in zip(*(columns[name] for name in COLUMNS)):
+        q = dict(zip(COLUMNS, row))
+        if q["type"] != "specialist":
+            for name in ANSWER_COLUMNS:
+                del q[name]
+        questions.append(q)
+    return questions
+
+
+def table_categories(table: dict, questions: list[dict]) -> dict[str, list]:
+    """Split rows (as returned by table_questions) into per-category lists."""
+    categories = table["categories"]
+    cat_questions: dict[str, list] = {cat: [] for cat in categories}
+    for q, mask in zip(questions, table["columns"]["cats"]):
+        for cat in mask_categories(categories, mask):
+            cat_questions[cat].append(q)
+    return cat_questions
+
+
+def data_sources(data_dir: str | Path, categories: list[str]) -> dict[str, str]:
+    """Hash the src/data files a table mirrors."""
+    names = ["meta.json"] + [f"{cat}.json" for cat in categories]
+    if os.path.exists(os.path.join(data_dir, STORE_FILENAME)):
+        names.append(STORE_FILENAME)
+    return {name: sha256_file(os.path.join(data_dir, name)) for name in names}
+
+
+def dump_table(table: dict, data_dir: str | Path) -> str:
+    """Serialize a table after stamping it with the current data file hashes."""
+    table["sources"] = data_sources(data_dir, table["categories"])
+    return json.dumps(table, ensure_ascii=False, separators=(",", ":")) + "\n"
+
+
+def load_table(table_path: str | Path, data_dir: str | Path | None = None) -> dict | None:
+    """Load the table, or None if missing, unreadable or stale relative to data_dir."""
+    try:
+        with open(table_path, encoding="utf-8") as f:
+            table = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if table.get("version") != TABLE_VERSION:
+        return None
+    if data_dir is not None and table.get("sources") != data_sources(data_dir, table["categories"]):
+        return None
+    return table
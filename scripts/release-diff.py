@@ -0,0 +1,245 @@
+#!/usr/bin/env python3
+"""
+Emit delta patches between the previous and the new release of src/data.
+
+Run after rebuilding src/data for a new question bank, before committing it.
+For every data file whose content hash changed, the previous version (from a
+git ref, HEAD by default, or a directory) is compared with the new one by
+question id:
+
+  src/data/patches/{file}.{from}.json
+    {"version": 1, "file": "B.json", "from": "<sha256>", "to": "<sha256>",
+     "kind": "list", "added": [["<id>", {...}], ...], "changed": [["<id>", {...}], ...],
+     "removed": ["<id>", ...], "order": ["<id>", ...]}
+
+  src/data/patches/index.json
+    {"version": 1, "releases": ["2025-12", ...],
+     "files": {"B.json": {"<from>": {"to": "<to>", "patch": "B.json.<from>.json",
+                                     "size": 1234, "release": "2025-12"}}}}
+
+Hashes in the index are the 16-character prefixes used in data URLs (see
+data_assets.py). ``kind`` is "list" for full-layout category files
+(questions array), "map" for questions.json and "root" for translations
+files (objects keyed by id). ``order`` (the full new id order) is omitted
+when it equals the old order without the removed ids, followed by the added
+ones. Other files (meta.json, id lists) are small and are simply refetched.
+Patches from the last --keep releases stay in the index, so clients that
+skipped a release can chain them; sw.js and data.js fall back to the full
+file whenever no chain reaches the current hash. The search index and the
+asset manifest are rebuilt before diffing and again afterwards, so the
+manifest advertises the new index (see data_assets.py).
+
+Usage:
+  python3 scripts/release-diff.py [--release LABEL] [--base REF | --old-dir PATH]
+                                  [--data-dir PATH] [--cache-dir PATH] [--keep N]
+"""
+
+import argparse
+import datetime
+import json
+import subprocess
+import sys
+from pathlib import Path
+
+from build_cache import sha256_bytes, write_atomic
+from data_assets import ASSET_MANIFEST, dump_min, package_data
+from pipeline import PROJECT_ROOT, project_path
+from search_index import build_search
+
+PATCH_DIR = "patches"
+INDEX_FILENAME = "index.json"
+PATCH_VERSION = 1
+HASH_PREFIX = 16
+MAX_PATCH_RATIO = 0.5  # Ship the full file instead when the patch is larger than this
+
+
+# ---------------------------------------------------------------------------
+# Diffing
+# ---------------------------------------------------------------------------
+def patch_kind(name: str, data) -> str | None:
+    if not isinstance(data, dict):
+        return None
+    if name.startswith("translations_"):
+        return "root"
+    questions = data.get("questions")
+    if isinstance(questions, list) and all(isinstance(q, dict) and "id" in q for q in questions):
+        return "list"
+    if isinstance(questions, dict):
+        return "map"
+    return None
+
+
+def records(kind: str, data: dict) -> dict[str, dict]:
+    if kind == "list":
+        return {str(q["id"]): q for q in data["questions"]}
+    if kind == "map":
+        return data["questions"]
+    return data
+
+
+def envelope(kind: str, data: dict) -> dict:
+    """Everything outside the record collection; patches require it unchanged."""
+    return {} if kind == "root" else {k: v for k, v in data.items() if k != "questions"}
+
+
+def diff_file(name: str, old: dict, new: dict) -> dict | None:
+    """Id-level diff of two versions of a data file, or None if not patchable."""
+    kind = patch_kind(name, new)
+    if kind is None or patch_kind(name, old) != kind or envelope(kind, old) != envelope(kind, new):
+        return None
+    if kind == "list" and len({str(q["id"]) for q in new["questions"]}) != len(new["questions"]):
+        return None  # Duplicate ids can't be addressed by id
+
+    old_records = records(kind, old)
+    new_records = records(kind, new)
+    delta = {
+        "kind": kind,
+        "added": [[qid, q] for qid, q in new_records.items() if qid not in old_records],
+        "changed": [[qid, q] for qid, q in new_records.items() if qid in old_records and old_records[qid] != q],
+        "removed": [qid for qid in old_records if qid not in new_records],
+    }
+    # The order is only spelled out when it isn't "old ids minus removed, then added"
+    implied = [qid for qid in old_records if qid in new_records] + [qid for qid, _q in delta["added"]]
+    if implied != list(new_records):
+        delta["order"] = list(new_records)
+    return delta
+
+
+# ---------------------------------------------------------------------------
+# Previous release
+# ---------------------------------------------------------------------------
+def old_reader(args, data_dir: Path):
+    """Return name -> bytes | None for the previous release of data_dir."""
+    if args.old_dir:
+        old_dir = project_path(args.old_dir)
+
+        def read(name: str) -> bytes | None:
+            path = old_dir / name
+            return path.read_bytes() if path.exists() else None
+        return read
+
+    rel = data_dir.resolve().relative_to(PROJECT_ROOT).as_posix()
+
+    def read(name: str) -> bytes | None:
+        result = subprocess.run(
+            ["git", "show", f"{args.base}:{rel}/{name}"],
+            cwd=PROJECT_ROOT,
+            capture_output=True,
+        )
+        return result.stdout if result.returncode == 0 else None
+    return read
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+def load_index(path: Path) -> dict:
+    try:
+        with open(path, encoding="utf-8") as f:
+            index = json.load(f)
+    except (OSError, ValueError):
+        index = None
+    if not index or index.get("version") != PATCH_VERSION:
+        return {"version": PATCH_VERSION, "releases": [], "files": {}}
+    return index
+
+
+def prune_index(index: dict, keep: int, patch_dir: Path) -> None:
+    """Keep patches of the last `keep` releases; delete unreferenced patch files."""
+    index["releases"] = index["releases"][-keep:]
+    kept = set(index["releases"])
+    for name in list(index["files"]):
+        chain = {src: step for src, step in index["files"][name].items() if step["release"] in kept}
+        if chain:
+            index["files"][name] = chain
+        else:
+            del index["files"][name]
+
+    referenced = {step["patch"] for chain in index["files"].values() for step in chain.values()}
+    for path in patch_dir.glob("*.json"):
+        if path.name != INDEX_FILENAME and path.name not in referenced:
+            path.unlink()
+
+
+def package(data_dir: Path, cache_dir: Path) -> None:
+    """Search index, then asset manifest, for data_dir as it is (as parse-excel.py does)."""
+    build_search(data_dir, cache_dir)
+    package_data(data_dir, cache_dir)
+
+
+# ---------------------------------------------------------------------------
+# Main
+# ---------------------------------------------------------------------------
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--release", default=datetime.date.today().isoformat(), help="Label of the new release")
+    source = parser.add_mutually_exclusive_group()
+    source.add_argument("--base", default="HEAD", help="Git ref holding the previous release (default: HEAD)")
+    source.add_argument("--old-dir", help="Directory holding the previous release instead of a git ref")
+    parser.add_argument("--data-dir", default="src/data", help="Directory with the new release")
+    parser.add_argument("--cache-dir", default=".build-cache", help="Directory for build caches")
+    parser.add_argument("--keep", type=int, default=3, help="Releases whose patches stay available")
+    args = parser.parse_args()
+
+    data_dir = project_path(args.data_dir)
+    cache_dir = project_path(args.cache_dir)
+    if not data_dir.is_dir():
+        sys.exit(f"Data directory not found: {data_dir}")
+
+    # Make sure the search index and the manifest describe exactly the files being diffed
+    package(data_dir, cache_dir)
+    with open(data_dir / ASSET_MANIFEST, encoding="utf-8") as f:
+        manifest = json.load(f)
+
+    patch_dir = data_dir / PATCH_DIR
+    patch_dir.mkdir(exist_ok=True)
+    index_path = patch_dir / INDEX_FILENAME
+    index = load_index(index_path)
+    read_old = old_reader(args, data_dir)
+
+    print(f"Diffing release {args.release} against {args.old_dir or args.base} ...")
+    written = 0
+    for name, entry in manifest["files"].items():
+        old_bytes = read_old(name)
+        if old_bytes is None:
+            continue
+        old_hash = sha256_bytes(old_bytes)
+        if old_hash == entry["sha256"]:
+            continue
+
+        new = json.loads((data_dir / name).read_bytes())
+        delta = diff_file(name, json.loads(old_bytes), new)
+        if delta is None:
+            print(f"  {name}: changed, not patchable — clients refetch it")
+            continue
+
+        patch = {"version": PATCH_VERSION, "file": name, "from": old_hash, "to": entry["sha256"], **delta}
+        text = dump_min(patch)
+        if len(text) > entry["size"] * MAX_PATCH_RATIO:
+            print(f"  {name}: patch would be {len(text)} of {entry['size']} bytes — clients refetch it")
+            continue
+
+        src = old_hash[:HASH_PREFIX]
+        patch_name = f"{name}.{src}.json"
+        write_atomic(patch_dir / patch_name, text.encode("utf-8"))
+        index["files"].setdefault(name, {})[src] = {
+            "to": entry["sha256"][:HASH_PREFIX],
+            "patch": patch_name,
+            "size": len(text),
+            "release": args.release,
+        }
+        written += 1
+        print(f"  {name}: +{len(delta['added'])} ~{len(delta['changed'])} -{len(delta['removed'])} "
+              f"→ {patch_name} ({len(text)} of {entry['size']} bytes)")
+
+    if args.release not in index["releases"]:
+        index["releases"].append(args.release)
+    prune_index(index, args.keep, patch_dir)
+    write_atomic(index_path, (json.dumps(index, indent=2) + "\n").encode("utf-8"))
+    print(f"\n  {written} patches written, index covers {len(index['releases'])} releases → {PATCH_DIR}/{INDEX_FILENAME}")
+    # Advertise the new index in the asset manifest (clients only look for patches then)
+    package(data_dir, cache_dir)
+
+
+if __name__ == "__main__":
+    main()
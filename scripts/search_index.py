@@ -0,0 +1,209 @@
+"""
+Full-text search index over the question bank (Polish text + translations).
+
+Built from src/data after every data change and searched by src/js/search.js
+without loading any category file. Terms come from the question and answer
+texts (q/a/b/c) in Polish and from translations_{lang}.json for
+SEARCH_LANGS:
+
+  - folding: lowercase, "ł" → "l", diacritics stripped (NFKD), so "znak
+    ustąpienia" and "znak ustapienia" are the same query,
+  - tokens: runs of [a-z0-9], at least MIN_TOKEN characters, minus STOPWORDS,
+  - stemming by prefix: Polish inflects mostly in word endings, so terms are
+    cut to STEM_LENGTH characters ("pierwszeństwa", "pierwszeństwo" →
+    "pierws"); shorter query words match every term they prefix.
+
+Outputs (both minified):
+
+  src/data/search-index.json
+    {"version": 1, "stemLength": 6, "minToken": 2, "stopwords": [...],
+     "categories": ["A", ...], "ids": ["<id>", ...], "masks": [<int>, ...],
+     "shards": {"p": "<hash prefix>", ...}}
+
+  src/data/search/{prefix}.json — terms sharing their first SHARD_PREFIX
+  character(s): {"pierws": [[doc deltas in q], [doc deltas in answers]], ...}
+
+Documents are positions in ``ids``; ``masks`` holds each question's category
+bitmask (bit i = categories[i], as in question_table.py). Postings are
+sorted document numbers, delta-encoded. A query word needs one shard, fetched
+as search/{prefix}.json?v=<hash> (immutable, like data URLs).
+"""
+
+import json
+import re
+import unicodedata
+from pathlib import Path
+
+from build_cache import BuildCache, fingerprint, sha256_bytes, sha256_file, sources_fingerprint
+from data_assets import dump_min
+from pipeline import CATEGORIES
+from question_store import STORE_FILENAME, expand_category, is_normalized, load_store
+from question_table import TABLE_FILENAME, category_mask, load_table, table_questions
+
+INDEX_FILENAME = "search-index.json"
+SHARD_DIR = "search"
+INDEX_VERSION = 1
+SEARCH_LANGS = ("en",)
+STEM_LENGTH = 6
+MIN_TOKEN = 2
+SHARD_PREFIX = 1
+HASH_PREFIX = 16
+TEXT_FIELDS = ("q",)
+ANSWER_FIELDS = ("a", "b", "c")
+SOURCES = ["search_index.py", "question_table.py", "question_store.py", "build_cache.py"]
+
+# Words too common to narrow a search (folded forms)
+STOPWORDS = sorted({
+    "a", "aby", "albo", "ani", "by", "czy", "dla", "do", "i", "jak", "jest", "jezeli", "ktory", "lub",
+    "na", "nie", "o", "od", "oraz", "po", "przy", "sie", "ta", "tak", "te", "tej", "ten", "to", "w",
+    "we", "z", "za", "ze",
+    "an", "and", "are", "as", "at", "be", "by", "can", "for", "if", "in", "is", "it", "of", "on", "or",
+    "the", "this", "to", "you", "your",
+})
+
+TOKEN_RE = re.compile(r"[a-z0-9]+")
+COMBINING_RE = re.compile("[\u0300-\u036f]")
+
+
+# ---------------------------------------------------------------------------
+# Text
+# ---------------------------------------------------------------------------
+def fold(text: str) -> str:
+    """Lowercase and strip diacritics (mirrored by fold() in src/js/search.js)."""
+    return COMBINING_RE.sub("", unicodedata.normalize("NFKD", text.lower().replace("ł", "l")))
+
+
+def terms(text: str | None) -> set[str]:
+    if not text:
+        return set()
+    stopwords = set(STOPWORDS)
+    return {
+        token[:STEM_LENGTH]
+        for token in TOKEN_RE.findall(fold(text))
+        if len(token) >= MIN_TOKEN and token not in stopwords
+    }
+
+
+# ---------------------------------------------------------------------------
+# Documents
+# ---------------------------------------------------------------------------
+def load_documents(data_dir: Path, cache_dir: Path) -> tuple[list[str], list[dict], list[int], list[str]]:
+    """(ids, questions, masks, categories) — from the question table when fresh."""
+    table = load_table(cache_dir / TABLE_FILENAME, data_dir)
+    if table is not None:
+        questions = table_questions(table)
+        return [str(q["id"]) for q in questions], questions, table["columns"]["cats"], table["categories"]
+
+    store = load_store(data_dir)
+    categories = [cat for cat in CATEGORIES if (data_dir / f"{cat}.json").exists()]
+    by_id: dict[str, dict] = {}
+    members: dict[str, set] = {}
+    for cat in categories:
+        with open(data_dir / f"{cat}.json", encoding="utf-8") as f:
+            data = json.load(f)
+        if is_normalized(data):
+            data = expand_category(data, store)
+        for q in data["questions"]:
+            qid = str(q["id"])
+            by_id.setdefault(qid, q)
+            members.setdefault(qid, set()).add(cat)
+    ids = list(by_id)
+    masks = [category_mask(categories, members[qid]) for qid in ids]
+    return ids, [by_id[qid] for qid in ids], masks, categories
+
+
+def load_translations(data_dir: Path) -> list[dict]:
+    result = []
+    for lang in SEARCH_LANGS:
+        path = data_dir / f"translations_{lang}.json"
+        if path.exists():
+            with open(path, encoding="utf-8") as f:
+                result.append(json.load(f))
+    return result
+
+
+# ---------------------------------------------------------------------------
+# Index
+# ---------------------------------------------------------------------------
+def delta_encode(docs: set[int]) -> list[int]:
+    previous, deltas = 0, []
+    for doc in sorted(docs):
+        deltas.append(doc - previous)
+        previous = doc
+    return deltas
+
+
+def build_index(ids: list[str], questions: list[dict], masks: list[int], categories: list[str],
+                translations: list[dict]) -> tuple[dict, dict[str, dict]]:
+    """Return (index meta without shard hashes, shards by prefix)."""
+    in_text: dict[str, set[int]] = {}
+    in_answers: dict[str, set[int]] = {}
+    for doc, (qid, q) in enumerate(zip(ids, questions)):
+        records = [q] + [tr[qid] for tr in translations if qid in tr]
+        for record in records:
+            for field in TEXT_FIELDS:
+                for term in terms(record.get(field)):
+                    in_text.setdefault(term, set()).add(doc)
+            for field in ANSWER_FIELDS:
+                for term in terms(record.get(field)):
+                    in_answers.setdefault(term, set()).add(doc)
+
+    shards: dict[str, dict] = {}
+    for term in sorted(in_text.keys() | in_answers.keys()):
+        postings = [delta_encode(in_text.get(term, set())), delta_encode(in_answers.get(term, set()))]
+        shards.setdefault(term[:SHARD_PREFIX], {})[term] = postings
+
+    meta = {
+        "version": INDEX_VERSION,
+        "stemLength": STEM_LENGTH,
+        "minToken": MIN_TOKEN,
+        "stopwords": STOPWORDS,
+        "categories": categories,
+        "ids": ids,
+        "masks": masks,
+    }
+    return meta, shards
+
+
+def search_fingerprint(data_dir: Path) -> str:
+    names = ["meta.json", STORE_FILENAME, *(f"{cat}.json" for cat in CATEGORIES),
+             *(f"translations_{lang}.json" for lang in SEARCH_LANGS)]
+    return fingerprint(
+        [(name, sha256_file(data_dir / name)) for name in names],
+        sources_fingerprint(*(Path(__file__).resolve().parent / name for name in SOURCES)),
+    )
+
+
+def build_search(data_dir: str | Path, cache_dir: str | Path, force: bool = False) -> dict | None:
+    """Rebuild the search index for data_dir (skipped when nothing changed)."""
+    data_dir, cache_dir = Path(data_dir), Path(cache_dir)
+    cache = BuildCache(cache_dir, "search-index", force=force)
+    inputs = search_fingerprint(data_dir)
+    if cache.is_fresh(inputs):
+        return None
+
+    print("\nBuilding search index ...")
+    ids, questions, masks, categories = load_documents(data_dir, cache_dir)
+    meta, shards = build_index(ids, questions, masks, categories, load_translations(data_dir))
+
+    shard_dir = data_dir / SHARD_DIR
+    shard_dir.mkdir(exist_ok=True)
+    hashes = {}
+    for prefix, shard in shards.items():
+        text = dump_min(shard)
+        hashes[prefix] = sha256_bytes(text.encode("utf-8"))[:HASH_PREFIX]
+        cache.write(shard_dir / f"{prefix}.json", text)
+    for path in shard_dir.glob("*.json"):
+        if path.stem not in shards:
+            cache.forget(path)
+            path.unlink()
+
+    meta["shards"] = hashes
+    cache.write(data_dir / INDEX_FILENAME, dump_min(meta))
+    postings = sum(len(p[0]) + len(p[1]) for shard in shards.values() for p in shard.values())
+    size = sum((shard_dir / f"{prefix}.json").stat().st_size for prefix in shards)
+    print(f"  {len(ids)} questions, {sum(map(len, shards.values()))} terms, {postings} postings "
+          f"in {len(shards)} shards ({size} bytes) → {INDEX_FILENAME}")
+
+    cache.commit(inputs)
+    return meta
@@ -0,0 +1,243 @@
+"""
+Synthetic question banks for the pipeline benchmarks (bench-pipeline.py).
+
+generate_bank() writes an .xlsx shaped like the ministry sheet (same columns,
+shared-strings table, category lists, media references) at any multiple of
+the real row count, plus a fake media directory with one small file per
+referenced name. Rows follow the real bank's mix:
+
+  - category lists and basic/specialist split from CATEGORY_MIX (the most
+    common combinations in the current bank, same proportions),
+  - ~45% images, ~34% videos, the rest without media; some media-less rows
+    say "W tej sytuacji" (removed by the missing-media filter), ~1% of
+    references point at files that do not exist, some differ in case,
+  - Polish question/answer text built from a small vocabulary, so lengths
+    and duplicate rates resemble the real texts.
+
+Media names are drawn from a pool of at most MEDIA_POOL_LIMIT names per media
+type, so the 100x bank shares files between rows instead of creating hundreds
+of thousands of them.
+Output is deterministic for a (scale, seed) pair and reused when unchanged:
+
+  <out_dir>/bank.xlsx, <out_dir>/media/, <out_dir>/bank.json (summary)
+"""
+
+import json
+import random
+import shutil
+import zipfile
+from pathlib import Path
+from xml.sax.saxutils import escape
+
+REAL_ROW_COUNT = 3719
+GENERATOR_VERSION = 1
+SUMMARY_FILENAME = "bank.json"
+MEDIA_POOL_LIMIT = 40000
+MISSING_MEDIA_SHARE = 0.01
+CASE_MISMATCH_SHARE = 0.05
+SITUATION_SHARE = 0.3  # of media-less rows
+
+HEADER = [
+    "Lp.", "Numer pytania", "Pytanie", "Odpowiedź A", "Odpowiedź B", "Odpowiedź C",
+    "Poprawna odp", "Media", "Zakres struktury", "Kategorie",
+]
+
+# (structure, category list, weight) -- weights are question counts in the current bank
+CATEGORY_MIX = [
+    ("PODSTAWOWY", "A,A1,A2,AM,B,B1,C,C1,D,D1,T", 1065),
+    ("PODSTAWOWY", "B", 462),
+    ("PODSTAWOWY", "PT", 255),
+    ("SPECJALISTYCZNY", "B", 234),
+    ("PODSTAWOWY", "AM", 223),
+    ("SPECJALISTYCZNY", "D,D1", 170),
+    ("SPECJALISTYCZNY", "PT", 166),
+    ("SPECJALISTYCZNY", "T", 135),
+    ("SPECJALISTYCZNY", "C,C1", 129),
+    ("SPECJALISTYCZNY", "A,A1,A2", 114),
+    ("SPECJALISTYCZNY", "B,B1", 113),
+    ("SPECJALISTYCZNY", "AM", 69),
+    ("PODSTAWOWY", "A,A1,A2,B,B1,C,C1,D,D1", 41),
+    ("PODSTAWOWY", "A,A1,A2,AM,B,B1,C,C1,D,D1", 32),
+    ("PODSTAWOWY", "B,B1,C,C1,D,D1", 25),
+    ("PODSTAWOWY", "A,A1,A2,AM,B,B1,C,C1,D,D1,PT,T", 20),
+]
+MEDIA_MIX = [("image", 45), ("video", 34), (None, 21)]
+
+SUBJECTS = [
+    "kierujący pojazdem", "kierujący motocyklem", "kierujący autobusem", "pieszy", "rowerzysta",
+    "kierujący ciągnikiem rolniczym", "motorniczy tramwaju", "kierujący pojazdem ciężarowym",
+]
+VERBS = [
+    "ma obowiązek", "może", "powinien", "jest uprawniony, aby", "musi", "nie może",
+]
+ACTIONS = [
+    "zatrzymać pojazd przed przejściem dla pieszych", "wyprzedzić pojazd jadący przed nim",
+    "zawrócić na skrzyżowaniu", "ustąpić pierwszeństwa pojazdom nadjeżdżającym z prawej strony",
+    "włączyć światła mijania", "zmniejszyć prędkość przed zakrętem", "skręcić w lewo",
+    "zatrzymać się na przystanku", "zmienić pas ruchu", "przejechać przez przejazd kolejowy",
+    "użyć sygnału dźwiękowego", "zaparkować na chodniku", "cofać na drodze ekspresowej",
+]
+PLACES = [
+    "w strefie zamieszkania", "na drodze jednokierunkowej", "na autostradzie", "w tunelu",
+    "na skrzyżowaniu o ruchu okrężnym", "w obszarze zabudowanym", "poza obszarem zabudowanym",
+    "na moście", "przy dobrej widoczności", "w czasie opadów śniegu",
+]
+ANSWERS = [
+    "50 km/h", "70 km/h", "90 km/h", "Tak, zawsze.", "Tylko w porze nocnej.", "Nie, nigdy.",
+    "Pieszemu.", "Pojazdowi uprzywilejowanemu.", "Tramwajowi.", "Tylko na prawym pasie ruchu.",
+    "Od 20 do 30 metrów.", "Do 100 metrów.", "Włączyć światła awaryjne.", "Zatrzymać pojazd.",
+    "Zwiększyć odstęp od poprzedzającego pojazdu.", "Zgłosić zdarzenie policji.",
+]
+MEDIA_STEMS = ["R_", "AB_", "D", "SKRZ_", "znak ", "Tramwaj_", "M_", "T_"]
+
+
+# ---------------------------------------------------------------------------
+# Rows
+# ---------------------------------------------------------------------------
+def question_text(rng: random.Random, situation: bool) -> str:
+    text = f"Czy {rng.choice(SUBJECTS)} {rng.choice(VERBS)} {rng.choice(ACTIONS)} {rng.choice(PLACES)}?"
+    return f"W tej sytuacji: {text[0].lower()}{text[1:]}" if situation else text
+
+
+def media_name(index: int, media_type: str) -> str:
+    stem = MEDIA_STEMS[index % len(MEDIA_STEMS)]
+    return f"{stem}{index}org.{'wmv' if media_type == 'video' else 'jpg'}"
+
+
+def generate_rows(count: int, seed: int):
+    """Yield (row values, media file name or None) in sheet order."""
+    rng = random.Random(seed)
+    mixes = [(structure, cats) for structure, cats, _weight in CATEGORY_MIX]
+    mix_weights = [weight for _structure, _cats, weight in CATEGORY_MIX]
+    media_types = [media_type for media_type, _weight in MEDIA_MIX]
+    media_weights = [weight for _media_type, weight in MEDIA_MIX]
+    pool = max(1, min(MEDIA_POOL_LIMIT, count))
+
+    for lp in range(1, count + 1):
+        structure, cats = rng.choices(mixes, mix_weights)[0]
+        media_type = rng.choices(media_types, media_weights)[0]
+        specialist = structure == "SPECJALISTYCZNY"
+
+        media_cell, media_file = None, None
+        if media_type is not None:
+            media_file = media_name(rng.randrange(pool), media_type)
+            media_cell = media_file
+            if rng.random() < MISSING_MEDIA_SHARE:
+                media_cell, media_file = f"brak_{lp}.jpg", None
+            elif rng.random() < CASE_MISMATCH_SHARE:
+                media_cell = media_file.upper()  # Sheet and file names differ in case
+
+        situation = media_type is None and rng.random() < SITUATION_SHARE
+        row = [lp, lp * 7 + 3, question_text(rng, situation)]
+        if specialist:
+            row += rng.sample(ANSWERS, 3) + [rng.choice("ABC")]
+        else:
+            row += [None, None, None, rng.choice("TN")]
+        row += [media_cell, structure, cats]
+        yield row, media_file
+
+
+# ---------------------------------------------------------------------------
+# Workbook
+# ---------------------------------------------------------------------------
+CONTENT_TYPES = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Types xmlns="http://schemas.openxmlformats.org/package/2006/content-types">
+<Default Extension="rels" ContentType="application/vnd.openxmlformats-package.relationships+xml"/>
+<Default Extension="xml" ContentType="application/xml"/>
+<Override PartName="/xl/workbook.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet.main+xml"/>
+<Override PartName="/xl/worksheets/sheet1.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.worksheet+xml"/>
+<Override PartName="/xl/sharedStrings.xml" ContentType="application/vnd.openxmlformats-officedocument.spreadsheetml.sharedStrings+xml"/>
+</Types>"""
+ROOT_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/officeDocument" Target="xl/workbook.xml"/>
+</Relationships>"""
+WORKBOOK = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<workbook xmlns="http://schemas.openxmlformats.org/spreadsheetml/2006/main" xmlns:r="http://schemas.openxmlformats.org/officeDocument/2006/relationships">
+<sheets><sheet name="Pytania" sheetId="1" r:id="rId1"/></sheets>
+</workbook>"""
+WORKBOOK_RELS = """<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<Relationships xmlns="http://schemas.openxmlformats.org/package/2006/relationships">
+<Relationship Id="rId1" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/worksheet" Target="worksheets/sheet1.xml"/>
+<Relationship Id="rId2" Type="http://schemas.openxmlformats.org/officeDocument/2006/relationships/sharedStrings" Target="sharedStrings.xml"/>
+</Relationships>"""
+NS_MAIN = "http://schemas.openxmlformats.org/spreadsheetml/2006/main"
+COLUMNS = "ABCDEFGHIJ"
+
+
+def write_xlsx(path: Path, rows) -> set[str]:
+    """Write rows (header first) as a shared-strings workbook; returns the media files used."""
+    strings: dict[str, int] = {}
+    media_files: set[str] = set()
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as zf:
+        with zf.open("xl/worksheets/sheet1.xml", "w") as sheet:
+            sheet.write(f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<worksheet xmlns="{NS_MAIN}">'
+                        f'<sheetData>'.encode("utf-8"))
+            for r, (values, media_file) in enumerate(rows, start=1):
+                if media_file:
+                    media_files.add(media_file)
+                cells = []
+                for col, value in zip(COLUMNS, values):
+                    if value is None:
+                        continue
+                    if isinstance(value, int):
+                        cells.append(f'<c r="{col}{r}"><v>{value}</v></c>')
+                    else:
+                        index = strings.setdefault(value, len(strings))
+                        cells.append(f'<c r="{col}{r}" t="s"><v>{index}</v></c>')
+                sheet.write(f'<row r="{r}">{"".join(cells)}</row>'.encode("utf-8"))
+            sheet.write(b"</sheetData></worksheet>")
+        with zf.open("xl/sharedStrings.xml", "w") as f:
+            f.write(f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\n<sst xmlns="{NS_MAIN}" '
+                    f'count="{len(strings)}" uniqueCount="{len(strings)}">'.encode("utf-8"))
+            for text in strings:
+                f.write(f"<si><t>{escape(text)}</t></si>".encode("utf-8"))
+            f.write(b"</sst>")
+        zf.writestr("[Content_Types].xml", CONTENT_TYPES)
+        zf.writestr("_rels/.rels", ROOT_RELS)
+        zf.writestr("xl/workbook.xml", WORKBOOK)
+        zf.writestr("xl/_rels/workbook.xml.rels", WORKBOOK_RELS)
+    return media_files
+
+
+def write_media_dir(media_dir: Path, names: set[str]) -> None:
+    """One small file per name, with distinct content (the media index hashes them)."""
+    if media_dir.exists():
+        shutil.rmtree(media_dir)
+    media_dir.mkdir(parents=True)
+    for name in names:
+        (media_dir / name).write_bytes(f"synthetic media: {name}\n".encode("utf-8") * 8)
+
+
+# ---------------------------------------------------------------------------
+# Entry point
+# ---------------------------------------------------------------------------
+def generate_bank(out_dir: str | Path, scale: float, seed: int = 0) -> dict:
+    """Write (or reuse) the bank for scale x REAL_ROW_COUNT rows; returns its summary."""
+    out_dir = Path(out_dir)
+    rows = max(1, round(REAL_ROW_COUNT * scale))
+    summary_path = out_dir / SUMMARY_FILENAME
+    wanted = {"version": GENERATOR_VERSION, "rows": rows, "seed": seed}
+    try:
+        with open(summary_path, encoding="utf-8") as f:
+            summary = json.load(f)
+        if {key: summary.get(key) for key in wanted} == wanted and (out_dir / "bank.xlsx").exists():
+            return summary
+    except (OSError, ValueError):
+        pass
+
+    out_dir.mkdir(parents=True, exist_ok=True)
+    print(f"  Generating {rows} rows ({scale:g}x) in {out_dir} ...")
+    header = (HEADER, None)
+    media_files = write_xlsx(out_dir / "bank.xlsx", [header, *generate_rows(rows, seed)])
+    write_media_dir(out_dir / "media", media_files)
+    summary = {**wanted, "scale": scale, "mediaFiles": len(media_files)}
+    summary_path.write_text(json.dumps(summary, indent=2) + "\n", encoding="utf-8")
+    return summary
+
+
+def bank_paths(out_dir: str | Path) -> tuple[Path, Path]:
+    """(excel path, media dir) of a generated bank."""
+    out_dir = Path(out_dir)
+    return out_dir / "bank.xlsx", out_dir / "media"
+
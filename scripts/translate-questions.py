@@ -1,36 +1,84 @@
 #!/usr/bin/env python3
-"""Translate all unique Polish driving exam questions to English.
+"""Translate all unique Polish driving exam questions to one or more languages.
 
-Outputs src/data/translations_en.json with structure:
+Outputs src/data/translations_{lang}.json (default: en) with structure:
 { "123": { "q": "English question", "a": "Answer A", "b": "Answer B", "c": "Answer C" }, ... }
 
-Uses deep_translator (Google Translate, no API key needed).
+Uses deep_translator (Google Translate, no API key needed) by default; other
+backends (offline dictionary, echo stand-in) are in translation_engine.py.
+Batches run concurrently under a shared token-bucket rate limit.
 Supports resuming from a partial translation file.
+
+Every completed batch is appended to a JSONL checkpoint journal in
+.build-cache/; on start the journal is replayed, so a run resumes where it
+stopped even after a hard kill. The output file is written once, atomically,
+at the end, after which the journal is removed.
+
+Source strings are deduplicated through a persistent translation memory
+(see translation_memory.py): repeated texts are translated once and fanned
+out to every question that uses them, and strings translated in earlier runs
+are never sent to the backend again.
+
+With --lang en,de,uk the source strings are extracted once and the jobs for
+every language share one worker pool and rate limiter; each language keeps
+its own journal, progress and output file.
+
+Stage timings, counters (memory hits, backend calls, retries, errors) and
+peak memory are printed at the end (see build_metrics.py); --metrics-json
+writes them as JSON and --profile runs the translation stage under cProfile.
+
+Usage:
+  python3 scripts/translate-questions.py [--lang en[,de,...]]
+                                         [--backend {google,dictionary,echo}]
+                                         [--dictionary PATH] [--rate N] [--workers N]
+                                         [--metrics-json PATH] [--profile]
 """
 
+import argparse
 import json
 import os
-import sys
-import time
 
-from deep_translator import GoogleTranslator
+from build_metrics import PROFILE_DIRNAME, Metrics, add_metrics_args
+from data_assets import dump_min, package_data
+from question_store import load_store
+from question_table import TABLE_FILENAME, load_table, table_questions
+from search_index import build_search
+from translation_engine import BACKENDS, TranslationEngine, create_backend
+from translation_memory import TranslationMemory, text_key
 
 SRC_DATA = os.path.join(os.path.dirname(__file__), '..', 'src', 'data')
-OUTPUT = os.path.join(SRC_DATA, 'translations_en.json')
+CACHE_DIR = os.path.join(os.path.dirname(__file__), '..', '.build-cache')
+MEMORY_PATH = os.path.join(CACHE_DIR, 'translation-memory.json')
+SOURCE_LANG = 'pl'
+DEFAULT_LANGS = 'en'
 
 BATCH_SIZE = 40  # Google Translate free tier batch limit
-DELAY = 0.5      # Seconds between batches to avoid rate limiting
+RATE = 2.0       # Backend calls per second, shared by all workers
+WORKERS = 4      # Batches in flight at once
 
 
 def load_unique_questions():
-    """Load all unique questions from category JSON files."""
+    """Load all unique questions from the question table, shared store or category JSON files."""
+    table = load_table(os.path.join(CACHE_DIR, TABLE_FILENAME), SRC_DATA)
+    if table is not None:
+        questions = {}
+        for q in table_questions(table):
+            questions.setdefault(str(q['id']), q)
+        return questions
+
+    store = load_store(SRC_DATA)
+    if store is not None:
+        return dict(store['questions'])
+
+    # Category files listed in meta.json; src/data also holds other JSON files
+    with open(os.path.join(SRC_DATA, 'meta.json'), encoding='utf-8') as f:
+        categories = [cat['id'] for cat in json.load(f)['categories']]
     questions = {}
-    for fname in sorted(os.listdir(SRC_DATA)):
-        if fname == 'meta.json' or not fname.endswith('.json'):
-            continue
-        if fname == 'translations_en.json':
+    for cat in categories:
+        path = os.path.join(SRC_DATA, f'{cat}.json')
+        if not os.path.exists(path):
             continue
-        with open(os.path.join(SRC_DATA, fname), encoding='utf-8') as f:
+        with open(path, encoding='utf-8') as f:
             data = json.load(f)
         for q in data['questions']:
             qid = str(q['id'])
@@ -39,106 +87,202 @@ def load_unique_questions():
     return questions
 
 
-def load_existing_translations():
+def output_path(lang):
+    return os.path.join(SRC_DATA, f'translations_{lang}.json')
+
+
+def load_existing_translations(lang):
     """Load already-translated questions for resume support."""
-    if os.path.exists(OUTPUT):
-        with open(OUTPUT, encoding='utf-8') as f:
+    path = output_path(lang)
+    if os.path.exists(path):
+        with open(path, encoding='utf-8') as f:
             return json.load(f)
     return {}
 
 
-def translate_batch(texts, translator):
-    """Translate a batch of texts from Polish to English."""
-    if not texts:
-        return []
-    try:
-        results = translator.translate_batch(texts)
-        return results
-    except Exception as e:
-        print(f"  Batch translation failed: {e}, trying one by one...")
-        results = []
-        for text in texts:
-            try:
-                r = translator.translate(text)
-                results.append(r)
-            except Exception as e2:
-                print(f"  Failed to translate: {text[:50]}... ({e2})")
-                results.append(text)  # Keep original on failure
-            time.sleep(0.2)
-        return results
+def extract_source_strings(questions):
+    """List every translatable (qid, field, text) once, shared by all languages."""
+    strings = []
+    for qid, q in questions.items():
+        fields = ['q'] + (['a', 'b', 'c'] if q['type'] == 'specialist' else [])
+        for field in fields:
+            if q.get(field):
+                strings.append((qid, field, q[field]))
+    return strings
 
 
-def main():
-    print("Loading questions...")
-    questions = load_unique_questions()
-    existing = load_existing_translations()
-    print(f"Total unique questions: {len(questions)}")
-    print(f"Already translated: {len(existing)}")
+def journal_path(lang):
+    return os.path.join(CACHE_DIR, f'translation-journal-{lang}.jsonl')
 
-    # Find questions that need translation
-    to_translate = {}
-    for qid, q in questions.items():
-        if qid in existing:
-            continue
-        to_translate[qid] = q
 
-    remaining = len(to_translate)
-    if remaining == 0:
-        print("All questions already translated!")
-        return
+def replay_journal(path, lang, translations, memory):
+    """Apply checkpointed batches from a previous (interrupted) run."""
+    if not os.path.exists(path):
+        return 0
+    replayed = 0
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            try:
+                record = json.loads(line)
+            except ValueError:
+                continue  # Torn last line from a hard kill
+            for source, translated, targets in record['items']:
+                memory.put(lang, source, translated)
+                for qid, field in targets:
+                    translations.setdefault(qid, {})[field] = translated
+                replayed += 1
+    return replayed
+
 
-    print(f"Questions to translate: {remaining}")
+def append_journal(journal, items):
+    """Durably append one completed batch: [(source, translated, [(qid, field), ...]), ...]."""
+    journal.write(json.dumps({'items': items}, ensure_ascii=False) + '\n')
+    journal.flush()
+    os.fsync(journal.fileno())
 
-    translator = GoogleTranslator(source='pl', target='en')
 
-    # Build list of (qid, field, text) tuples
-    work = []
-    for qid, q in to_translate.items():
-        work.append((qid, 'q', q['q']))
-        if q['type'] == 'specialist':
-            if q.get('a'):
-                work.append((qid, 'a', q['a']))
-            if q.get('b'):
-                work.append((qid, 'b', q['b']))
-            if q.get('c'):
-                work.append((qid, 'c', q['c']))
+def write_output(path, translations):
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        f.write(dump_min(translations))
+    os.replace(tmp_path, path)
 
-    print(f"Total text strings to translate: {len(work)}")
 
-    # Process in batches
+def prepare_language(lang, questions, strings, memory):
+    """Resume state for one language and group its missing strings by source text."""
+    existing = load_existing_translations(lang)
+    seeded = memory.seed(lang, questions, existing)
     translations = dict(existing)
-    done = 0
-    save_interval = 100  # Save every 100 items
+    replayed = replay_journal(journal_path(lang), lang, translations, memory)
+
+    # Resolve what we can from the translation memory; group the rest by
+    # normalized source text so each distinct string is translated once
+    hits_before = memory.hits
+    pending = {}  # text key -> (source text, [(qid, field), ...])
+    for qid, field, text in strings:
+        if field in translations.get(qid, {}):
+            continue
+        cached = memory.get(lang, text)
+        if cached is not None:
+            translations.setdefault(qid, {})[field] = cached
+            continue
+        pending.setdefault(text_key(text), (text, []))[1].append((qid, field))
+
+    unique = list(pending.values())
+    print(f"  [{lang}] existing: {len(existing)} questions, seeded: {seeded}, "
+          f"resumed: {replayed}, memory hits: {memory.hits - hits_before}, to translate: {len(unique)}")
+    return {
+        'lang': lang,
+        'translations': translations,
+        'unique': unique,
+        'done': 0,
+        'dirty': replayed > 0 or memory.hits > hits_before,
+        'journal': None,
+    }
 
-    for i in range(0, len(work), BATCH_SIZE):
-        batch = work[i:i + BATCH_SIZE]
-        texts = [item[2] for item in batch]
 
-        results = translate_batch(texts, translator)
+def finish_language(state, memory):
+    """Compact: one atomic write of the output, then drop the journal."""
+    lang = state['lang']
+    if state['journal'] is not None:
+        state['journal'].close()
+    if state['unique'] or state['dirty']:
+        write_output(output_path(lang), state['translations'])
+        memory.save()
+    if os.path.exists(journal_path(lang)):
+        os.remove(journal_path(lang))
+    print(f"  [{lang}] done — {len(state['translations'])} questions → {os.path.basename(output_path(lang))}")
 
-        for (qid, field, _orig), translated in zip(batch, results):
-            if qid not in translations:
-                translations[qid] = {}
-            translations[qid][field] = translated
 
-        done += len(batch)
-        pct = done / len(work) * 100
-        print(f"  [{done}/{len(work)}] ({pct:.1f}%) translated")
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument('--lang', default=DEFAULT_LANGS, help='Comma-separated target languages')
+    parser.add_argument('--backend', choices=BACKENDS, default='google', help='Translation backend')
+    parser.add_argument('--dictionary', help='JSON file for the dictionary backend')
+    parser.add_argument('--rate', type=float, default=RATE, help='Max backend calls per second')
+    parser.add_argument('--workers', type=int, default=WORKERS, help='Max batches in flight')
+    add_metrics_args(parser)
+    args = parser.parse_args()
+    langs = [lang.strip() for lang in args.lang.split(',') if lang.strip()]
+    metrics = Metrics('translate-questions', os.path.join(CACHE_DIR, PROFILE_DIRNAME) if args.profile else None)
+
+    print("Loading questions...")
+    with metrics.stage('load'):
+        questions = load_unique_questions()
+        strings = extract_source_strings(questions)
+    print(f"Total unique questions: {len(questions)} ({len(strings)} source strings)")
+    metrics.count('source_strings', len(strings))
+
+    with metrics.stage('prepare'):
+        memory = TranslationMemory(MEMORY_PATH)
+        states = {lang: prepare_language(lang, questions, strings, memory) for lang in langs}
+
+        # Languages with nothing left still get compacted (journal replay, memory hits)
+        for lang in langs:
+            if not states[lang]['unique']:
+                finish_language(states[lang], memory)
+    metrics.count('memory_hits', memory.hits)
+    metrics.count('memory_misses', memory.misses)
+    active = [states[lang] for lang in langs if states[lang]['unique']]
+    if not active:
+        print("All questions already translated!")
+        with metrics.stage('search-index'):
+            build_search(SRC_DATA, CACHE_DIR)
+        with metrics.stage('package'):
+            package_data(SRC_DATA, CACHE_DIR)
+        metrics.finish(args.metrics_json)
+        return
 
-        # Save periodically
-        if done % (BATCH_SIZE * save_interval // BATCH_SIZE) < BATCH_SIZE:
-            with open(OUTPUT, 'w', encoding='utf-8') as f:
-                json.dump(translations, f, ensure_ascii=False, indent=None)
+    engine = TranslationEngine(
+        create_backend(args.backend, args.dictionary),
+        source=SOURCE_LANG,
+        rate=args.rate,
+        max_in_flight=args.workers,
+    )
 
-        time.sleep(DELAY)
+    # One job stream for every language through the shared pool; each batch
+    # is checkpointed to its language's journal as soon as it completes
+    os.makedirs(CACHE_DIR, exist_ok=True)
+    for state in active:
+        state['journal'] = open(journal_path(state['lang']), 'a', encoding='utf-8')
+    jobs = (
+        ((state, batch), [text for text, _targets in batch], state['lang'])
+        for state in active
+        for batch in (state['unique'][i:i + BATCH_SIZE] for i in range(0, len(state['unique']), BATCH_SIZE))
+    )
 
-    # Final save
-    with open(OUTPUT, 'w', encoding='utf-8') as f:
-        json.dump(translations, f, ensure_ascii=False, indent=None)
+    with metrics.stage('translate', profile=True):
+        for (state, batch), results in engine.run(jobs):
+            lang = state['lang']
+            checkpoint = []
+            for (text, targets), translated in zip(batch, results):
+                if translated is None:
+                    translated = text  # Keep original on failure, but don't memorize it
+                else:
+                    memory.put(lang, text, translated)
+                    checkpoint.append((text, translated, targets))
+                for qid, field in targets:
+                    state['translations'].setdefault(qid, {})[field] = translated
+            append_journal(state['journal'], checkpoint)
+            metrics.count('strings_translated', len(checkpoint))
+            metrics.count('strings_failed', len(batch) - len(checkpoint))
 
-    print(f"\nDone! Translated {len(translations)} questions.")
-    print(f"Output: {OUTPUT}")
+            state['done'] += len(batch)
+            total = len(state['unique'])
+            print(f"  [{lang}] [{state['done']}/{total}] ({state['done'] / total * 100:.1f}%) translated")
+            if state['done'] == total:
+                finish_language(state, memory)
+    metrics.count('backend_calls', engine.calls)
+    metrics.count('backend_retries', engine.retried)
+    metrics.count('backend_errors', engine.errors)
 
+    with metrics.stage('search-index'):
+        build_search(SRC_DATA, CACHE_DIR)
+    with metrics.stage('package'):
+        package_data(SRC_DATA, CACHE_DIR)
+    print(f"\nDone! Languages: {', '.join(langs)}")
+    print(f"Backend calls: {engine.calls}, errors: {engine.errors}")
+    metrics.finish(args.metrics_json)
 
 if __name__ == '__main__':
     main()
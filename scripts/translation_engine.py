@@ -0,0 +1,240 @@
+"""
+Concurrent translation engine for translate-questions.py.
+
+- Backends implement translate_batch(texts, source, target); GoogleBackend
+  wraps deep_translator, DictionaryBackend serves translations from a local
+  JSON file (offline runs, tests), EchoBackend is a no-network stand-in.
+- A token-bucket RateLimiter paces backend requests across all workers, one
+  token per request: a batch for backends that send a batch in one request,
+  each text otherwise. Errors halve its rate (adaptive backoff); successes
+  slowly restore it.
+- TranslationEngine keeps at most `max_in_flight` batches running on a thread
+  pool and yields results in completion order, so callers update their state
+  from a single thread.
+"""
+
+import json
+import threading
+import time
+from collections.abc import Iterable, Iterator
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+BACKENDS = ("google", "dictionary", "echo")
+
+
+# ---------------------------------------------------------------------------
+# Backends
+# ---------------------------------------------------------------------------
+class TranslationBackend:
+    """Interface: translate texts from source to target language."""
+
+    name = "base"
+    # Whether translate_batch sends one request for the whole batch; if not,
+    # the engine calls translate per text so each request is rate limited
+    batched = True
+
+    def translate_batch(self, texts: list[str], source: str, target: str) -> list[str | None]:
+        return [self.translate(text, source, target) for text in texts]
+
+    def translate(self, text: str, source: str, target: str) -> str | None:
+        raise NotImplementedError
+
+
+class GoogleBackend(TranslationBackend):
+    """Google Translate via deep_translator (no API key needed)."""
+
+    name = "google"
+    # deep_translator's translate_batch sends one HTTP request per text
+    batched = False
+
+    def __init__(self):
+        from deep_translator import GoogleTranslator
+
+        self._factory = GoogleTranslator
+        self._local = threading.local()
+
+    def _translator(self, source: str, target: str):
+        # deep_translator objects hold a requests session; keep one per thread
+        cache = getattr(self._local, "translators", None)
+        if cache is None:
+            cache = self._local.translators = {}
+        key = (source, target)
+        if key not in cache:
+            cache[key] = self._factory(source=source, target=target)
+        return cache[key]
+
+    def translate(self, text, source, target):
+        return self._translator(source, target).translate(text)
+
+
+class DictionaryBackend(TranslationBackend):
+    """Offline backend: {"<target>": {"<source text>": "<translation>"}} JSON file."""
+
+    name = "dictionary"
+
+    def __init__(self, path: str):
+        with open(path, encoding="utf-8") as f:
+            self.table = json.load(f)
+
+    def translate(self, text, source, target):
+        return self.table.get(target, {}).get(text)
+
+
+class EchoBackend(TranslationBackend):
+    """Local stand-in that tags the source text with the target language."""
+
+    name = "echo"
+
+    def translate(self, text, source, target):
+        return f"[{target}] {text}"
+
+
+def create_backend(name: str, dictionary: str | None = None) -> TranslationBackend:
+    if name == "google":
+        return GoogleBackend()
+    if name == "dictionary":
+        if not dictionary:
+            raise ValueError("--dictionary PATH is required for the dictionary backend")
+        return DictionaryBackend(dictionary)
+    if name == "echo":
+        return EchoBackend()
+    raise ValueError(f"unknown translation backend: {name}")
+
+
+# ---------------------------------------------------------------------------
+# Rate limiting
+# ---------------------------------------------------------------------------
+class RateLimiter:
+    """Thread-safe token bucket with adaptive backoff."""
+
+    def __init__(self, rate: float, burst: int = 1, min_rate: float = 0.1):
+        self.max_rate = rate
+        self.min_rate = min(min_rate, rate)
+        self.rate = rate
+        self.burst = max(1, burst)
+        self.tokens = float(self.burst)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> None:
+        while True:
+            with self.lock:
+                now = time.monotonic()
+                self.tokens = min(self.burst, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait_for = (1 - self.tokens) / self.rate
+            time.sleep(wait_for)
+
+    def penalize(self) -> None:
+        with self.lock:
+            self.rate = max(self.min_rate, self.rate / 2)
+
+    def reward(self) -> None:
+        with self.lock:
+            self.rate = min(self.max_rate, self.rate * 1.1)
+
+
+# ---------------------------------------------------------------------------
+# Engine
+# ---------------------------------------------------------------------------
+class TranslationEngine:
+    def __init__(
+        self,
+        backend: TranslationBackend,
+        source: str = "pl",
+        rate: float = 2.0,
+        max_in_flight: int = 4,
+        retries: int = 3,
+    ):
+        self.backend = backend
+        self.source = source
+        self.limiter = RateLimiter(rate, burst=max_in_flight)
+        self.max_in_flight = max(1, max_in_flight)
+        self.retries = retries
+        self.calls = 0
+        self.errors = 0
+        self.retried = 0  # Failed batch attempts followed by a retry or the fallback
+        self._stats_lock = threading.Lock()
+
+    def _call(self, fn, *args):
+        self.limiter.acquire()
+        with self._stats_lock:
+            self.calls += 1
+        return fn(*args)
+
+    def _failed(self, exc: Exception) -> None:
+        with self._stats_lock:
+            self.errors += 1
+        self.limiter.penalize()
+
+    def _request_batch(self, texts: list[str], target: str, done: dict[int, str | None]) -> list[str | None]:
+        if self.backend.batched:
+            return self._call(self.backend.translate_batch, texts, self.source, target)
+        # One request per text; texts translated by a failed attempt are kept in done
+        for i, text in enumerate(texts):
+            if i not in done:
+                done[i] = self._call(self.backend.translate, text, self.source, target)
+        return [done[i] for i in range(len(texts))]
+
+    def translate_batch(self, texts: list[str], target: str) -> list[str | None]:
+        """Translate one batch with retries; falls back to one-by-one calls."""
+        delay = 1.0
+        done: dict[int, str | None] = {}
+        for attempt in range(self.retries):
+            try:
+                results = self._request_batch(texts, target, done)
+                if len(results) != len(texts):
+                    raise ValueError(f"backend returned {len(results)} results for {len(texts)} texts")
+                self.limiter.reward()
+                return list(results)
+            except Exception as e:
+                self._failed(e)
+                with self._stats_lock:
+                    self.retried += 1
+                print(f"  Batch translation failed ({e}), attempt {attempt + 1}/{self.retries}")
+                time.sleep(delay)
+                delay *= 2
+
+        print("  Falling back to one-by-one translation...")
+        results = []
+        for i, text in enumerate(texts):
+            if i in done:
+                results.append(done[i])
+                continue
+            try:
+                results.append(self._call(self.backend.translate, text, self.source, target))
+            except Exception as e:
+                self._failed(e)
+                print(f"  Failed to translate: {text[:50]}... ({e})")
+                results.append(None)
+        return results
+
+    def run(self, jobs: Iterable[tuple]) -> Iterator[tuple]:
+        """Run (tag, texts, target) jobs concurrently; yield (tag, results) as they finish.
+
+        At most max_in_flight jobs are submitted at once, so memory stays
+        bounded even for very large job lists.
+        """
+        jobs = iter(jobs)
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as pool:
+            running = {}
+
+            def submit_next() -> bool:
+                job = next(jobs, None)
+                if job is None:
+                    return False
+                tag, texts, target = job
+                running[pool.submit(self.translate_batch, texts, target)] = tag
+                return True
+
+            while len(running) < self.max_in_flight and submit_next():
+                pass
+            while running:
+                done, _pending = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    tag = running.pop(future)
+                    yield tag, future.result()
+                    submit_next()
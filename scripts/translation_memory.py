@@ -0,0 +1,94 @@
+"""
+Content-addressed translation memory.
+
+Translations are keyed by (target language, SHA-256 of the normalized source
+text), so a sentence that appears on many questions is translated once and
+reused everywhere. The memory is persisted between runs and can be seeded
+from an existing translations_{lang}.json, so it never has to be rebuilt by
+calling the backend again.
+"""
+
+import hashlib
+import json
+import os
+import re
+import unicodedata
+from pathlib import Path
+
+MEMORY_VERSION = 1
+
+_WHITESPACE = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """Canonical form used for matching: NFC, trimmed, single spaces."""
+    return _WHITESPACE.sub(" ", unicodedata.normalize("NFC", text)).strip()
+
+
+def text_key(text: str) -> str:
+    return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+
+class TranslationMemory:
+    def __init__(self, path: str | Path | None = None):
+        self.path = Path(path) if path else None
+        self.entries: dict[str, dict[str, str]] = {}
+        self.hits = 0
+        self.misses = 0
+        self._dirty = False
+        if self.path and self.path.exists():
+            self._load()
+
+    def _load(self) -> None:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return
+        if data.get("version") == MEMORY_VERSION:
+            self.entries = data.get("entries", {})
+
+    def get(self, lang: str, text: str) -> str | None:
+        result = self.entries.get(lang, {}).get(text_key(text))
+        if result is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return result
+
+    def put(self, lang: str, text: str, translation: str) -> None:
+        self.entries.setdefault(lang, {})[text_key(text)] = translation
+        self._dirty = True
+
+    def seed(self, lang: str, questions: dict, translations: dict) -> int:
+        """Learn from an existing translations file; returns entries added."""
+        bucket = self.entries.setdefault(lang, {})
+        added = 0
+        for qid, fields in translations.items():
+            q = questions.get(qid)
+            if not q:
+                continue
+            for field, translated in fields.items():
+                source = q.get(field)
+                if not source or not translated:
+                    continue
+                key = text_key(source)
+                if key not in bucket:
+                    bucket[key] = translated
+                    added += 1
+        if added:
+            self._dirty = True
+        return added
+
+    def size(self, lang: str) -> int:
+        return len(self.entries.get(lang, {}))
+
+    def save(self) -> None:
+        if not self.path or not self._dirty:
+            return
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.path.with_name(self.path.name + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump({"version": MEMORY_VERSION, "entries": self.entries}, f, ensure_ascii=False)
+        os.replace(tmp_path, self.path)
+        self._dirty = False
@@ -7,24 +7,48 @@
 #   b2 authorize-account <applicationKeyId> <applicationKey>
 #
 # Bucket: prawko-media (must be created first as public)
+#
+# Media packs (packs/, built by build-media.py) are read with range requests
+# by the offline downloader, which needs a CORS rule on the bucket allowing
+# GET with the Range header from the app origin (b2 bucket update --cors-rules).
+# Without it offline.js falls back to per-file downloads.
+#
+# img/ and vid/ hold both the named outputs and their content-addressed copies
+# (e.g. img/9f86d081884c7d65.webp, see media_dedup.py), hard links locally.
+# Once src/data/media-names.json exists the data refers to the copies only, so
+# just those are uploaded; named outputs already in the bucket are left for
+# clients still holding data built before the dedup. Without the map the
+# named outputs are uploaded as before. If build-media.py warned about
+# ambiguous media references, run build-data.py before uploading.
 
 set -euo pipefail
 
 BUCKET="prawko"
 MEDIA_DIR="src/media"
 B2="${HOME}/Library/Python/3.14/bin/b2"
+NAMES_FILE="src/data/media-names.json"
 
 if ! "$B2" version >/dev/null 2>&1; then
   echo "Error: b2 CLI not found. Install with: pip install b2"
   exit 1
 fi
 
+MEDIA_FILTER=()
+if [ -f "$NAMES_FILE" ]; then
+  MEDIA_FILTER=(--exclude-regex '.*' --include-regex '^[0-9a-f]{16}\.[a-z0-9]+$')
+  echo "Uploading content-addressed media only ($NAMES_FILE)"
+fi
+
 echo "Uploading images..."
-"$B2" sync --threads 10 --skip-newer "$MEDIA_DIR/img/" "b2://$BUCKET/img/"
+"$B2" sync --threads 10 --skip-newer ${MEDIA_FILTER[@]+"${MEDIA_FILTER[@]}"} "$MEDIA_DIR/img/" "b2://$BUCKET/img/"
 
 echo ""
 echo "Uploading videos..."
-"$B2" sync --threads 4 --skip-newer "$MEDIA_DIR/vid/" "b2://$BUCKET/vid/"
+"$B2" sync --threads 4 --skip-newer ${MEDIA_FILTER[@]+"${MEDIA_FILTER[@]}"} "$MEDIA_DIR/vid/" "b2://$BUCKET/vid/"
+
+echo ""
+echo "Uploading media packs..."
+"$B2" sync --threads 4 --skip-newer "$MEDIA_DIR/packs/" "b2://$BUCKET/packs/"
 
 echo ""
 echo "Done! Media available at:"
@@ -0,0 +1,204 @@
+"""
+Streaming row reader for .xlsx workbooks.
+
+Reads the shared-strings table once and then walks the first worksheet with
+iterparse, yielding one tuple of cell values per row. Rows are dropped from
+the parse tree as soon as they are yielded, so memory stays flat regardless
+of how many questions the sheet holds.
+
+openpyxl is used as a fallback when the workbook cannot be read this way
+(or when explicitly requested).
+"""
+
+import posixpath
+import re
+import zipfile
+from collections.abc import Iterator
+from pathlib import Path
+from xml.etree.ElementTree import ParseError, iterparse
+
+NS_MAIN = "{http://schemas.openxmlformats.org/spreadsheetml/2006/main}"
+NS_REL = "{http://schemas.openxmlformats.org/officeDocument/2006/relationships}"
+NS_PKG_REL = "{http://schemas.openxmlformats.org/package/2006/relationships}"
+
+DEFAULT_SHEET = "xl/worksheets/sheet1.xml"
+
+READERS = ("stream", "openpyxl")
+
+_CELL_REF = re.compile(r"([A-Z]+)(\d*)")
+
+
+def _column_index(ref: str) -> int:
+    """Convert a cell reference like 'C12' to a 0-based column index."""
+    letters = _CELL_REF.match(ref).group(1)
+    idx = 0
+    for ch in letters:
+        idx = idx * 26 + (ord(ch) - 64)
+    return idx - 1
+
+
+def _text_of(elem) -> str:
+    """Concatenate the text runs of a string item, skipping phonetic hints."""
+    parts = []
+    for child in elem:
+        if child.tag == f"{NS_MAIN}t":
+            parts.append(child.text or "")
+        elif child.tag == f"{NS_MAIN}r":
+            t = child.find(f"{NS_MAIN}t")
+            if t is not None:
+                parts.append(t.text or "")
+    return "".join(parts)
+
+
+def _load_shared_strings(zf: zipfile.ZipFile) -> list[str]:
+    try:
+        f = zf.open("xl/sharedStrings.xml")
+    except KeyError:
+        return []
+    strings = []
+    with f:
+        for _event, elem in iterparse(f, events=("end",)):
+            if elem.tag == f"{NS_MAIN}si":
+                strings.append(_text_of(elem))
+                elem.clear()
+    return strings
+
+
+def _first_sheet_path(zf: zipfile.ZipFile) -> str:
+    """Resolve the first worksheet's part name via workbook.xml relationships."""
+    try:
+        with zf.open("xl/workbook.xml") as f:
+            sheet_rid = None
+            for _event, elem in iterparse(f, events=("end",)):
+                if elem.tag == f"{NS_MAIN}sheet":
+                    sheet_rid = elem.get(f"{NS_REL}id")
+                    break
+        with zf.open("xl/_rels/workbook.xml.rels") as f:
+            for _event, elem in iterparse(f, events=("end",)):
+                if elem.tag == f"{NS_PKG_REL}Relationship" and elem.get("Id") == sheet_rid:
+                    target = elem.get("Target")
+                    if target.startswith("/"):
+                        return target.lstrip("/")
+                    return posixpath.normpath(posixpath.join("xl", target))
+    except KeyError:
+        pass
+    return DEFAULT_SHEET
+
+
+def _cast_number(value: str):
+    if "." in value or "E" in value or "e" in value:
+        return float(value)
+    return int(value)
+
+
+def _cell_value(cell, shared: list[str]):
+    cell_type = cell.get("t", "n")
+    if cell_type == "inlineStr":
+        inline = cell.find(f"{NS_MAIN}is")
+        return _text_of(inline) if inline is not None else None
+
+    v = cell.find(f"{NS_MAIN}v")
+    if v is None or v.text is None:
+        return None
+    raw = v.text
+    if cell_type == "s":
+        return shared[int(raw)]
+    if cell_type == "b":
+        return raw == "1"
+    if cell_type in ("str", "e"):
+        return raw
+    return _cast_number(raw)
+
+
+def iter_xlsx_rows(path: Path) -> Iterator[tuple]:
+    """Yield each row of the first worksheet as a tuple of values.
+
+    Missing cells are None. Every row is padded to the sheet width (taken
+    from the <dimension> element, or the widest row seen so far) so callers
+    can index columns without bounds checks.
+    """
+    with zipfile.ZipFile(path) as zf:
+        shared = _load_shared_strings(zf)
+        sheet_path = _first_sheet_path(zf)
+        width = 0
+        next_row = 1
+        with zf.open(sheet_path) as f:
+            sheet_data = None
+            for event, elem in iterparse(f, events=("start", "end")):
+                tag = elem.tag
+                if event == "start":
+                    if tag == f"{NS_MAIN}sheetData":
+                        sheet_data = elem
+                    continue
+
+                if tag == f"{NS_MAIN}dimension":
+                    ref = elem.get("ref", "")
+                    if ":" in ref:
+                        width = max(width, _column_index(ref.split(":")[1]) + 1)
+                    continue
+                if tag != f"{NS_MAIN}row":
+                    continue
+
+                # Emit empty rows for gaps so row numbering matches the sheet
+                row_num = int(elem.get("r", next_row))
+                while next_row < row_num:
+                    yield (None,) * width
+                    next_row += 1
+
+                values: list = []
+                for pos, cell in enumerate(elem.iter(f"{NS_MAIN}c")):
+                    ref = cell.get("r")
+                    col = _column_index(ref) if ref else pos
+                    if col >= len(values):
+                        values.extend([None] * (col + 1 - len(values)))
+                    values[col] = _cell_value(cell, shared)
+
+                width = max(width, len(values))
+                if len(values) < width:
+                    values.extend([None] * (width - len(values)))
+                yield tuple(values)
+                next_row = row_num + 1
+
+                # Drop the processed row from the tree to keep memory flat
+                elem.clear()
+                if sheet_data is not None:
+                    sheet_data.clear()
+
+
+def iter_openpyxl_rows(path: Path) -> Iterator[tuple]:
+    """Yield rows via openpyxl's read-only mode (slower fallback)."""
+    try:
+        import openpyxl
+    except ImportError as e:
+        raise RuntimeError("openpyxl is required for this reader: pip install openpyxl") from e
+
+    wb = openpyxl.load_workbook(str(path), read_only=True)
+    try:
+        ws = wb[wb.sheetnames[0]]
+        yield from ws.iter_rows(values_only=True)
+    finally:
+        wb.close()
+
+
+def iter_workbook_rows(path: Path, reader: str = "stream") -> Iterator[tuple]:
+    """Yield worksheet rows using the requested reader.
+
+    The streaming reader falls back to openpyxl if the file is not a
+    well-formed xlsx package it understands.
+    """
+    if reader == "openpyxl":
+        yield from iter_openpyxl_rows(path)
+        return
+
+    try:
+        rows = iter_xlsx_rows(path)
+        first = next(rows, None)
+    except (zipfile.BadZipFile, KeyError, ParseError) as e:
+        print(f"  WARNING: streaming reader failed ({e}) — falling back to openpyxl")
+        yield from iter_openpyxl_rows(path)
+        return
+
+    if first is None:
+        return
+    yield first
+    yield from rows
@@ -1,26 +1,32 @@
 // app.js — Router, initialization, and event wiring
 
-import { fetchMeta, fetchCategory } from './data.js';
+import { fetchMeta, fetchCategory, fetchExamIndex, refreshData } from './data.js';
 import { startExam, setupExamListeners, cleanupExam, getLastExamCategory, refreshExamQuestion } from './exam.js';
 import { startLearn, setupLearnListeners, cleanupLearn, refreshLearnQuestion } from './learn.js';
-import { showScreen, renderCategories, applyLanguage, renderHistory, showConfirmModal } from './ui.js';
+import { showScreen, renderCategories, applyLanguage, renderHistory, renderSearchResults, showConfirmModal } from './ui.js';
 import { setLang, getLang, loadQuestionTranslations, t } from './i18n.js';
-import { downloadCategoryMedia, getDownloadedCategories, reconcileDownloadedCategories } from './offline.js';
+import { downloadCategoryMedia, getDownloadedCategories, prioritizeCategoryMedia, reconcileDownloadedCategories } from './offline.js';
 import { clearHistory } from './stats.js';
+import { loadMediaManifest } from './media.js';
+import { searchQuestions, hydrateResults } from './search.js';
 
 let meta = null;
 let currentMode = 'learn'; // 'learn' or 'exam'
 let pendingCategory = null;
+let pendingStartId = null; // Question to open first (search results)
+let searchSeq = 0;
+let searchTimer = null;
 const RECENT_CATEGORIES_KEY = 'prawko_recent_categories';
 const RECENT_CATEGORIES_LIMIT = 4;
 const EXAM_SKIN_KEY = 'prawko_exam_skin';
+const SEARCH_DEBOUNCE_MS = 150;
 
 // ---- Router ----
 function navigate(screen) {
   window.location.hash = screen;
 }
 
-const VALID_SCREENS = new Set(['home', 'categories', 'quiz', 'results', 'history', 'zrodlo-danych']);
+const VALID_SCREENS = new Set(['home', 'categories', 'quiz', 'results', 'history', 'search', 'zrodlo-danych']);
 
 function focusCurrentScreenHeading(screenId) {
   const screen = document.getElementById(screenId);
@@ -104,12 +110,49 @@ function renderRecentCategories() {
 }
 
 function applyCategoryUiTranslations() {
+  const questionSearch = document.getElementById('question-search');
+  if (questionSearch) {
+    questionSearch.placeholder = t('searchPlaceholder');
+    questionSearch.setAttribute('aria-label', t('searchTitle'));
+  }
   const searchInput = document.getElementById('category-search');
   if (!searchInput) return;
   searchInput.placeholder = t('categoriesSearchPlaceholder');
   searchInput.setAttribute('aria-label', t('categoriesSearchLabel'));
 }
 
+// ---- Question Search ----
+async function runQuestionSearch() {
+  const query = document.getElementById('question-search')?.value.trim() || '';
+  const seq = ++searchSeq;
+  if (!query) {
+    renderSearchResults([], '');
+    return;
+  }
+  try {
+    const found = await searchQuestions(query);
+    // Read each result from a category the user studies, if it is in one
+    const results = await hydrateResults(found, loadRecentCategories());
+    if (seq !== searchSeq) return; // A newer query is already running
+    renderSearchResults(results, results.length ? t('searchResults').replace('{n}', results.length) : t('searchNoResults'));
+  } catch {
+    if (seq === searchSeq) renderSearchResults([], t('searchUnavailable'));
+  }
+}
+
+function scheduleQuestionSearch() {
+  clearTimeout(searchTimer);
+  searchTimer = setTimeout(runQuestionSearch, SEARCH_DEBOUNCE_MS);
+}
+
+function handleSearchResultSelect(categoryId, questionId) {
+  document.querySelector('.mode-btn[data-mode="learn"]')?.click();
+  addRecentCategory(categoryId);
+  pendingCategory = categoryId;
+  pendingStartId = questionId;
+  navigate('quiz');
+}
+
 function handleRoute() {
   const hash = window.location.hash.slice(1) || 'home';
 
@@ -154,11 +197,17 @@ function handleRoute() {
 // ---- Category & Mode Selection ----
 async function launchSession(categoryId) {
   try {
-    const data = await fetchCategory(categoryId);
+    const [data, examIndex] = await Promise.all([
+      fetchCategory(categoryId),
+      currentMode === 'exam' ? fetchExamIndex().catch(() => null) : null,
+    ]);
+    prioritizeCategoryMedia(data);
+    const startId = pendingStartId;
+    pendingStartId = null;
     if (currentMode === 'exam') {
-      startExam(data, meta);
+      startExam(data, meta, examIndex?.categories?.[categoryId]);
     } else {
-      startLearn(data);
+      startLearn(data, { startId });
     }
   } catch {
     window.location.hash = 'categories';
@@ -223,6 +272,8 @@ function showUpdateBanner() {
 async function init() {
   // Load metadata
   const spinner = document.getElementById('home-spinner');
+  // Image variants: fetched alongside meta, ready before the first question
+  loadMediaManifest();
   try {
     meta = await fetchMeta();
     renderCategories(meta, getDownloadedCategories());
@@ -280,6 +331,13 @@ async function init() {
 
   document.getElementById('category-search')?.addEventListener('input', applyCategorySearch);
 
+  // Question search
+  document.getElementById('question-search')?.addEventListener('input', scheduleQuestionSearch);
+  document.querySelector('.search-results')?.addEventListener('click', (e) => {
+    const result = e.target.closest('.search-result');
+    if (result) handleSearchResultSelect(result.dataset.category, result.dataset.questionId);
+  });
+
   // Retry button
   document.querySelector('.btn-retry')?.addEventListener('click', async () => {
     const lastCat = getLastExamCategory();
@@ -330,6 +388,7 @@ async function init() {
       applyCategoryUiTranslations();
       applyCategorySearch();
       if (lang === 'en') await loadQuestionTranslations();
+      if (document.getElementById('search').classList.contains('active')) runQuestionSearch();
       // Re-render current question if on quiz screen
       if (document.getElementById('quiz').classList.contains('active')) {
         refreshLearnQuestion();
@@ -443,6 +502,11 @@ async function init() {
     location.reload();
   });
 
+  // Pick up new data releases in long-lived tabs (patched in memory where possible)
+  document.addEventListener('visibilitychange', () => {
+    if (document.visibilityState === 'visible') refreshData().catch(() => {});
+  });
+
   // Offline/online indicator
   const offlineBanner = document.getElementById('offline-banner');
   function updateOnlineStatus() {
@@ -7,37 +7,219 @@ const inflight = new Map();
 // Falls back to local relative path for development
 export const MEDIA_BASE = 'https://f003.backblazeb2.com/file/prawko';
 
-export async function fetchMeta() {
-  if (cache.has('meta')) return cache.get('meta');
-  if (inflight.has('meta')) return inflight.get('meta');
-  const promise = fetch('data/meta.json')
+// Asset manifest (content hash + size per data file), written by
+// scripts/package-data.py. Data URLs carry a hash prefix (?v=...), so the
+// service worker can serve cached copies without revalidating or diffing
+// them; a changed file simply has a new URL. Fetched once per page load.
+let manifestPromise = null;
+
+function fetchAssetManifest() {
+  manifestPromise ??= fetch('data/asset-manifest.json', { cache: 'no-cache' })
+    .then(res => (res.ok ? res.json() : null))
+    .catch(() => null);
+  return manifestPromise;
+}
+
+export async function dataUrl(name) {
+  const manifest = await fetchAssetManifest();
+  const hash = manifest?.files?.[name]?.sha256;
+  const url = `data/${encodeURIComponent(name)}`;
+  return hash ? `${url}?v=${hash.slice(0, 16)}` : url;
+}
+
+// Release patches (scripts/release-diff.py): id-level deltas between two
+// versions of a data file, chained from an old content hash to the current one.
+const MAX_PATCH_HOPS = 5;
+
+export function applyPatch(data, patch) {
+  const records = patch.kind === 'list'
+    ? new Map(data.questions.map(q => [String(q.id), q]))
+    : new Map(Object.entries(patch.kind === 'map' ? data.questions : data));
+  const removed = new Set(patch.removed.map(String));
+  const order = (patch.order ?? [
+    ...[...records.keys()].filter(id => !removed.has(id)),
+    ...patch.added.map(([id]) => id),
+  ]).map(String);
+  for (const id of removed) records.delete(id);
+  for (const [id, record] of [...patch.changed, ...patch.added]) records.set(String(id), record);
+  if (order.some(id => !records.has(id))) throw new Error(`Patch for ${patch.file} does not fit cached data`);
+  if (patch.kind === 'list') return { ...data, questions: order.map(id => records.get(id)) };
+  const map = Object.fromEntries(order.map(id => [id, records.get(id)]));
+  return patch.kind === 'map' ? { ...data, questions: map } : map;
+}
+
+// Patch index advertised by the asset manifest ("patches"), fetched once per
+// index version; no manifest entry means there are no patches to look for.
+let patchIndex = null;
+
+async function fetchPatchIndex() {
+  const version = (await fetchAssetManifest())?.patches?.index;
+  if (!version) return null;
+  if (patchIndex?.version !== version) {
+    patchIndex = {
+      version,
+      promise: fetch(`data/patches/index.json?v=${version}`)
+        .then(res => (res.ok ? res.json() : null))
+        .catch(() => null),
+    };
+  }
+  return patchIndex.promise;
+}
+
+export async function patchData(name, data, fromHash, toHash) {
+  const index = await fetchPatchIndex();
+  if (index?.version !== 1) return null;
+  const chain = index.files?.[name] ?? {};
+  let version = fromHash.slice(0, 16);
+  for (let hops = 0; version !== toHash.slice(0, 16); hops++) {
+    const step = chain[version];
+    if (!step || hops >= MAX_PATCH_HOPS) return null;
+    const patchRes = await fetch(`data/patches/${encodeURIComponent(step.patch)}`);
+    if (!patchRes.ok) return null;
+    data = applyPatch(data, await patchRes.json());
+    version = step.to;
+  }
+  return data;
+}
+
+function fetchJson(key, name, label) {
+  if (cache.has(key)) return Promise.resolve(cache.get(key));
+  if (inflight.has(key)) return inflight.get(key);
+  const promise = dataUrl(name)
+    .then(url => fetch(url))
     .then(res => {
-      if (!res.ok) throw new Error(`Failed to load meta: ${res.status}`);
+      if (!res.ok) throw new Error(`Failed to load ${label}: ${res.status}`);
       return res.json();
     })
     .then(data => {
-      cache.set('meta', data);
+      cache.set(key, data);
       return data;
     })
-    .finally(() => inflight.delete('meta'));
-  inflight.set('meta', promise);
+    .finally(() => inflight.delete(key));
+  inflight.set(key, promise);
   return promise;
 }
 
+export async function fetchMeta() {
+  return fetchJson('meta', 'meta.json', 'meta');
+}
+
+// Exam sampling index (scripts/exam_index.py): per-category basic/specialist
+// id pools split by media type, so exams draw ids without scanning the bank.
+export async function fetchExamIndex() {
+  return fetchJson('examIndex', 'exam-index.json', 'exam index');
+}
+
+// id → question for a loaded category. Joined (normalized) categories look
+// ids up in the store; full-layout ones get a Map, built once per category.
+const questionLookups = new WeakMap();
+
+export function questionById(categoryData, id) {
+  let lookup = questionLookups.get(categoryData);
+  if (!lookup) {
+    const map = new Map(categoryData.questions.map(q => [String(q.id), q]));
+    lookup = qid => map.get(qid);
+    questionLookups.set(categoryData, lookup);
+  }
+  return lookup(String(id));
+}
+
+// Shared question store (normalized data layout) — fetched once, reused by
+// every category. Ranks restore sheet order when joining basic/specialist ids.
+let questionStore = null;
+
+async function fetchQuestionStore() {
+  if (questionStore) return questionStore;
+  const data = await fetchJson('store', 'questions.json', 'question store');
+  questionStore ??= {
+    questions: data.questions,
+    rank: new Map(Object.keys(data.questions).map((id, i) => [id, i])),
+  };
+  return questionStore;
+}
+
+function joinCategory(data, store) {
+  const ids = [...data.basic, ...data.specialist]
+    .map(String)
+    .filter(id => store.rank.has(id))
+    .sort((a, b) => store.rank.get(a) - store.rank.get(b));
+  const joined = {
+    category: data.category,
+    questions: ids.map(id => store.questions[id]),
+  };
+  const members = new Set(ids);
+  questionLookups.set(joined, id => (members.has(id) ? store.questions[id] : undefined));
+  return joined;
+}
+
 export async function fetchCategory(cat) {
   const key = `cat_${cat}`;
   if (cache.has(key)) return cache.get(key);
   if (inflight.has(key)) return inflight.get(key);
-  const promise = fetch(`data/${encodeURIComponent(cat)}.json`)
-    .then(res => {
-      if (!res.ok) throw new Error(`Failed to load category ${cat}: ${res.status}`);
-      return res.json();
-    })
-    .then(data => {
-      cache.set(key, data);
-      return data;
+  const promise = fetchJson(`raw_${cat}`, `${cat}.json`, `category ${cat}`)
+    .then(async (data) => {
+      // Full layout embeds questions; normalized layout lists ids only
+      const joined = Array.isArray(data.questions)
+        ? data
+        : joinCategory(data, await fetchQuestionStore());
+      cache.delete(`raw_${cat}`);
+      cache.set(key, joined);
+      return joined;
     })
     .finally(() => inflight.delete(key));
   inflight.set(key, promise);
   return promise;
 }
+
+// Long-lived pages: pick up a new data release without a reload. Category
+// files and the question store already in memory are patched up to the new
+// version; anything that can't be patched is dropped and refetched on next use.
+const REFRESH_INTERVAL = 10 * 60 * 1000;
+let lastRefresh = Date.now();
+
+async function refreshFile(name, fromHash, toHash) {
+  const cat = name.replace(/\.json$/, '');
+  if (name === 'meta.json') {
+    cache.delete('meta');
+  } else if (name === 'exam-index.json') {
+    cache.delete('examIndex');
+  } else if (name === 'questions.json') {
+    const patched = questionStore && fromHash
+      ? await patchData(name, { questions: questionStore.questions }, fromHash, toHash).catch(() => null)
+      : null;
+    questionStore = patched && {
+      questions: patched.questions,
+      rank: new Map(Object.keys(patched.questions).map((id, i) => [id, i])),
+    };
+    cache.delete('store');
+    // Joined categories hold questions from the old store
+    for (const key of [...cache.keys()]) {
+      if (key.startsWith('cat_')) cache.delete(key);
+    }
+  } else if (cache.has(`cat_${cat}`)) {
+    const current = cache.get(`cat_${cat}`);
+    const patched = !questionStore && fromHash
+      ? await patchData(name, current, fromHash, toHash).catch(() => null)
+      : null;
+    if (patched) cache.set(`cat_${cat}`, patched);
+    else cache.delete(`cat_${cat}`);
+  }
+}
+
+export async function refreshData() {
+  if (Date.now() - lastRefresh < REFRESH_INTERVAL) return false;
+  lastRefresh = Date.now();
+  const previous = await fetchAssetManifest();
+  manifestPromise = null;
+  const manifest = await fetchAssetManifest();
+  if (!manifest || !previous) {
+    manifestPromise = Promise.resolve(manifest ?? previous);
+    return false;
+  }
+  const changed = Object.keys(manifest.files)
+    .filter(name => previous.files?.[name]?.sha256 !== manifest.files[name].sha256);
+  for (const name of changed) {
+    await refreshFile(name, previous.files?.[name]?.sha256, manifest.files[name].sha256);
+  }
+  return changed.length > 0;
+}
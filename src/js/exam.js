@@ -3,6 +3,7 @@
 import { QuestionTimer, ExamTimer, formatTime } from './timer.js';
 import { renderQuestion, highlightAnswer, renderResults, showConfirmModal, confirmModalAction, hideModal, preloadMedia } from './ui.js';
 import { saveResult } from './stats.js';
+import { questionById } from './data.js';
 import { t } from './i18n.js';
 
 let state = null;
@@ -16,14 +17,45 @@ const ANSWER_ADVANCE_DELAY_MS = 600;
 
 export function getLastExamCategory() { return lastExamCategory; }
 
-// Fisher-Yates shuffle
-function shuffle(arr) {
-  const a = [...arr];
-  for (let i = a.length - 1; i > 0; i--) {
-    const j = Math.floor(Math.random() * (i + 1));
-    [a[i], a[j]] = [a[j], a[i]];
+// Draw up to k random items from several arrays taken as one, in random
+// order, without copying them: partial Fisher-Yates that keeps only the
+// swapped slots in a Map, so a draw costs O(k) whatever the pool size
+function sample(lists, k) {
+  const total = lists.reduce((n, list) => n + list.length, 0);
+  const at = (i) => {
+    for (const list of lists) {
+      if (i < list.length) return list[i];
+      i -= list.length;
+    }
+    return undefined;
+  };
+  const moved = new Map();
+  const picked = [];
+  for (let i = 0; i < Math.min(k, total); i++) {
+    const j = i + Math.floor(Math.random() * (total - i));
+    picked.push(at(moved.get(j) ?? j));
+    moved.set(j, moved.get(i) ?? i);
   }
-  return a;
+  return picked;
+}
+
+// Pick the exam's basic and specialist questions. With the category's pools
+// from exam-index.json only the drawn ids are hydrated; without them, or if
+// an id is missing from the loaded category (stale index), the bank is split
+// by type instead.
+function drawQuestions(categoryData, pools, rules) {
+  if (pools) {
+    const draw = (pool, k) => sample(Object.values(pools[pool] ?? {}), k)
+      .map(id => questionById(categoryData, id));
+    const basic = draw('basic', rules.basicQuestions);
+    const specialist = draw('specialist', rules.specialistQuestions);
+    if (![...basic, ...specialist].includes(undefined)) return { basic, specialist };
+  }
+  const ofType = type => categoryData.questions.filter(q => q.type === type);
+  return {
+    basic: sample([ofType('basic')], rules.basicQuestions),
+    specialist: sample([ofType('specialist')], rules.specialistQuestions),
+  };
 }
 
 function removeAnswerDelegate() {
@@ -125,17 +157,13 @@ function showExamIntroNotice() {
   );
 }
 
-export function startExam(categoryData, meta) {
+export function startExam(categoryData, meta, pools = null) {
   const rules = {
     ...meta.exam,
     basicPoints: [...meta.exam.basicPoints],
     specialistPoints: [...meta.exam.specialistPoints],
   };
-  const basic = shuffle(categoryData.questions.filter(q => q.type === 'basic'));
-  const specialist = shuffle(categoryData.questions.filter(q => q.type === 'specialist'));
-
-  const selectedBasic = basic.slice(0, rules.basicQuestions);
-  const selectedSpecialist = specialist.slice(0, rules.specialistQuestions);
+  const { basic: selectedBasic, specialist: selectedSpecialist } = drawQuestions(categoryData, pools, rules);
 
   // Validate question counts and scale rules if needed
   const originalMaxPoints = rules.maxPoints;
@@ -1,5 +1,7 @@
 // i18n.js — Internationalization module (Polish / English)
 
+import { dataUrl } from './data.js';
+
 const translations = {
   pl: {
     appName: 'Prawko',
@@ -103,6 +105,11 @@ const translations = {
     examIntroDesc: 'Tryb egzaminu jest rygorystyczny: nie można wracać do pytań ani zmieniać odpowiedzi po jej udzieleniu lub po upływie czasu.',
     examIntroStart: 'Rozpocznij egzamin',
     examIntroCancel: 'Wróć',
+    searchTitle: 'Szukaj pytań',
+    searchPlaceholder: 'Słowa z pytania lub odpowiedzi',
+    searchResults: 'Znalezione pytania: {n}',
+    searchNoResults: 'Brak pasujących pytań',
+    searchUnavailable: 'Wyszukiwarka jest niedostępna',
   },
   en: {
     appName: 'Prawko',
@@ -206,6 +213,11 @@ const translations = {
     examIntroDesc: 'Exam mode is strict: you cannot return to questions or edit answers after submitting or after the timer expires.',
     examIntroStart: 'Start exam',
     examIntroCancel: 'Go back',
+    searchTitle: 'Search questions',
+    searchPlaceholder: 'Words from a question or answer',
+    searchResults: 'Questions found: {n}',
+    searchNoResults: 'No matching questions',
+    searchUnavailable: 'Search is unavailable',
   },
 };
 
@@ -229,7 +241,7 @@ export function t(key) {
 export async function loadQuestionTranslations() {
   if (questionTranslations) return questionTranslations;
   try {
-    const res = await fetch('data/translations_en.json');
+    const res = await fetch(await dataUrl('translations_en.json'));
     questionTranslations = await res.json();
     return questionTranslations;
   } catch (err) {
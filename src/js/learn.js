@@ -241,16 +241,20 @@ function toggleQueueMode() {
   showQueueToast(nextMode === 'wrongOnly');
 }
 
-export function startLearn(categoryData) {
+export function startLearn(categoryData, { startId = null } = {}) {
   const preferredMode = loadQueueModePreference(categoryData.category);
   const orderedQuestions = orderAdaptiveQuestions(categoryData.category, categoryData.questions);
   let startIndex = 0;
+  // Opened from a search result: start at that question
+  const requestedIndex = startId === null ? -1 : orderedQuestions.findIndex(q => String(q.id) === String(startId));
   const hasDueOrIncorrect = orderedQuestions.some((q) => {
     const answer = getLearnAnswerForQuestion(categoryData.category, q.id);
     const meta = getLearnMetaForQuestion(categoryData.category, q.id);
     return (answer !== null && answer !== q.correct) || (Number.isFinite(meta?.dueAt) && meta.dueAt <= Date.now());
   });
-  if (!hasDueOrIncorrect && orderedQuestions.length > 0) {
+  if (requestedIndex !== -1) {
+    startIndex = requestedIndex;
+  } else if (!hasDueOrIncorrect && orderedQuestions.length > 0) {
     const idx = orderedQuestions.findIndex(q =>
       getLearnAnswerForQuestion(categoryData.category, q.id) === null
     );
@@ -269,7 +273,7 @@ export function startLearn(categoryData) {
     sessionAnswers: new Map(),
   };
 
-  if (preferredMode === 'wrongOnly') {
+  if (preferredMode === 'wrongOnly' && requestedIndex === -1) {
     const wrongOnly = getWrongOnlyQuestions();
     if (wrongOnly.length) {
       state.questions = wrongOnly;
@@ -337,7 +341,7 @@ export function startLearn(categoryData) {
   updateNavButtons();
 
   // Show resume notification if resuming from a non-zero position
-  if (startIndex > 0) {
+  if (startIndex > 0 && requestedIndex === -1) {
     showResumeToast(startIndex, categoryData.questions.length);
   }
 }
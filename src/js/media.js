@@ -0,0 +1,102 @@
+// media.js — Media URLs and responsive image variants
+
+import { MEDIA_BASE, dataUrl } from './data.js';
+
+// Media manifest (scripts/build-media.py): size and dimensions per output,
+// plus width variants (WebP, optionally AVIF) for images and a poster frame
+// and low-bitrate preview for videos. Loaded once at startup; until it
+// arrives every question uses its full-size file.
+let mediaManifest = null;
+let manifestPromise = null;
+let supportsAvif = false;
+
+// 1x1 AVIF, decoded once to feature-detect AVIF support
+const AVIF_PROBE = 'data:image/avif;base64,AAAAIGZ0eXBhdmlmAAAAAGF2aWZtaWYxbWlhZk1BMUIAAADybWV0YQAAAAAAAAAoaGRscgAAAAAAAAAAcGljdAAAAAAAAAAAAAAAAGxpYmF2aWYAAAAADnBpdG0AAAAAAAEAAAAeaWxvYwAAAABEAAABAAEAAAABAAABGgAAAB0AAAAoaWluZgAAAAAAAQAAABppbmZlAgAAAAABAABhdjAxQ29sb3IAAAAAamlwcnAAAABLaXBjbwAAABRpc3BlAAAAAAAAAAIAAAACAAAAEHBpeGkAAAAAAwgICAAAAAxhdjFDgQ0MAAAAABNjb2xybmNseAACAAIAAYAAAAAXaXBtYQAAAAAAAAABAAEEAQKDBAAAACVtZGF0EgAKCBgANogQEAwgMg8f8D///8WfhwB8+ErK42A=';
+
+// Widest the media area gets (--max-width in style.css)
+const MAX_MEDIA_WIDTH = 900;
+
+function detectAvif() {
+  if (typeof Image === 'undefined') return Promise.resolve(false);
+  return new Promise(resolve => {
+    const img = new Image();
+    img.onload = () => resolve(img.width > 0);
+    img.onerror = () => resolve(false);
+    img.src = AVIF_PROBE;
+  });
+}
+
+export function loadMediaManifest() {
+  manifestPromise ??= Promise.all([
+    dataUrl('media-manifest.json')
+      .then(url => fetch(url))
+      .then(res => (res.ok ? res.json() : null))
+      .catch(() => null),
+    detectAvif(),
+  ]).then(([manifest, avif]) => {
+    mediaManifest = manifest?.version === 1 ? manifest : null;
+    supportsAvif = avif;
+    return mediaManifest;
+  });
+  return manifestPromise;
+}
+
+/** Device pixels needed to fill the media area at the current viewport */
+function targetWidth() {
+  if (typeof window === 'undefined') return MAX_MEDIA_WIDTH;
+  const cssWidth = Math.min(window.innerWidth || MAX_MEDIA_WIDTH, MAX_MEDIA_WIDTH);
+  return Math.ceil(cssWidth * (window.devicePixelRatio || 1));
+}
+
+/** Smallest variant at least as wide as the target (else the widest one) */
+function pickVariant(variants, target = targetWidth()) {
+  const usable = variants.filter(v => v.format === 'webp' || (v.format === 'avif' && supportsAvif));
+  if (!usable.length) return null;
+  const width = Math.min(target, Math.max(...usable.map(v => v.width)));
+  const smallest = Math.min(...usable.filter(v => v.width >= width).map(v => v.width));
+  // Among equal widths prefer the fewest bytes (AVIF when supported)
+  return usable
+    .filter(v => v.width === smallest)
+    .reduce((a, b) => (b.size < a.size ? b : a));
+}
+
+/** URL of an encoded media file ('img' or 'vid' directory) */
+export function mediaFileUrl(dir, file) {
+  return `${MEDIA_BASE}/${dir}/${encodeURIComponent(file)}`;
+}
+
+function fileUrl(question, file) {
+  return mediaFileUrl(question.mediaType === 'video' ? 'vid' : 'img', file);
+}
+
+/** Full-size media URL, as listed in the question data */
+export function originalMediaUrl(question) {
+  return fileUrl(question, question.media);
+}
+
+/** URL of the variant of the question's media best suited to this viewport */
+export function mediaUrl(question) {
+  const variants = mediaManifest?.files?.[question.media]?.variants;
+  const variant = variants && pickVariant(variants);
+  return variant ? fileUrl(question, variant.file) : originalMediaUrl(question);
+}
+
+/**
+ * URL of the variant stored by offline downloads: sized for the widest media
+ * area regardless of viewport and pixel ratio, so rotating, resizing or
+ * zooming still finds it in the cache (the renderer's fallback after mediaUrl)
+ */
+export function offlineMediaUrl(question) {
+  const variants = mediaManifest?.files?.[question.media]?.variants;
+  const variant = variants && pickVariant(variants, MAX_MEDIA_WIDTH);
+  return variant ? fileUrl(question, variant.file) : originalMediaUrl(question);
+}
+
+/** Poster and preview URLs of a video question (null when not built) */
+export function videoRenditions(question) {
+  const entry = mediaManifest?.files?.[question.media];
+  return {
+    poster: entry?.poster ? mediaFileUrl('vid', entry.poster.file) : null,
+    preview: entry?.preview ? mediaFileUrl('vid', entry.preview.file) : null,
+  };
+}
@@ -1,11 +1,16 @@
 // offline.js — Offline download management
 
-import { fetchCategory, MEDIA_BASE } from './data.js';
+import { dataUrl, fetchCategory, MEDIA_BASE } from './data.js';
+import { loadMediaManifest, mediaFileUrl, mediaUrl, offlineMediaUrl, videoRenditions } from './media.js';
 
 const DOWNLOAD_KEY = 'prawko_offline';
 const MANIFEST_KEY = 'prawko_offline_manifest';
 const OFFLINE_CACHE = 'prawko-offline-media-v1';
 const BATCH_SIZE = 6;
+const PACK_CONCURRENCY = 3;
+const MAX_RANGE_GAP = 256 * 1024; // Fetch unneeded bytes rather than start another request
+const MAX_RANGE_RETRIES = 3;
+const CONTENT_TYPES = { webp: 'image/webp', avif: 'image/avif', mp4: 'video/mp4' };
 
 function getMediaRequest(url) {
   return new Request(url, { mode: 'no-cors', cache: 'no-store' });
@@ -36,18 +41,166 @@ function saveManifest(manifest) {
   try { localStorage.setItem(MANIFEST_KEY, JSON.stringify(manifest)); } catch {}
 }
 
-function getCategoryMediaUrls(categoryData) {
+function getCategoryMediaUrls(categoryData, { viewport = false } = {}) {
   const seen = new Set();
   const mediaUrls = [];
   for (const q of categoryData.questions) {
-    if (!q.media || seen.has(q.media)) continue;
-    seen.add(q.media);
-    const prefix = q.mediaType === 'video' ? 'vid' : 'img';
-    mediaUrls.push(`${MEDIA_BASE}/${prefix}/${encodeURIComponent(q.media)}`);
+    if (!q.media) continue;
+    // The viewport-independent variant (offlineMediaUrl), which the renderer
+    // falls back to when this viewport's variant is not cached; with viewport,
+    // also the variant it requests first. Video posters too (previews are
+    // skipped: offline the full file is local). With content-hashed media
+    // names, questions sharing a file share URLs.
+    const poster = q.mediaType === 'video' && videoRenditions(q).poster;
+    for (const url of [viewport && mediaUrl(q), offlineMediaUrl(q), poster]) {
+      if (!url || seen.has(url)) continue;
+      seen.add(url);
+      mediaUrls.push(url);
+    }
   }
   return mediaUrls;
 }
 
+// Tell the service worker which cached media to evict last: the category
+// being studied (when given), then the downloaded ones (media index in sw.js).
+// The URLs are the ones the renderer requests, so they match the cache keys.
+export function prioritizeCategoryMedia(categoryData = null) {
+  const worker = typeof navigator !== 'undefined' && navigator.serviceWorker?.controller;
+  if (!worker) return;
+  const manifest = loadManifest();
+  const pinned = [...getDownloadedCategories()]
+    .flatMap(id => (Array.isArray(manifest[id]) ? manifest[id] : []));
+  const absolute = urls => urls.map(url => new URL(url, location.href).href);
+  worker.postMessage({
+    type: 'MEDIA_PRIORITY',
+    pinned: absolute(pinned),
+    ...(categoryData && { current: absolute(getCategoryMediaUrls(categoryData, { viewport: true })) }),
+  });
+}
+
+// Media packs (scripts/media_packs.py): every media file concatenated into a
+// few large packs with an offset index. A category's files are fetched as a
+// handful of range requests and split into the same cache entries per-file
+// downloads produce; anything not covered falls back to per-file requests.
+async function fetchMediaPacks() {
+  try {
+    const res = await fetch(await dataUrl('media-packs.json'));
+    const index = res.ok ? await res.json() : null;
+    return index?.version === 1 ? index : null;
+  } catch {
+    return null;
+  }
+}
+
+/** Byte ranges of the packs that hold the given URLs, short gaps merged */
+function planPackRanges(index, urls) {
+  const wanted = new Set(urls);
+  const ranges = [];
+  for (const [pack, entry] of Object.entries(index.packs)) {
+    let range = null;
+    for (const [dir, name, offset, length] of entry.files) {
+      const url = mediaFileUrl(dir, name);
+      if (!wanted.has(url)) continue;
+      const type = CONTENT_TYPES[name.split('.').pop()] || 'application/octet-stream';
+      if (!range || offset - range.end > MAX_RANGE_GAP) {
+        range = { pack, end: offset, files: [] };
+        ranges.push(range);
+      }
+      range.files.push({ url, type, offset, length });
+      range.end = offset + length;
+    }
+  }
+  return ranges;
+}
+
+/** Store files from a (range) response body as their bytes arrive */
+async function splitPackStream(body, start, files, cache, onFile) {
+  const reader = body.getReader();
+  let parts = [];
+  let partsStart = start;
+  let buffered = 0;
+  while (files.length) {
+    const { done, value } = await reader.read();
+    if (done) return;
+    let chunk = value;
+    if (!buffered && partsStart < files[0].offset) {
+      // Bytes before the next wanted file: gaps, or a 200 body up to the range
+      const skip = Math.min(files[0].offset - partsStart, chunk.length);
+      chunk = chunk.subarray(skip);
+      partsStart += skip;
+    }
+    parts.push(chunk);
+    buffered += chunk.length;
+    while (files.length && files[0].offset + files[0].length <= partsStart + buffered) {
+      const file = files[0];
+      const blob = new Blob(parts);
+      const from = file.offset - partsStart;
+      await cache.put(getMediaRequest(file.url), new Response(blob.slice(from, from + file.length), {
+        headers: { 'Content-Type': file.type, 'Content-Length': String(file.length) },
+      }));
+      files.shift();
+      onFile();
+      // Keep only bytes from the next file on
+      const keepFrom = Math.min(files.length ? files[0].offset : Infinity, partsStart + buffered);
+      const rest = blob.slice(keepFrom - partsStart);
+      parts = [rest];
+      partsStart = keepFrom;
+      buffered = rest.size;
+    }
+  }
+  // Everything wanted is stored; don't download the rest of the pack
+  await reader.cancel();
+}
+
+/** Fetch one range, resuming after the last stored file when the connection drops */
+async function downloadPackRange(range, cache, signal, onFile) {
+  for (let attempt = 0; range.files.length; attempt++) {
+    if (attempt > MAX_RANGE_RETRIES) throw new Error(`Pack ${range.pack} failed`);
+    if (attempt) await new Promise(resolve => setTimeout(resolve, 1000 * attempt));
+    const start = range.files[0].offset;
+    try {
+      const res = await fetch(`${MEDIA_BASE}/packs/${range.pack}`, {
+        headers: { Range: `bytes=${start}-${range.end - 1}` },
+        signal,
+      });
+      // 200 means the host ignored the range: the body starts at byte 0
+      if (res.status !== 206 && res.status !== 200) throw new Error(`Pack ${range.pack}: ${res.status}`);
+      await splitPackStream(res.body, res.status === 206 ? start : 0, range.files, cache, onFile);
+    } catch (err) {
+      if (err?.name === 'AbortError') throw err;
+    }
+  }
+}
+
+/** Download what the packs hold; returns the URLs left for per-file requests */
+async function downloadFromPacks(urls, cache, signal, onFile) {
+  const index = await fetchMediaPacks();
+  if (!index) return urls;
+  const ranges = planPackRanges(index, urls);
+  const packed = new Set(ranges.flatMap(range => range.files.map(file => file.url)));
+  const left = urls.filter(url => !packed.has(url));
+
+  let next = 0;
+  const worker = async () => {
+    while (next < ranges.length) {
+      const range = ranges[next++];
+      try {
+        await downloadPackRange(range, cache, signal, onFile);
+      } catch (err) {
+        if (err?.name === 'AbortError') throw err;
+        left.push(...range.files.map(file => file.url)); // e.g. no CORS on the media host
+      }
+    }
+  };
+  await Promise.all(Array.from({ length: PACK_CONCURRENCY }, worker));
+  return left;
+}
+
+async function uncachedUrls(cache, urls) {
+  const cached = await Promise.all(urls.map(url => cache.match(getMediaRequest(url))));
+  return urls.filter((_url, i) => !cached[i]);
+}
+
 let activeController = null;
 
 export function cancelDownload() {
@@ -62,7 +215,7 @@ export async function downloadCategoryMedia(categoryId, onProgress) {
   const controller = new AbortController();
   activeController = controller;
 
-  const data = await fetchCategory(categoryId);
+  const [data] = await Promise.all([fetchCategory(categoryId), loadMediaManifest()]);
   const mediaUrls = getCategoryMediaUrls(data);
 
   const total = mediaUrls.length;
@@ -86,13 +239,29 @@ export async function downloadCategoryMedia(categoryId, onProgress) {
   let failed = 0;
   let cancelled = false;
 
-  for (let i = 0; i < mediaUrls.length; i += BATCH_SIZE) {
+  // Files cached by an earlier (interrupted) download are kept
+  let remaining = mediaUrls;
+  if (cache) {
+    remaining = await uncachedUrls(cache, mediaUrls);
+    completed = total - remaining.length;
+    try {
+      remaining = await downloadFromPacks(remaining, cache, controller.signal, () => {
+        completed++;
+        onProgress?.(completed, total, { failed, cancelled });
+      });
+    } catch (err) {
+      if (err?.name !== 'AbortError') throw err;
+      cancelled = true;
+    }
+  }
+
+  for (let i = 0; i < remaining.length && !cancelled; i += BATCH_SIZE) {
     if (controller.signal.aborted) {
       cancelled = true;
       break;
     }
 
-    const batch = mediaUrls.slice(i, i + BATCH_SIZE);
+    const batch = remaining.slice(i, i + BATCH_SIZE);
     const results = await Promise.allSettled(batch.map(async (url) => {
       const request = getMediaRequest(url);
       const response = await fetch(request, { signal: controller.signal });
@@ -127,6 +296,7 @@ export async function downloadCategoryMedia(categoryId, onProgress) {
   else delete manifest[categoryId];
   saveDownloaded(downloaded);
   saveManifest(manifest);
+  prioritizeCategoryMedia();
 
   return { success: !cancelled && failed === 0, total, failed, cancelled };
 }
@@ -0,0 +1,135 @@
+// search.js — Full-text question search over the prebuilt index
+
+import { dataUrl, fetchCategory } from './data.js';
+
+// Index written by scripts/search_index.py: document ids with category
+// bitmasks, plus term shards (postings per folded, prefix-stemmed term)
+// keyed by their first characters. A query fetches only the shards of its
+// words; no category file is needed until results are shown.
+let indexPromise = null;
+const shards = new Map();
+
+// Term hits in the question text outrank hits in the answers
+const QUESTION_WEIGHT = 2;
+const ANSWER_WEIGHT = 1;
+const DEFAULT_LIMIT = 50;
+
+function loadIndex() {
+  indexPromise ??= dataUrl('search-index.json')
+    .then(url => fetch(url))
+    .then(res => {
+      if (!res.ok) throw new Error(`Failed to load search index: ${res.status}`);
+      return res.json();
+    })
+    .then(index => {
+      if (index?.version !== 1) throw new Error('Unsupported search index');
+      const prefixLength = Object.keys(index.shards)[0]?.length || 1;
+      return { ...index, prefixLength, stopwords: new Set(index.stopwords) };
+    })
+    .catch(err => {
+      indexPromise = null; // Retry on the next query
+      throw err;
+    });
+  return indexPromise;
+}
+
+function loadShard(index, prefix) {
+  const hash = index.shards[prefix];
+  if (!hash) return Promise.resolve(null);
+  if (!shards.has(prefix)) {
+    const promise = fetch(`data/search/${encodeURIComponent(prefix)}.json?v=${hash}`)
+      .then(res => {
+        if (!res.ok) throw new Error(`Failed to load search shard ${prefix}: ${res.status}`);
+        return res.json();
+      })
+      .catch(err => {
+        shards.delete(prefix);
+        throw err;
+      });
+    shards.set(prefix, promise);
+  }
+  return shards.get(prefix);
+}
+
+/** Lowercase and strip diacritics (mirrors fold() in scripts/search_index.py) */
+export function fold(text) {
+  return text.toLowerCase().replace(/ł/g, 'l').normalize('NFKD').replace(/[\u0300-\u036f]/g, '');
+}
+
+function queryTerms(index, query) {
+  const words = fold(query).match(/[a-z0-9]+/g) || [];
+  const keys = words
+    .filter(word => word.length >= index.minToken && !index.stopwords.has(word))
+    .map(word => word.slice(0, index.stemLength));
+  return [...new Set(keys)];
+}
+
+function decode(deltas, weight, scores) {
+  let doc = 0;
+  for (const delta of deltas) {
+    doc += delta;
+    scores.set(doc, Math.max(scores.get(doc) || 0, weight));
+  }
+}
+
+/** Document scores for one query word: every indexed term it prefixes */
+function termScores(shard, key) {
+  const scores = new Map();
+  if (!shard) return scores;
+  for (const [term, [inText, inAnswers]] of Object.entries(shard)) {
+    if (!term.startsWith(key)) continue;
+    decode(inAnswers, ANSWER_WEIGHT, scores);
+    decode(inText, QUESTION_WEIGHT, scores);
+  }
+  return scores;
+}
+
+/**
+ * Questions matching every word of the query, best first:
+ * [{ id, categories: ['B', ...], score }]
+ */
+export async function searchQuestions(query, { limit = DEFAULT_LIMIT } = {}) {
+  const index = await loadIndex();
+  const keys = queryTerms(index, query);
+  if (!keys.length) return [];
+  const perWord = await Promise.all(keys.map(async key =>
+    termScores(await loadShard(index, key.slice(0, index.prefixLength)), key)
+  ));
+
+  // Intersect, starting from the rarest word
+  perWord.sort((a, b) => a.size - b.size);
+  const [rarest, ...rest] = perWord;
+  const hits = [];
+  for (const [doc, score] of rarest) {
+    if (rest.every(scores => scores.has(doc))) {
+      hits.push([doc, rest.reduce((total, scores) => total + scores.get(doc), score)]);
+    }
+  }
+  hits.sort((a, b) => b[1] - a[1] || a[0] - b[0]);
+
+  return hits.slice(0, limit).map(([doc, score]) => ({
+    id: index.ids[doc],
+    categories: index.categories.filter((_cat, bit) => index.masks[doc] & (1 << bit)),
+    score,
+  }));
+}
+
+/**
+ * Attach question data to search results, loading as few category files as
+ * possible: each result is read from the first preferred category it is in,
+ * else from the category shared by the most results.
+ */
+export async function hydrateResults(results, preferred = []) {
+  const counts = new Map();
+  for (const r of results) r.categories.forEach(cat => counts.set(cat, (counts.get(cat) || 0) + 1));
+  const order = [...preferred, ...[...counts.keys()].sort((a, b) => counts.get(b) - counts.get(a))];
+  const chosen = results.map(r => order.find(cat => r.categories.includes(cat)));
+  const categories = await Promise.all([...new Set(chosen)].map(cat => fetchCategory(cat).catch(() => null)));
+  const byId = new Map();
+  for (const data of categories) {
+    for (const q of data?.questions || []) byId.set(String(q.id), q);
+  }
+  return results
+    .map((r, i) => ({ ...r, category: chosen[i], question: byId.get(r.id) }))
+    .filter(r => r.question);
+}
@@ -3,6 +3,7 @@
 import { t, getLang, translateQuestion } from './i18n.js';
 import { getCategoryStats, getLearnProgress, loadHistory, clearHistory } from './stats.js';
 import { MEDIA_BASE } from './data.js';
+import { mediaUrl, offlineMediaUrl, originalMediaUrl, videoRenditions } from './media.js';
 
 export function showScreen(id) {
   document.querySelectorAll('.screen').forEach(s => s.classList.remove('active'));
@@ -191,6 +192,27 @@ export function renderCategories(meta, downloadedSet = new Set()) {
   });
 }
 
+function createVideo(src, poster) {
+  const video = document.createElement('video');
+  video.controls = true;
+  video.playsInline = true;
+  video.preload = 'metadata';
+  video.muted = true;
+  video.autoplay = true;
+  if (poster) video.poster = poster;
+  video.src = src;
+  return video;
+}
+
+/** Stop videos so they release their downloads */
+function stopVideos(videos) {
+  for (const video of videos) {
+    video.pause();
+    video.removeAttribute('src');
+    video.load();
+  }
+}
+
 export function renderQuestion(question, container) {
   container.classList.add('transitioning');
   const q = translateQuestion(question);
@@ -199,17 +221,21 @@ export function renderQuestion(question, container) {
   const answersDiv = document.querySelector('.answers');
 
   // Stop any playing video before clearing
-  const oldVideo = mediaArea.querySelector('video');
-  if (oldVideo) { oldVideo.pause(); oldVideo.removeAttribute('src'); oldVideo.load(); }
+  stopVideos(mediaArea.querySelectorAll('video'));
   mediaArea.innerHTML = '';
   mediaArea.classList.remove('has-media', 'loading');
 
   if (q.media) {
     mediaArea.classList.add('has-media', 'loading');
-    const mediaCandidates = [
-      `${MEDIA_BASE}/${q.mediaType === 'video' ? 'vid' : 'img'}/${encodeURIComponent(q.media)}`,
+    // Viewport-sized variant first, then the one offline downloads store,
+    // then the full-size file (also covers offline caches filled before
+    // variants existed)
+    const mediaCandidates = [...new Set([
+      mediaUrl(q),
+      offlineMediaUrl(q),
+      originalMediaUrl(q),
       `${MEDIA_BASE}/${q.mediaType === 'video' ? 'vid' : 'img'}/${q.media}`,
-    ];
+    ])];
 
     let candidateIndex = 0;
     const getNextMediaUrl = () => {
@@ -241,6 +267,7 @@ export function renderQuestion(question, container) {
     };
 
     if (q.mediaType === 'video') {
+      const renditions = videoRenditions(q);
       const loadVideo = () => {
         const mediaUrl = getNextMediaUrl();
         if (!mediaUrl) {
@@ -252,18 +279,40 @@ export function renderQuestion(question, container) {
         }
 
         mediaArea.classList.add('loading');
+        stopVideos(mediaArea.querySelectorAll('video'));
         mediaArea.innerHTML = '';
 
-        const video = document.createElement('video');
-        video.controls = true;
-        video.playsInline = true;
-        video.preload = 'metadata';
-        video.muted = true;
-        video.autoplay = true;
+        const video = createVideo(mediaUrl, renditions.poster);
         video.onloadeddata = () => mediaArea.classList.remove('loading');
         video.onerror = () => loadVideo();
-        video.src = mediaUrl;
         mediaArea.appendChild(video);
+
+        // First attempt: play the low-bitrate preview while the full file
+        // buffers hidden, then continue in the full file from the same time
+        if (renditions.preview && candidateIndex === 1) {
+          const preview = createVideo(renditions.preview, renditions.poster);
+          preview.className = 'media-preview';
+          preview.onloadeddata = () => mediaArea.classList.remove('loading');
+          preview.onerror = () => {
+            preview.remove();
+            video.hidden = false;
+            video.play().catch(() => {});
+          };
+          video.hidden = true;
+          video.autoplay = false;
+          video.preload = 'auto';
+          video.oncanplaythrough = () => {
+            video.oncanplaythrough = null;
+            if (!preview.isConnected) return;
+            const { currentTime, ended } = preview;
+            stopVideos([preview]);
+            preview.remove();
+            video.currentTime = currentTime;
+            video.hidden = false;
+            if (!ended) video.play().catch(() => {});
+          };
+          mediaArea.insertBefore(preview, video);
+        }
       };
       loadVideo();
     } else if (q.mediaType === 'image') {
@@ -425,18 +474,20 @@ export function renderResults(result) {
 /** Preload the next question's media so it's ready when navigated to */
 export function preloadMedia(question) {
   if (!question?.media) return;
-  const prefix = question.mediaType === 'video' ? 'vid' : 'img';
-  const url = `${MEDIA_BASE}/${prefix}/${encodeURIComponent(question.media)}`;
+  const url = mediaUrl(question);
   if (question.mediaType === 'image') {
     const img = new Image();
     img.src = url;
   } else {
-    // Warm up video metadata without fetch; cross-origin fetch preloads require CORS headers.
+    // Warm up the poster and the preview (or the full file's metadata) without
+    // fetch; cross-origin fetch preloads require CORS headers.
+    const { poster, preview } = videoRenditions(question);
+    if (poster) new Image().src = poster;
     const video = document.createElement('video');
-    video.preload = 'metadata';
+    video.preload = preview ? 'auto' : 'metadata';
     video.muted = true;
     video.playsInline = true;
-    video.src = url;
+    video.src = preview || url;
     video.load();
   }
 }
@@ -488,6 +539,33 @@ export function renderHistory() {
   });
 }
 
+/** Render question search results (from search.js hydrateResults) */
+export function renderSearchResults(results, status) {
+  const listEl = document.querySelector('.search-results');
+  const statusEl = document.getElementById('question-search-status');
+  if (!listEl) return;
+  listEl.textContent = '';
+  if (statusEl) statusEl.textContent = status;
+
+  results.forEach(r => {
+    const question = translateQuestion(r.question);
+    const item = document.createElement('button');
+    item.type = 'button';
+    item.className = 'search-result';
+    item.dataset.category = r.category;
+    item.dataset.questionId = r.id;
+
+    const text = document.createElement('span');
+    text.className = 'search-result-text';
+    text.textContent = question.q;
+    const cats = document.createElement('span');
+    cats.className = 'search-result-categories';
+    cats.textContent = r.categories.join(' · ');
+    item.append(text, cats);
+    listEl.appendChild(item);
+  });
+}
+
 /** Apply current language to all data-i18n elements */
 export function applyLanguage() {
   document.querySelectorAll('[data-i18n]').forEach(el => {
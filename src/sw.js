@@ -1,8 +1,31 @@
-const CACHE_VERSION = 'prawko-v8';
+const CACHE_VERSION = 'prawko-v18';
 const APP_SHELL_CACHE = CACHE_VERSION + '-shell';
 const DATA_CACHE = CACHE_VERSION + '-data';
-const MEDIA_CACHE = CACHE_VERSION + '-media';
-const MEDIA_CACHE_LIMIT = 500;
+// Content-hashed media (scripts/media_dedup.py) never changes behind its URL,
+// so it outlives app updates; media cached under output names (data built
+// without media-names.json) can, and is dropped when a new worker activates
+const MEDIA_CACHE = 'prawko-media-v1';
+const HASHED_MEDIA = /\/[0-9a-f]{16}\.[a-z0-9]+$/;
+// Media the worker keeps: MEDIA_CACHE (on demand) and OFFLINE_MEDIA_CACHE
+// (downloaded categories, written by offline.js), both tracked in the media
+// index below. Media cached on demand may use MEDIA_CACHE_BUDGET, at most
+// MEDIA_QUOTA_SHARE of the storage quota; all media together at most
+// MEDIA_TOTAL_SHARE of it. Eviction goes down to MEDIA_EVICT_TO of a limit.
+const MEDIA_CACHE_BUDGET = 200 * 1024 * 1024;
+const MEDIA_QUOTA_SHARE = 0.2;
+const MEDIA_TOTAL_SHARE = 0.6;
+const MEDIA_EVICT_TO = 0.8;
+const MEDIA_FLUSH_DELAY = 2000;
+// Evicted last: media of the category being studied, then of downloaded ones
+const MEDIA_PRIORITY = { pinned: 1, current: 2 };
+const MEDIA_INDEX_DB = 'prawko-media-index';
+// A media host found without CORS headers is fetched plainly (uncached) for
+// this long before CORS is tried on it again
+const MEDIA_CORS_RECHECK = 24 * 60 * 60 * 1000;
+// Written by offline.js (per-file downloads and media packs)
+const OFFLINE_MEDIA_CACHE = 'prawko-offline-media-v1';
+// Index "cache" field → cache name, in lookup order
+const MEDIA_CACHES = { offline: OFFLINE_MEDIA_CACHE, demand: MEDIA_CACHE };
 
 const APP_SHELL = [
   './',
@@ -17,28 +40,50 @@ const APP_SHELL = [
   './js/stats.js',
   './js/i18n.js',
   './js/offline.js',
-  './data/meta.json',
-  './data/translations_en.json',
+  './js/media.js',
+  './js/search.js',
   './manifest.json'
 ];
 
+// Data precached for offline use, at the versioned URLs data.js requests
+const DATA_PRECACHE = ['meta.json', 'exam-index.json', 'translations_en.json'];
+const ASSET_MANIFEST_URL = './data/asset-manifest.json';
+const MAX_PATCH_HOPS = 5;
+
 self.addEventListener('install', (event) => {
-  event.waitUntil(
-    caches.open(APP_SHELL_CACHE).then((cache) => cache.addAll(APP_SHELL))
-  );
+  event.waitUntil(Promise.all([
+    caches.open(APP_SHELL_CACHE).then((cache) => cache.addAll(APP_SHELL)),
+    precacheData()
+  ]));
 });
 
+async function precacheData() {
+  const cache = await caches.open(DATA_CACHE);
+  const response = await fetch(ASSET_MANIFEST_URL, { cache: 'no-cache' }).catch(() => null);
+  const manifest = response?.ok ? await response.clone().json().catch(() => null) : null;
+  if (manifest) await safeCachePut(cache, new Request(ASSET_MANIFEST_URL), response);
+  await cache.addAll(DATA_PRECACHE.map((name) => versionedDataUrl(manifest, name)));
+}
+
+// Mirrors dataUrl() in js/data.js
+function versionedDataUrl(manifest, name) {
+  const hash = manifest?.files?.[name]?.sha256;
+  const url = './data/' + encodeURIComponent(name);
+  return hash ? url + '?v=' + hash.slice(0, 16) : url;
+}
+
 self.addEventListener('activate', (event) => {
-  const currentCaches = [APP_SHELL_CACHE, DATA_CACHE, MEDIA_CACHE];
-  event.waitUntil(
+  const currentCaches = [APP_SHELL_CACHE, DATA_CACHE, MEDIA_CACHE, OFFLINE_MEDIA_CACHE];
+  event.waitUntil(Promise.all([
     caches.keys().then((names) =>
       Promise.all(
         names
           .filter((name) => name.startsWith('prawko-') && !currentCaches.includes(name))
           .map((name) => caches.delete(name))
       )
-    )
-  );
+    ),
+    queueMediaIndexWork(reconcileMediaIndex)
+  ]));
   self.clients.claim();
 });
 
@@ -47,62 +92,67 @@ self.addEventListener('fetch', (event) => {
 
   if (event.request.method !== 'GET') return;
   if (url.protocol !== 'http:' && url.protocol !== 'https:') return;
-  if (url.origin !== self.location.origin) return;
+  if (url.origin !== self.location.origin) {
+    // Media on the CDN — fetched with CORS so the worker can cache it, unless
+    // the host is known to lack CORS (fetchMedia)
+    if (url.pathname.match(/\/(img|vid)\/[^/]+$/)) {
+      handleMedia(event, { mode: 'cors', credentials: 'omit' });
+    }
+    return;
+  }
 
-  // Category JSON & translation files — stale-while-revalidate
-  if (url.pathname.match(/\/data\/(?!meta\.json).+\.json$/)) {
+  // Asset manifest — network-first; it is how clients learn about new data
+  if (url.pathname.endsWith('/data/asset-manifest.json')) {
     event.respondWith(
       caches.open(DATA_CACHE).then((cache) =>
-        cache.match(event.request).then((cached) => {
-          const fetched = fetch(event.request).then(async (response) => {
-            if (response.ok) {
-              if (cached) {
-                const [oldText, newText] = await Promise.all([
-                  cached.clone().text(),
-                  response.clone().text()
-                ]);
-                if (oldText !== newText) {
-                  notifyClients({ type: 'DATA_UPDATED' });
-                }
-              }
-              safeCachePut(cache, event.request, response.clone());
-            }
-            return response;
-          }).catch(() => cached);
-          return cached || fetched;
-        })
+        fetch(event.request).then((response) => {
+          if (response.ok) {
+            safeCachePut(cache, new Request(ASSET_MANIFEST_URL), response.clone());
+          }
+          return response;
+        }).catch(() => cache.match(ASSET_MANIFEST_URL))
       )
     );
     return;
   }
 
-  // Local media files — cache-first, cached on demand, LRU eviction
-  if (url.pathname.match(/\/media\//)) {
+  // Release patches — always from the network
+  if (url.pathname.includes('/data/patches/')) return;
+
+  // Data JSON — versioned URLs (?v=<content hash>) are immutable, so a cached
+  // copy is served as-is; a new version is a cache miss that is patched from
+  // the cached older version when possible, and replaces it. Unversioned
+  // URLs fall back to stale-while-revalidate. Search index shards
+  // (data/search/) are versioned the same way but never patched.
+  if (url.pathname.match(/\/data\/(search\/)?[^/]+\.json$/)) {
     event.respondWith(
-      caches.open(MEDIA_CACHE).then((cache) =>
-        cache.match(event.request).then((cached) => {
-          if (cached) return cached;
-          return fetch(event.request).then((response) => {
-            if (response.ok || response.type === 'opaque') {
+      caches.open(DATA_CACHE).then((cache) =>
+        cache.match(event.request).then(async (cached) => {
+          if (cached && url.searchParams.has('v')) return cached;
+          const patchable = !cached && !url.pathname.includes('/data/search/');
+          const patched = patchable ? await patchCachedData(cache, event.request, url).catch(() => null) : null;
+          if (patched) return patched;
+          const fetched = fetch(event.request).then((response) => {
+            if (response.ok) {
               safeCachePut(cache, event.request, response.clone()).then(() =>
-                cache.keys().then((keys) => {
-                  if (keys.length > MEDIA_CACHE_LIMIT) {
-                    const toDelete = keys.slice(0, keys.length - MEDIA_CACHE_LIMIT);
-                    toDelete.forEach((key) => cache.delete(key));
-                  }
-                })
+                deleteOtherVersions(cache, url)
               );
             }
             return response;
-          }).catch(() =>
-            new Response('', { status: 503, statusText: 'Offline' })
-          );
+          }).catch(() => cached || caches.match(event.request, { ignoreSearch: true }));
+          return cached || fetched;
         })
       )
     );
     return;
   }
 
+  // Local media files
+  if (url.pathname.match(/\/media\//)) {
+    handleMedia(event);
+    return;
+  }
+
   // App shell — stale-while-revalidate
   event.respondWith(
     caches.open(APP_SHELL_CACHE).then((cache) =>
@@ -131,6 +181,8 @@ self.addEventListener('fetch', (event) => {
 self.addEventListener('message', (event) => {
   if (event.data?.type === 'SKIP_WAITING') {
     self.skipWaiting();
+  } else if (event.data?.type === 'MEDIA_PRIORITY') {
+    event.waitUntil(setMediaPriority(event.data).catch(() => {}));
   }
 });
 
@@ -140,10 +192,378 @@ function notifyClients(message) {
   });
 }
 
+// Bring a cached older version of a data file up to the requested version
+// with release patches (see applyPatch() in js/data.js, mirrored here).
+async function patchCachedData(cache, request, url) {
+  const target = url.searchParams.get('v');
+  if (!target) return null;
+  const index = await loadPatchIndex(cache);
+  if (index?.version !== 1) return null;
+  const keys = await cache.keys();
+  const oldKey = keys.find((key) => {
+    const keyUrl = new URL(key.url);
+    return keyUrl.pathname === url.pathname && keyUrl.searchParams.has('v');
+  });
+  if (!oldKey) return null;
+
+  const name = decodeURIComponent(url.pathname.slice(url.pathname.lastIndexOf('/') + 1));
+  const chain = index.files?.[name] ?? {};
+
+  let version = new URL(oldKey.url).searchParams.get('v');
+  let data = await (await cache.match(oldKey)).json();
+  for (let hops = 0; version !== target; hops++) {
+    const step = chain[version];
+    if (!step || hops >= MAX_PATCH_HOPS) return null;
+    const patchResponse = await fetch('./data/patches/' + encodeURIComponent(step.patch));
+    if (!patchResponse.ok) return null;
+    data = applyPatch(data, await patchResponse.json());
+    version = step.to;
+  }
+
+  const response = new Response(JSON.stringify(data), {
+    headers: { 'Content-Type': 'application/json' }
+  });
+  await safeCachePut(cache, request, response.clone());
+  await deleteOtherVersions(cache, url);
+  return response;
+}
+
+// Patch index advertised by the cached asset manifest ("patches", see
+// scripts/data_assets.py), fetched once per index version. Without it there
+// are no patches to look for.
+let patchIndex = null;
+
+async function loadPatchIndex(cache) {
+  const manifest = await cache.match(ASSET_MANIFEST_URL)
+    .then((response) => response?.json())
+    .catch(() => null);
+  const version = manifest?.patches?.index;
+  if (!version) return null;
+  if (patchIndex?.version !== version) {
+    patchIndex = {
+      version,
+      promise: fetch('./data/patches/index.json?v=' + version)
+        .then((response) => (response.ok ? response.json() : null))
+        .catch(() => null)
+    };
+  }
+  return patchIndex.promise;
+}
+
+function applyPatch(data, patch) {
+  const records = patch.kind === 'list'
+    ? new Map(data.questions.map((q) => [String(q.id), q]))
+    : new Map(Object.entries(patch.kind === 'map' ? data.questions : data));
+  const removed = new Set(patch.removed.map(String));
+  const order = (patch.order ?? [
+    ...[...records.keys()].filter((id) => !removed.has(id)),
+    ...patch.added.map(([id]) => id)
+  ]).map(String);
+  for (const id of removed) records.delete(id);
+  for (const [id, record] of [...patch.changed, ...patch.added]) records.set(String(id), record);
+  if (order.some((id) => !records.has(id))) throw new Error('Patch does not fit cached data');
+  if (patch.kind === 'list') return { ...data, questions: order.map((id) => records.get(id)) };
+  const map = Object.fromEntries(order.map((id) => [id, records.get(id)]));
+  return patch.kind === 'map' ? { ...data, questions: map } : map;
+}
+
+function deleteOtherVersions(cache, url) {
+  return cache.keys().then((keys) =>
+    Promise.all(keys
+      .filter((key) => {
+        const keyUrl = new URL(key.url);
+        return keyUrl.pathname === url.pathname && keyUrl.search !== url.search;
+      })
+      .map((key) => cache.delete(key)))
+  );
+}
+
 function safeCachePut(cache, request, response) {
   const requestUrl = new URL(request.url);
   if (requestUrl.protocol !== 'http:' && requestUrl.protocol !== 'https:') {
-    return Promise.resolve();
+    return Promise.resolve(false);
+  }
+  return cache.put(request, response).then(() => true, () => false);
+}
+
+// Media — downloaded categories first, then media cached on demand, then the
+// network. Complete responses the worker can read (same-origin, or CORS from
+// the CDN) are cached on demand; range requests, and the page's own no-cors
+// request when the media host sends no CORS headers, pass through uncached.
+function handleMedia(event, init) {
+  const url = event.request.url;
+  event.respondWith((async () => {
+    for (const [kind, name] of Object.entries(MEDIA_CACHES)) {
+      const cached = await caches.open(name).then((cache) => cache.match(url));
+      if (cached) {
+        event.waitUntil(recordMediaAccess(url, kind));
+        return cached;
+      }
+    }
+    if (event.request.headers.has('Range')) return fetch(event.request);
+    const response = await fetchMedia(event, init).catch(() => null);
+    if (!response) return new Response('', { status: 503, statusText: 'Offline' });
+    if (response.ok && response.type !== 'opaque') event.waitUntil(cacheMedia(url, response.clone()));
+    return response;
+  })());
+}
+
+// CORS fetch when the host is not known to lack CORS; a failed CORS fetch
+// whose plain retry succeeds marks the host, so later misses cost one request
+async function fetchMedia(event, init) {
+  if (!init) return fetch(event.request);
+  const origin = new URL(event.request.url).origin;
+  const host = await mediaHost(origin);
+  if (host && !host.cors && Date.now() - host.checked < MEDIA_CORS_RECHECK) return fetch(event.request);
+  try {
+    const response = await fetch(new Request(event.request.url, init));
+    if (!host?.cors) event.waitUntil(setMediaHost(origin, true));
+    return response;
+  } catch {
+    const response = await fetch(event.request);
+    event.waitUntil(setMediaHost(origin, false));
+    return response;
+  }
+}
+
+const mediaHosts = new Map(); // origin → Promise of its 'hosts' record
+
+function mediaHost(origin) {
+  if (!mediaHosts.has(origin)) {
+    mediaHosts.set(origin, openMediaIndex()
+      .then((db) => idbResult(db.transaction('hosts').objectStore('hosts').get(origin)))
+      .catch(() => undefined));
+  }
+  return mediaHosts.get(origin);
+}
+
+async function setMediaHost(origin, cors) {
+  const host = { origin, cors, checked: Date.now() };
+  mediaHosts.set(origin, Promise.resolve(host));
+  const db = await openMediaIndex();
+  const tx = db.transaction('hosts', 'readwrite');
+  tx.objectStore('hosts').put(host);
+  await idbDone(tx).catch(() => {});
+}
+
+// Media index: IndexedDB metadata for both media caches (byte size and last
+// access per cache and URL) and the URL sets the app asks to keep longest.
+// Fetches only queue updates; a flush writes them in one transaction, keeps
+// running byte totals and, over a limit, evicts the lowest-priority, least
+// recently used entries.
+let mediaIndexDb = null;
+let mediaBytes = null; // { demand, offline }, summed from the index once per worker start
+const mediaPending = new Map();
+let mediaFlushTimer = null;
+let mediaIndexWork = Promise.resolve();
+
+function openMediaIndex() {
+  mediaIndexDb ??= new Promise((resolve, reject) => {
+    const request = indexedDB.open(MEDIA_INDEX_DB, 3);
+    request.onupgradeneeded = () => {
+      // Only metadata: an index from an older layout is rebuilt by reconcileMediaIndex()
+      const db = request.result;
+      for (const name of [...db.objectStoreNames]) db.deleteObjectStore(name);
+      db.createObjectStore('entries', { keyPath: ['cache', 'url'] });
+      db.createObjectStore('priority', { keyPath: 'tag' });
+      db.createObjectStore('hosts', { keyPath: 'origin' });
+    };
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  }).catch((err) => {
+    mediaIndexDb = null;
+    throw err;
+  });
+  return mediaIndexDb;
+}
+
+function idbResult(request) {
+  return new Promise((resolve, reject) => {
+    request.onsuccess = () => resolve(request.result);
+    request.onerror = () => reject(request.error);
+  });
+}
+
+function idbDone(tx) {
+  return new Promise((resolve, reject) => {
+    tx.oncomplete = () => resolve();
+    tx.onerror = tx.onabort = () => reject(tx.error);
+  });
+}
+
+async function readStore(name) {
+  const db = await openMediaIndex();
+  return idbResult(db.transaction(name).objectStore(name).getAll());
+}
+
+// Content-Length when the server sent one, else the body size (0 for
+// opaque responses, e.g. offline.js per-file downloads without CORS)
+async function responseSize(response) {
+  return Number(response.headers.get('Content-Length')) || (await response.clone().blob()).size;
+}
+
+async function cacheMedia(url, response) {
+  const size = await responseSize(response);
+  const cache = await caches.open(MEDIA_CACHE);
+  if (await safeCachePut(cache, new Request(url), response)) await recordMediaAccess(url, 'demand', size);
+}
+
+function recordMediaAccess(url, cache, size) {
+  const key = cache + ' ' + url;
+  const update = { ...mediaPending.get(key), url, cache, accessed: Date.now() };
+  if (size !== undefined) update.size = size;
+  mediaPending.set(key, update);
+  mediaFlushTimer ??= new Promise((resolve) => setTimeout(resolve, MEDIA_FLUSH_DELAY)).then(() => {
+    mediaFlushTimer = null;
+    return queueMediaIndexWork(flushMediaIndex);
+  });
+  return mediaFlushTimer;
+}
+
+// Flushes, evictions and reconciles run one at a time
+function queueMediaIndexWork(work) {
+  mediaIndexWork = mediaIndexWork.then(work).catch(() => {});
+  return mediaIndexWork;
+}
+
+function mediaTotals(entries) {
+  const bytes = { demand: 0, offline: 0 };
+  for (const entry of entries) bytes[entry.cache] += entry.size;
+  return bytes;
+}
+
+async function flushMediaIndex() {
+  const batch = [...mediaPending.values()];
+  mediaPending.clear();
+  mediaBytes ??= mediaTotals(await readStore('entries'));
+  const db = await openMediaIndex();
+  const tx = db.transaction('entries', 'readwrite');
+  const store = tx.objectStore('entries');
+  for (const { url, cache, size: newSize, accessed } of batch) {
+    const request = store.get([cache, url]);
+    request.onsuccess = () => {
+      const entry = request.result;
+      const size = newSize ?? entry?.size;
+      if (size === undefined) return; // Hit on an entry evicted since, or not indexed yet
+      mediaBytes[cache] += size - (entry?.size ?? 0);
+      store.put({ cache, url, size, accessed });
+    };
+  }
+  await idbDone(tx);
+  const limits = await mediaLimits();
+  if (mediaBytes.demand > limits.demand || mediaBytes.demand + mediaBytes.offline > limits.total) {
+    await evictMedia(limits);
+  }
+}
+
+async function mediaLimits() {
+  const estimate = await Promise.resolve(navigator.storage?.estimate?.()).catch(() => null);
+  const quota = estimate?.quota;
+  return {
+    demand: quota ? Math.min(MEDIA_CACHE_BUDGET, quota * MEDIA_QUOTA_SHARE) : MEDIA_CACHE_BUDGET,
+    total: quota ? quota * MEDIA_TOTAL_SHARE : Infinity
+  };
+}
+
+// url → highest MEDIA_PRIORITY rank of the sets it is in
+function mediaRanks(priority) {
+  const ranks = new Map();
+  for (const { tag, urls } of priority) {
+    for (const url of urls) ranks.set(url, Math.max(ranks.get(url) ?? 0, MEDIA_PRIORITY[tag] ?? 0));
+  }
+  return ranks;
+}
+
+// Entries to evict, lowest rank and least recently used first, until media
+// cached on demand and all media together are within MEDIA_EVICT_TO of their
+// limits. Downloaded media only goes while all media together is over.
+function planMediaEviction(entries, ranks, limits) {
+  const bytes = mediaTotals(entries);
+  const rank = (entry) => ranks.get(entry.url) ?? 0;
+  const order = [...entries].sort((a, b) => rank(a) - rank(b) || a.accessed - b.accessed);
+  const evicted = [];
+  for (const entry of order) {
+    const totalOver = bytes.demand + bytes.offline > limits.total * MEDIA_EVICT_TO;
+    if (!totalOver && bytes.demand <= limits.demand * MEDIA_EVICT_TO) break;
+    if (entry.cache === 'offline' && !totalOver) continue;
+    evicted.push(entry);
+    bytes[entry.cache] -= entry.size;
+  }
+  return { evicted, bytes };
+}
+
+async function evictMedia(limits) {
+  const [entries, priority] = await Promise.all([readStore('entries'), readStore('priority')]);
+  const { evicted, bytes } = planMediaEviction(entries, mediaRanks(priority), limits);
+  await Promise.all(evicted.map(({ cache, url }) =>
+    caches.open(MEDIA_CACHES[cache]).then((c) => c.delete(url))
+  ));
+  const db = await openMediaIndex();
+  const tx = db.transaction('entries', 'readwrite');
+  evicted.forEach(({ cache, url }) => tx.objectStore('entries').delete([cache, url]));
+  await idbDone(tx);
+  mediaBytes = bytes;
+}
+
+// Sent by offline.js when a category is opened or downloaded: the current
+// category's and the downloaded categories' media URLs (CDN URLs, as cached)
+async function setMediaPriority(message) {
+  const db = await openMediaIndex();
+  const tx = db.transaction('priority', 'readwrite');
+  for (const tag of Object.keys(MEDIA_PRIORITY)) {
+    if (Array.isArray(message[tag])) tx.objectStore('priority').put({ tag, urls: message[tag] });
+  }
+  await idbDone(tx);
+  if (Array.isArray(message.pinned)) await indexOfflineMedia(message.pinned);
+}
+
+// Index downloaded files offline.js wrote since (the worker never sees those puts)
+async function indexOfflineMedia(urls) {
+  const indexed = new Set((await readStore('entries'))
+    .filter((entry) => entry.cache === 'offline')
+    .map((entry) => entry.url));
+  const cache = await caches.open(OFFLINE_MEDIA_CACHE);
+  const updates = [];
+  for (const url of urls) {
+    if (indexed.has(url)) continue;
+    const response = await cache.match(url);
+    if (response) updates.push(recordMediaAccess(url, 'offline', await responseSize(response)));
+  }
+  await Promise.all(updates);
+}
+
+// On activation: drop media cached on demand under output names (see
+// MEDIA_CACHE), index entries of both media caches cached without metadata
+// (e.g. the index was cleared) and drop metadata of entries no longer
+// cached. The only full listing of the media caches.
+async function reconcileMediaIndex() {
+  const entries = await readStore('entries');
+  const found = [];
+  const cached = new Set();
+  for (const [kind, name] of Object.entries(MEDIA_CACHES)) {
+    const cache = await caches.open(name);
+    for (const key of await cache.keys()) {
+      if (kind === 'demand' && !HASHED_MEDIA.test(new URL(key.url).pathname)) {
+        await cache.delete(key);
+        continue;
+      }
+      cached.add(kind + ' ' + key.url);
+      found.push({ kind, cache, key });
+    }
   }
-  return cache.put(request, response).catch(() => Promise.resolve());
+  const indexed = new Set(entries.map((entry) => entry.cache + ' ' + entry.url));
+  const missing = found.filter(({ kind, key }) => !indexed.has(kind + ' ' + key.url));
+  const sizes = await Promise.all(missing.map(async ({ cache, key }) => {
+    const response = await cache.match(key);
+    return response ? responseSize(response) : 0;
+  }));
+  const db = await openMediaIndex();
+  const tx = db.transaction('entries', 'readwrite');
+  const store = tx.objectStore('entries');
+  missing.forEach(({ kind, key }, i) => store.put({ cache: kind, url: key.url, size: sizes[i], accessed: 0 }));
+  entries
+    .filter((entry) => !cached.has(entry.cache + ' ' + entry.url))
+    .forEach((entry) => store.delete([entry.cache, entry.url]));
+  await idbDone(tx);
+  mediaBytes = null;
 }
@@ -82,4 +82,20 @@ test.describe('App flow coverage', () => {
     await page.waitForSelector('#quiz.active');
     await expect(page.locator('.question-text')).not.toBeEmpty();
   });
+
+  test('question search opens the picked question in learn mode', async ({ page }) => {
+    await openCategories(page);
+    await page.click('[data-navigate="search"]');
+    await page.waitForSelector('#search.active');
+
+    // Folded query: matches "przystanku tramwajowego"
+    await page.fill('#question-search', 'Przystanek TRAMWAJ');
+    const first = page.locator('.search-result').first();
+    await expect(first).toBeVisible();
+    const text = await first.locator('.search-result-text').textContent();
+
+    await first.click();
+    await page.waitForSelector('#quiz.active');
+    await expect(page.locator('.question-text')).toHaveText(text);
+  });
 });
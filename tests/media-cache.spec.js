@@ -0,0 +1,59 @@
+const { test, expect } = require('@playwright/test');
+
+// The suite blocks service workers, so sw.js is loaded into the page as a
+// plain script: its media index functions run against the page's Cache
+// Storage and IndexedDB, with a small storage quota to force eviction.
+async function loadServiceWorkerScript(page) {
+  await page.goto('/');
+  await page.addScriptTag({ url: '/sw.js' });
+  await page.evaluate(() => {
+    // Media cached on demand may use 20% of this (2000 bytes), evicted down to 1600
+    Object.defineProperty(navigator.storage, 'estimate', { value: async () => ({ quota: 10000 }) });
+  });
+}
+
+test.describe('Service worker media cache', () => {
+  test('media of the current category survives eviction', async ({ page }) => {
+    await loadServiceWorkerScript(page);
+    const cached = await page.evaluate(async () => {
+      const url = (name) => `https://cdn.example/file/prawko/img/${name}`;
+      const body = (size) => new Response(new Uint8Array(size), { headers: { 'Content-Length': String(size) } });
+      await setMediaPriority({ current: [url('current.webp')] });
+      // Cached first, so it is the least recently used entry
+      await cacheMedia(url('current.webp'), body(500));
+      await Promise.all([
+        cacheMedia(url('a.webp'), body(500)),
+        cacheMedia(url('b.webp'), body(400)),
+        cacheMedia(url('c.webp'), body(700)),
+      ]);
+      const keys = await (await caches.open(MEDIA_CACHE)).keys();
+      const entries = await readStore('entries');
+      return {
+        names: keys.map((key) => key.url.split('/').pop()),
+        bytes: entries.reduce((sum, entry) => sum + entry.size, 0),
+      };
+    });
+    expect(cached.names).toContain('current.webp');
+    expect(cached.names.length).toBeLessThan(4);
+    expect(cached.bytes).toBeLessThanOrEqual(1600);
+  });
+
+  test('downloaded media is only evicted when all media is over its limit', async ({ page }) => {
+    await loadServiceWorkerScript(page);
+    const plans = await page.evaluate(() => {
+      const entries = [
+        { cache: 'offline', url: 'pinned', size: 5000, accessed: 1 },
+        { cache: 'demand', url: 'old', size: 3000, accessed: 2 },
+        { cache: 'demand', url: 'new', size: 100, accessed: 3 },
+      ];
+      const ranks = mediaRanks([{ tag: 'pinned', urls: ['pinned'] }]);
+      const urls = (limits) => planMediaEviction(entries, ranks, limits).evicted.map((entry) => entry.url);
+      return {
+        demandOver: urls({ demand: 2000, total: 100000 }),
+        totalOver: urls({ demand: 2000, total: 5000 }),
+      };
+    });
+    expect(plans.demandOver).toEqual(['old']);
+    expect(plans.totalOver).toEqual(['old', 'new', 'pinned']);
+  });
+});